@@ -0,0 +1,129 @@
+# benchmarks/census_analytics.py
+"""
+Census analytics over a synthetic masterlist (default 500k residents).
+
+    python benchmarks/census_analytics.py --residents 500000 --output census.json
+
+Times, on the same synthetic data:
+  encode      raw column values -> NumPy arrays (the cache fill, minus the DB read)
+  vectorized  census_summary() on the cached arrays
+  per_row     the same statistics computed one resident at a time in Python
+With --with-db the rows are also written to a temporary SQLite database and the
+full load_arrays() read is timed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # utils.census imports the database module
+
+from benchmarks.harness import write_results  # noqa: E402
+
+PUROKS = ["Centro", "Mangga", "Tambis", "Tagaytay", "Sapa", "Lubi", "Kalubihan", "Riverside", None]
+GENDERS = ["Male", "Female", "male", "F", "", None]
+GENDER_WEIGHTS = [45, 45, 3, 3, 2, 2]
+
+
+def synthetic_masterlist(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = date(1925, 1, 1)
+    span_days = (date(2024, 12, 31) - start).days
+    dobs = [datetime.combine(start + timedelta(days=rng.randrange(span_days)), datetime.min.time()) for _ in range(n)]
+    genders = rng.choices(GENDERS, weights=GENDER_WEIGHTS, k=n)
+    puroks = [rng.choice(PUROKS) for _ in range(n)]
+    years = [None if rng.random() < 0.1 else rng.randrange(0, 60) for _ in range(n)]
+    return dobs, genders, puroks, years
+
+
+def per_row_summary(dobs, genders, puroks, years, as_of: date) -> dict:
+    """Reference implementation: what a row-at-a-time loop costs."""
+    from utils.census import AGE_BRACKETS, MINOR_AGE, SENIOR_AGE
+    brackets, by_purok, minors, seniors, ages = {}, {}, 0, 0, []
+    for dob, gender, purok, _ in zip(dobs, genders, puroks, years):
+        age = as_of.year - dob.year - ((as_of.month, as_of.day) < (dob.month, dob.day))
+        ages.append(age)
+        bracket = max(b for b in AGE_BRACKETS if b <= max(age, 0))
+        brackets[bracket] = brackets.get(bracket, 0) + 1
+        minors += age < MINOR_AGE
+        seniors += age >= SENIOR_AGE
+        counts = by_purok.setdefault((purok or "").strip() or "Unknown", {"male": 0, "female": 0, "other": 0})
+        initial = (gender or "").strip()[:1].lower()
+        counts["male" if initial == "m" else "female" if initial == "f" else "other"] += 1
+    return {"brackets": brackets, "by_purok": by_purok, "minors": minors, "seniors": seniors, "median": statistics.median(ages)}
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, round(min(samples) * 1000, 2)
+
+
+def load_from_sqlite(columns, repeat: int) -> float:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.orm import sessionmaker
+    from models import ResidentMasterlistDB
+    from utils.census import load_arrays
+
+    path = os.path.join(tempfile.mkdtemp(), "census.db")
+    engine = create_engine(f"sqlite:///{path}")
+    ResidentMasterlistDB.__table__.create(engine)
+    dobs, genders, puroks, years = columns
+    with engine.begin() as conn:
+        conn.execute(insert(ResidentMasterlistDB), [
+            {"first_name": f"R{i}", "last_name": "X", "dob": d, "gender": g or "", "purok": p, "number_of_years": y}
+            for i, (d, g, p, y) in enumerate(zip(dobs, genders, puroks, years))
+        ])
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        _, ms = timed(lambda: load_arrays(db), repeat)
+    engine.dispose()
+    os.remove(path)
+    return ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--residents", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N for each timing")
+    parser.add_argument("--with-db", action="store_true", help="Also time the SQLite read into arrays")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    from utils.census import build_arrays, census_summary
+
+    as_of = date(2025, 6, 30)
+    columns = synthetic_masterlist(args.residents)
+    arrays, encode_ms = timed(lambda: build_arrays(*columns), 1)
+    summary, vectorized_ms = timed(lambda: census_summary(arrays, as_of=as_of), args.repeat)
+    reference, per_row_ms = timed(lambda: per_row_summary(*columns, as_of), 1)
+
+    assert summary["minors"] == reference["minors"] and summary["seniors"] == reference["seniors"]
+    assert summary["median_age"] == reference["median"]
+
+    results = {
+        "residents": args.residents,
+        "encode_ms": encode_ms,
+        "vectorized_ms": vectorized_ms,
+        "per_row_ms": per_row_ms,
+        "speedup": round(per_row_ms / vectorized_ms, 1) if vectorized_ms else None,
+        "array_bytes": sum(getattr(arrays, f).nbytes for f in ("birth_year", "birth_mmdd", "gender", "purok", "years")),
+    }
+    if args.with_db:
+        results["db_load_ms"] = load_from_sqlite(columns, 1)
+
+    for key, value in results.items():
+        print(f"{key:>14}: {value}")
+    write_results(args.output, "census_analytics", results, repeat=args.repeat, with_db=args.with_db)
+
+
+if __name__ == "__main__":
+    main()
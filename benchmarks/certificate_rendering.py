@@ -0,0 +1,102 @@
+# benchmarks/certificate_rendering.py
+"""
+Certificate rendering throughput.
+
+    python benchmarks/certificate_rendering.py --certificates 2000 --output certificates.json
+
+Times, on synthetic residents:
+  uncached    rendering with the template recompiled for every certificate
+  inline      rendering with the cached compiled templates, one process
+  pool        render_many() across CERTIFICATE_WORKERS processes (includes pool start-up)
+  merge       streaming the rendered pages into one PDF with write_pdf()
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import write_results  # noqa: E402
+
+FIRST = ["Juan", "Maria", "José", "Ana", "Pedro", "Luz", "Ramon", "Teresita", "Niño", "Carmelita"]
+LAST = ["Dela Cruz", "Santos", "Reyes", "Bautista", "Ocampo", "Garcia", "Mendoza", "Peñaflor"]
+TYPES = ["Barangay Clearance", "Certificate of Residency", "Certificate of Indigency", "Business Permit"]
+
+
+def synthetic_items(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        (rng.choice(TYPES), {
+            "full_name": f"{rng.choice(FIRST)} {rng.choice(LAST)}".upper(),
+            "age": str(rng.randrange(18, 90)),
+            "civil_status": rng.choice(["single", "married", "widowed"]),
+            "dob": "March 4, 1987",
+            "place_of_birth": "Cebu City",
+            "purok": rng.choice(["Centro", "Mangga", "Tambis", "Sapa"]),
+            "barangay": "Tilhaong",
+            "barangay_name": "Barangay Tilhaong",
+            "city": "Consolacion",
+            "province": "Cebu",
+            "document_type": "",
+            "purpose": rng.choice(["employment", "school requirement", "financial assistance"]),
+            "control_no": f"2025-{i:06d}",
+            "issued_day": "30th",
+            "issued_month_year": "June 2025",
+            "captain_name": "PEDRO S. SANTOS",
+        })
+        for i in range(n)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificates", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    from utils import certificates
+    from utils.certificates import compiled_template, render_certificate, render_many
+    from utils.pdf import write_pdf
+
+    items = synthetic_items(args.certificates)
+    uncached_n = min(len(items), 200)
+
+    def uncached():
+        for item in items[:uncached_n]:
+            compiled_template.cache_clear()
+            render_certificate(*item)
+
+    _, uncached_ms = timed(uncached)
+    pages, inline_ms = timed(lambda: [render_certificate(*item) for item in items])
+    certificates.POOL_THRESHOLD = 0
+    pool_pages, pool_ms = timed(lambda: list(render_many(items)))
+    assert pool_pages == pages
+    pdf, merge_ms = timed(lambda: b"".join(write_pdf(pages)))
+
+    results = {
+        "certificates": len(items),
+        "workers": certificates.WORKERS,
+        "uncached_ms_per_page": round(uncached_ms / uncached_n, 3),
+        "inline_ms_per_page": round(inline_ms / len(items), 3),
+        "inline_pages_per_s": round(len(items) / inline_ms * 1000),
+        "pool_ms": pool_ms,
+        "pool_pages_per_s": round(len(items) / pool_ms * 1000),
+        "merge_ms": merge_ms,
+        "pdf_bytes": len(pdf),
+        "bytes_per_page": len(pdf) // len(items),
+    }
+    for key, value in results.items():
+        print(f"{key:>22}: {value}")
+    write_results(args.output, "certificate_rendering", results)
+
+
+if __name__ == "__main__":
+    main()
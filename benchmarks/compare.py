@@ -0,0 +1,90 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files (any script's --output, or run_all.py's).
+
+    python benchmarks/compare.py baseline.json current.json --threshold 10
+
+Numbers are matched by path (levels by scenario/concurrency/workers) and shown
+with the relative change. Timings (*_ms, *_us, *_s) are worse when they grow,
+rates (*_rps, *_per_s, *_per_sec*, speedup) when they shrink; changes beyond
+--threshold percent in the wrong direction are marked and, with --fail, make
+the exit status 1 (for CI).
+"""
+import argparse
+import json
+import sys
+
+LEVEL_KEYS = ("suite", "scenario", "concurrency", "workers")
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "_ms_per_page")
+HIGHER_IS_BETTER = ("_rps", "_per_s", "_per_sec", "_per_sec_per_worker", "speedup")
+
+
+def flatten(value, prefix: str = "", out=None) -> dict:
+    out = {} if out is None else out
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in ("environment", "parameters", "statuses"):
+                continue
+            flatten(item, f"{prefix}.{key}" if prefix else key, out)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = str(i)
+            if isinstance(item, dict):
+                label = "/".join(f"{k}={item[k]}" for k in LEVEL_KEYS if k in item) or label
+            flatten(item, f"{prefix}[{label}]", out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = value
+    return out
+
+
+def direction(path: str) -> int:
+    """+1 when bigger is better, -1 when smaller is better, 0 when neither."""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith(HIGHER_IS_BETTER):
+        return 1
+    if name.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change that counts as a regression")
+    parser.add_argument("--fail", action="store_true", help="Exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    for label, data in (("baseline", baseline), ("current", current)):
+        env = data.get("environment") or {}
+        print(f"{label:>8}: {env.get('commit')}{' (dirty)' if env.get('dirty') else ''}  "
+              f"python {env.get('python')}  cpus {env.get('cpus')}  db {env.get('database')}")
+
+    before, after = flatten(baseline.get("results", baseline)), flatten(current.get("results", current))
+    regressions = 0
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = (new - old) / old * 100 if old else 0.0
+        sign = direction(path)
+        marker = ""
+        if sign and -sign * change > args.threshold:
+            marker, regressions = "  << regression", regressions + 1
+        elif sign and sign * change > args.threshold:
+            marker = "  improved"
+        print(f"{path:<70} {old:>12} {new:>12} {change:>+8.1f}%{marker}")
+    for path in sorted(before.keys() - after.keys()):
+        print(f"{path:<70} only in baseline")
+    for path in sorted(after.keys() - before.keys()):
+        print(f"{path:<70} only in current")
+
+    print(f"\n{regressions} regression(s) beyond {args.threshold}%")
+    if args.fail and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
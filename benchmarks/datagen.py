@@ -0,0 +1,213 @@
+# benchmarks/datagen.py
+"""
+Deterministic synthetic data for load tests and benchmarks.
+
+    python benchmarks/datagen.py --database-url sqlite:///bench.db --users 2000 --output manifest.json
+
+Creates (same --seed, same rows):
+  staff          one secretary and one captain (password --password)
+  residents      --users approved residents with sequential 09xx contacts
+  requests       --requests-per-user document requests each, statuses spread over
+                 the last 180 days, with base64 JPEG-sized photos (log-normal around --photo-kb)
+  notifications  --notifications-per-user each
+  masterlist     --residents census rows, loaded through import_residents()
+                 (the odd name + birth date collision is skipped as a duplicate)
+
+Timestamps are offsets from the moment of generation, so "last 30 days" style
+queries see the same shape of data on every run.
+
+The target database should be empty (tables are created if missing). Rows are
+bulk-inserted with Core, so the ORM hooks don't run: stats_rollup and the
+request history are rebuilt at the end with recompute_rollups() and
+backfill_request_events(). The manifest (--output) lists the staff and
+resident credentials for load_scenarios.py.
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST = ["Juan", "Maria", "José", "Ana", "Pedro", "Luz", "Ramon", "Teresita", "Niño", "Carmelita", "Rodel", "Jocelyn"]
+LAST = ["Dela Cruz", "Santos", "Reyes", "Bautista", "Ocampo", "Garcia", "Mendoza", "Peñaflor", "Villanueva", "Aquino"]
+# The masterlist importer only accepts plain letters (and ñ) in names
+CENSUS_FIRST = [name for name in FIRST if name.replace("ñ", "n").isascii()]
+PUROKS = ["Centro", "Mangga", "Tambis", "Sapa", "Lubi", "Kamunggay"]
+DOCUMENT_TYPES = ["Barangay Clearance", "Certificate of Residency", "Certificate of Indigency", "Business Permit"]
+PURPOSES = ["employment", "school requirement", "financial assistance", "bank account", "scholarship"]
+# Roughly what a live barangay's request table looks like
+STATUS_WEIGHTS = {
+    "Pending": 25, "Approved": 10, "For Print": 8, "For Pickup": 7,
+    "Completed": 40, "Returned": 4, "Rejected": 4, "Cancelled": 2,
+}
+CHUNK = 1000
+PHOTO_POOL = 16
+STAFF_CONTACTS = {"secretary": "09170000001", "captain": "09170000002"}
+
+
+def resident_contact(n: int) -> str:
+    return f"0918{n:07d}"
+
+
+def photo_pool(rng: random.Random, mean_kb: float, size: int = PHOTO_POOL):
+    """A few photo blobs with phone-camera-like sizes; rows reuse them to keep generation fast."""
+    photos = []
+    for _ in range(size):
+        kb = max(8.0, rng.lognormvariate(0, 0.5) * mean_kb)
+        raw = rng.randbytes(int(kb * 1024))
+        photos.append("data:image/jpeg;base64," + base64.b64encode(raw).decode())
+    return photos
+
+
+def _chunks(rows, n=CHUNK):
+    for i in range(0, len(rows), n):
+        yield rows[i:i + n]
+
+
+def generate(database_url: str, users: int = 1000, requests_per_user: int = 3, notifications_per_user: int = 5,
+             residents: int = 5000, seed: int = 42, photo_kb: float = 120, password: str = "secret123") -> dict:
+    """Fill `database_url` and return the manifest. Must run before the app's database module is imported."""
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import insert, select
+
+    from database import SessionLocal, prepare_tenant_database
+    from models import DocumentRequestDB, NotificationDB, UserDB
+    from utils.masterlist_import import import_residents
+    from utils.passwords import hash_password
+    from utils.request_events import backfill_request_events
+    from utils.stats_rollup import recompute_rollups
+    from utils.tenancy import current_tenant
+
+    rng = random.Random(seed)
+    tenant = current_tenant()
+    prepare_tenant_database(tenant)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    hashed = hash_password(password)  # one hash for everybody: scrypt per row would dominate
+    photos = photo_pool(rng, photo_kb)
+    timings = {}
+
+    def person(role, status, contact):
+        return {
+            "first_name": rng.choice(FIRST), "middle_name": rng.choice([None, *LAST]), "last_name": rng.choice(LAST),
+            "dob": datetime(1950, 1, 1) + timedelta(days=rng.randrange(0, 365 * 55)),
+            "gender": rng.choice(["Male", "Female"]), "civil_status": rng.choice(["Single", "Married", "Widowed"]),
+            "contact": contact, "purok": rng.choice(PUROKS), "barangay": tenant.barangay,
+            "city": "Consolacion", "province": "Cebu", "postal_code": "6001", "place_of_birth": "Cebu City",
+            "password": hashed, "photo": rng.choice(photos), "role": role, "status": status,
+        }
+
+    db = SessionLocal()
+    try:
+        if db.execute(select(UserDB.id).limit(1)).first():
+            raise SystemExit(f"{database_url} already has users; generate into an empty database")
+
+        start = time.perf_counter()
+        staff = [person(role, "Approved", contact) for role, contact in STAFF_CONTACTS.items()]
+        db.execute(insert(UserDB.__table__), staff)
+        for chunk in _chunks([person("resident", "Approved", resident_contact(n)) for n in range(users)]):
+            db.execute(insert(UserDB.__table__), chunk)
+        db.commit()
+        ids = dict(db.execute(select(UserDB.contact, UserDB.id)).all())
+        resident_ids = [ids[resident_contact(n)] for n in range(users)]
+        timings["users_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        requests = []
+        for n, user_id in enumerate(resident_ids):
+            for _ in range(requests_per_user):
+                created = now - timedelta(minutes=rng.randrange(0, 180 * 24 * 60))
+                status = rng.choices(statuses, weights)[0]
+                requests.append({
+                    "document_type": rng.choice(DOCUMENT_TYPES), "purpose": rng.choice(PURPOSES),
+                    "copies": rng.choice([1, 1, 1, 2, 3]), "photo": rng.choice(photos),
+                    "authorization_photo": rng.choice(photos), "status": status,
+                    "action": "Review", "contact": resident_contact(n),
+                    "user_id": user_id, "created_at": created,
+                    "updated_at": created + timedelta(hours=rng.randrange(0, 72)) if status != "Pending" else created,
+                    "is_deleted": False,
+                })
+        for chunk in _chunks(requests):
+            db.execute(insert(DocumentRequestDB.__table__), chunk)
+        db.commit()
+        timings["requests_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        notifications = [
+            {
+                "title": "Request Update", "message": f"Your {rng.choice(DOCUMENT_TYPES)} request was updated.",
+                "type": rng.choice(["info", "status_update"]), "is_read": rng.random() < 0.6,
+                "created_at": now - timedelta(minutes=rng.randrange(0, 90 * 24 * 60)), "user_id": user_id,
+            }
+            for user_id in resident_ids for _ in range(notifications_per_user)
+        ]
+        for chunk in _chunks(notifications):
+            db.execute(insert(NotificationDB.__table__), chunk)
+        db.commit()
+        timings["notifications_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        masterlist = (
+            {
+                "first_name": rng.choice(CENSUS_FIRST), "middle_name": rng.choice(LAST), "last_name": rng.choice(LAST),
+                "dob": (datetime(1930, 1, 1) + timedelta(days=rng.randrange(0, 365 * 90))).strftime("%Y-%m-%d"),
+                "gender": rng.choice(["Male", "Female"]), "purok": rng.choice(PUROKS),
+                "number_of_years": rng.randrange(0, 60),
+            }
+            for _ in range(residents)
+        )
+        imported = import_residents(db, masterlist)
+        timings["masterlist_s"] = round(time.perf_counter() - start, 2)
+
+        start = time.perf_counter()
+        recompute_rollups(db)
+        backfill_request_events(db)
+        timings["derived_s"] = round(time.perf_counter() - start, 2)
+    finally:
+        db.close()
+
+    return {
+        "database_url": database_url,
+        "seed": seed,
+        "counts": {
+            "users": users, "requests": len(requests), "notifications": len(notifications),
+            "masterlist": imported["inserted"], "photo_kb": photo_kb,
+        },
+        "timings": timings,
+        "password": password,
+        "staff": {role: {"id": ids[contact], "contact": contact} for role, contact in STAFF_CONTACTS.items()},
+        "residents": [{"id": user_id, "contact": resident_contact(n)} for n, user_id in enumerate(resident_ids)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests-per-user", type=int, default=3)
+    parser.add_argument("--notifications-per-user", type=int, default=5)
+    parser.add_argument("--residents", type=int, default=5000, help="Masterlist (census) rows")
+    parser.add_argument("--photo-kb", type=float, default=120, help="Typical photo size before base64")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="secret123")
+    parser.add_argument("--output", default=None, help="Write the manifest as JSON to this file")
+    args = parser.parse_args()
+
+    manifest = generate(
+        args.database_url, args.users, args.requests_per_user, args.notifications_per_user,
+        args.residents, args.seed, args.photo_kb, args.password,
+    )
+    for key, value in {**manifest["counts"], **manifest["timings"]}.items():
+        print(f"{key:>16}: {value}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
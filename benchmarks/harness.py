@@ -0,0 +1,75 @@
+# benchmarks/harness.py
+"""
+Shared helpers for the benchmark scripts: latency summaries and result files.
+
+Every script writes its --output JSON through write_results(), which wraps the
+numbers with where they came from (commit, Python, CPU count, database backend)
+so runs from different commits can be lined up with compare.py.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment() -> dict:
+    url = os.getenv("DATABASE_URL") or ""
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "cpus": os.cpu_count(),
+        "database": url.split(":", 1)[0] if url else None,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def write_results(path: Optional[str], suite: str, results, **parameters):
+    """Write {"suite", "environment", "parameters", "results"} to `path` (no-op without one)."""
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump(
+            {"suite": suite, "environment": environment(), "parameters": parameters, "results": results},
+            f, indent=2, default=str,
+        )
+
+
+def _rank(sorted_values: List[float], q: float) -> float:
+    return sorted_values[max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values))) - 1))]
+
+
+def latency_summary(latencies: List[float], elapsed: Optional[float] = None) -> Dict[str, float]:
+    """Count, throughput and percentiles (ms) for a list of durations in seconds."""
+    values = sorted(latencies)
+    if not values:
+        return {"count": 0}
+    summary = {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 2),
+        "p50_ms": round(statistics.median(values) * 1000, 2),
+        "p95_ms": round(_rank(values, 0.95) * 1000, 2),
+        "p99_ms": round(_rank(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2),
+    }
+    if elapsed:
+        summary["throughput_rps"] = round(len(values) / elapsed, 1)
+    return summary
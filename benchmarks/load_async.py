@@ -0,0 +1,89 @@
+# benchmarks/load_async.py
+"""
+Login-burst load test for comparing sync and async route handlers.
+
+Start the backend first, e.g.
+    uvicorn main:app --workers 1
+then run
+    python benchmarks/load_async.py --contact 09123456789 --password secret123
+
+Each concurrency level runs for --duration seconds with that many clients
+looping over POST /users/login and GET /users/verify/{contact}.
+Results are printed and written as JSON (--output) for comparison between runs.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import latency_summary, write_results  # noqa: E402
+
+
+async def client_loop(client: httpx.AsyncClient, contact: str, password: str, deadline: float, stats: dict):
+    while time.perf_counter() < deadline:
+        for method, path, body in (
+            ("POST", "/users/login", {"contact": contact, "password": password}),
+            ("GET", f"/users/verify/{contact}", None),
+        ):
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=body)
+                ok = resp.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            stats["latencies"].append(time.perf_counter() - start)
+            stats["ok" if ok else "errors"] += 1
+
+
+async def run_level(base_url: str, contact: str, password: str, concurrency: int, duration: float) -> dict:
+    stats = {"latencies": [], "ok": 0, "errors": 0}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            client_loop(client, contact, password, deadline, stats) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": stats["ok"] + stats["errors"],
+        "errors": stats["errors"],
+        **latency_summary(stats["latencies"], elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--contact", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", default="50,200,1000", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per level")
+    parser.add_argument("--label", default="", help="Free-form tag stored with the results, e.g. 'async'")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for level in [int(c) for c in args.concurrency.split(",")]:
+        result = asyncio.run(run_level(args.base_url, args.contact, args.password, level, args.duration))
+        print(
+            f"{level:>5} clients: {result.get('throughput_rps', 0):>8} req/s  "
+            f"p50 {result.get('p50_ms')} ms  p95 {result.get('p95_ms')} ms  errors {result['errors']}"
+        )
+        results.append(result)
+
+    write_results(
+        args.output, "load_async", results,
+        label=args.label, base_url=args.base_url, duration=args.duration,
+    )
+
+
+if __name__ == "__main__":
+    main()
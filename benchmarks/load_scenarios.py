@@ -0,0 +1,252 @@
+# benchmarks/load_scenarios.py
+"""
+HTTP load scenarios over datagen.py data.
+
+Against a running server (generate first, and keep SMS off while loading):
+    python benchmarks/datagen.py --database-url sqlite:///bench.db --output manifest.json
+    DATABASE_URL=sqlite:///bench.db SMS_DRY_RUN=1 ADMISSION_LOGIN_IP=100000/1 uvicorn main:app --workers 1
+    python benchmarks/load_scenarios.py --manifest manifest.json --output load.json
+
+Fully offline (temporary SQLite database, app called through ASGI in this process):
+    python benchmarks/load_scenarios.py --in-process --users 500 --output load.json
+
+Scenarios (--scenarios, comma-separated):
+  resident   each client logs in as its own resident, then polls its profile,
+             requests and notifications (--batch: the three GETs as one POST /batch)
+  staff      dashboard refresh: request/user stats, review queue, pending requests
+  bulk       secretaries approving Pending requests via /document-requests/status/bulk,
+             --bulk-size at a time, until the pending pool runs out
+
+All clients come from one address, hence the raised per-IP login limit above.
+Every concurrency level runs each scenario for --duration seconds; results are
+per operation (latency percentiles, status codes, errors). In-process numbers
+include the client's own overhead on the same event loop, so compare them with
+other in-process runs only.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import latency_summary, write_results  # noqa: E402
+
+SCENARIOS = ("resident", "staff", "bulk")
+
+
+class Recorder:
+    """Latencies and status codes per operation name."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name] += 1
+            self.statuses[name][type(e).__name__] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        self.statuses[name][str(resp.status_code)] += 1
+        if resp.status_code >= 400:
+            self.errors[name] += 1
+        return resp
+
+    def summary(self, elapsed: float) -> dict:
+        operations = {
+            name: {**latency_summary(values, elapsed), "errors": self.errors[name], "statuses": dict(self.statuses[name])}
+            for name, values in sorted(self.latencies.items())
+        }
+        # Logins are set-up, not the traffic being measured
+        measured = [name for name in self.latencies if name != "login"]
+        everything = [v for name in measured for v in self.latencies[name]]
+        errors = sum(self.errors[name] for name in measured)
+        return {"overall": {**latency_summary(everything, elapsed), "errors": errors}, "operations": operations}
+
+
+async def login(client, rec: Recorder, contact: str, password: str):
+    resp = await rec.call(client, "login", "POST", "/users/login", json={"contact": contact, "password": password})
+    if resp is None or resp.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+# ======================================================
+# 🎬 SCENARIOS (one client each)
+# ======================================================
+async def resident_client(client, rec, ctx, n, deadline):
+    resident = ctx["manifest"]["residents"][n % len(ctx["manifest"]["residents"])]
+    headers = await login(client, rec, resident["contact"], ctx["manifest"]["password"])
+    if headers is None:
+        return
+    user_id, contact = resident["id"], resident["contact"]
+    while time.perf_counter() < deadline:
+        if ctx["batch"]:
+            await rec.call(client, "poll_batch", "POST", "/batch", headers=headers, json={"requests": [
+                {"path": f"/users/{user_id}"},
+                {"path": "/document-requests/", "params": {"contact": contact}},
+                {"path": "/notifications/", "params": {"user_id": user_id}},
+            ]})
+        else:
+            await rec.call(client, "profile", "GET", f"/users/{user_id}", headers=headers)
+            await rec.call(client, "my_requests", "GET", "/document-requests/", params={"contact": contact}, headers=headers)
+            await rec.call(client, "notifications", "GET", "/notifications/", params={"user_id": user_id}, headers=headers)
+
+
+async def staff_client(client, rec, ctx, n, deadline):
+    headers = ctx["staff_headers"].get("secretary" if n % 2 == 0 else "captain")
+    if headers is None:
+        return
+    while time.perf_counter() < deadline:
+        await rec.call(client, "stats_requests", "GET", "/stats/requests", headers=headers)
+        await rec.call(client, "stats_users", "GET", "/stats/users", headers=headers)
+        await rec.call(client, "review_queue", "GET", "/review-queue", params={"limit": 50}, headers=headers)
+        await rec.call(client, "pending_requests", "GET", "/document-requests/", params={"status": "Pending"}, headers=headers)
+
+
+async def bulk_client(client, rec, ctx, n, deadline):
+    staff, headers = ctx["manifest"]["staff"]["secretary"], ctx["staff_headers"].get("secretary")
+    if headers is None:
+        return
+    pending = ctx["pending"]
+    while pending and time.perf_counter() < deadline:
+        ids = [pending.pop() for _ in range(min(ctx["bulk_size"], len(pending)))]
+        await rec.call(client, "bulk_approve", "POST", "/document-requests/status/bulk", headers=headers, json={
+            "items": [{"id": i, "status": "Approved", "action": "Approved"} for i in ids],
+            "performed_by_id": staff["id"],
+        })
+
+
+CLIENTS = {"resident": resident_client, "staff": staff_client, "bulk": bulk_client}
+
+
+async def pending_ids(client, headers) -> list:
+    resp = await client.get("/document-requests/", params={"status": "Pending"}, headers=headers)
+    resp.raise_for_status()
+    return sorted((r["id"] for r in resp.json()), reverse=True)
+
+
+async def run_level(make_client, scenario: str, concurrency: int, duration: float, ctx: dict) -> dict:
+    rec = Recorder()
+    async with make_client(concurrency) as client:
+        if scenario != "resident":
+            # Staff share one session per role, as the office's two accounts do
+            ctx["staff_headers"] = {
+                role: await login(client, rec, staff["contact"], ctx["manifest"]["password"])
+                for role, staff in ctx["manifest"]["staff"].items()
+            }
+        if scenario == "bulk" and ctx["pending"] is None:
+            ctx["pending"] = await pending_ids(client, ctx["staff_headers"]["secretary"])
+        if scenario == "bulk" and not ctx["pending"]:
+            return {"scenario": scenario, "concurrency": concurrency, "skipped": "no Pending requests left"}
+        pending_before = len(ctx["pending"] or [])
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[CLIENTS[scenario](client, rec, ctx, n, deadline) for n in range(concurrency)])
+        elapsed = time.perf_counter() - started
+    result = {"scenario": scenario, "concurrency": concurrency, "elapsed_s": round(elapsed, 2), **rec.summary(elapsed)}
+    if scenario == "bulk":
+        result["approved_attempted"] = pending_before - len(ctx["pending"])
+        result["pool_exhausted"] = not ctx["pending"]
+    return result
+
+
+async def run_all(make_client, scenarios, levels, duration: float, ctx: dict, in_process: bool) -> list:
+    results = []
+    try:
+        for scenario in scenarios:
+            for level in levels:
+                result = await run_level(make_client, scenario, level, duration, ctx)
+                if "skipped" in result:
+                    print(f"{scenario:>8} {level:>5} clients: skipped ({result['skipped']})")
+                    results.append(result)
+                    continue
+                overall = result["overall"]
+                print(
+                    f"{scenario:>8} {level:>5} clients: {overall.get('throughput_rps', 0):>8} req/s  "
+                    f"p50 {overall.get('p50_ms')} ms  p95 {overall.get('p95_ms')} ms  errors {overall['errors']}"
+                )
+                results.append(result)
+    finally:
+        if in_process:
+            # Close the app's async pools on this loop (aiosqlite threads would keep the process alive)
+            import database
+            for eng in (database.async_engine, database.async_replica_engine):
+                if eng is not None:
+                    await eng.dispose()
+    return results
+
+
+def client_factory(args):
+    if args.in_process:
+        from main import app
+        transport = httpx.ASGITransport(app=app)
+        return lambda n: httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+    return lambda n: httpx.AsyncClient(
+        base_url=args.base_url, timeout=60,
+        limits=httpx.Limits(max_connections=n, max_keepalive_connections=n),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default=None, help="datagen.py --output of the server's database")
+    parser.add_argument("--in-process", action="store_true", help="Generate a temporary SQLite database and call the app directly")
+    parser.add_argument("--users", type=int, default=500, help="--in-process: residents to generate")
+    parser.add_argument("--seed", type=int, default=42, help="--in-process: datagen seed")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="10,50", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario and level")
+    parser.add_argument("--bulk-size", type=int, default=25, help="Requests per bulk approval")
+    parser.add_argument("--batch", action="store_true", help="resident: poll with one POST /batch")
+    parser.add_argument("--label", default="", help="Free-form tag stored with the results")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    if args.in_process:
+        os.environ.setdefault("SMS_DRY_RUN", "1")
+        os.environ.setdefault("ADMISSION_LOGIN_IP", "100000/1")  # every simulated resident logs in from one address
+        from benchmarks.datagen import generate
+        workdir = tempfile.mkdtemp(prefix="bench-")
+        manifest = generate(f"sqlite:///{workdir}/bench.db", users=args.users, seed=args.seed, residents=1000, photo_kb=60)
+    elif args.manifest:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+    else:
+        parser.error("pass --manifest (from datagen.py) or --in-process")
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    make_client = client_factory(args)
+    ctx = {"manifest": manifest, "batch": args.batch, "bulk_size": args.bulk_size, "pending": None}
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = asyncio.run(run_all(make_client, scenarios, levels, args.duration, ctx, args.in_process))
+
+    write_results(
+        args.output, "load_scenarios", results,
+        label=args.label, target="in-process" if args.in_process else args.base_url,
+        seed=manifest.get("seed"), data=manifest.get("counts"), concurrency=args.concurrency,
+        duration=args.duration, bulk_size=args.bulk_size, batch=args.batch,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/microbench.py
+"""
+Micro-benchmarks for per-row helpers on the hot request paths.
+
+    python benchmarks/microbench.py --output micro.json
+
+Each case is timed with timeit (best of --repeat runs) and reported in
+microseconds per call:
+  normalize_contact    users (strict) and document_requests variants, mixed input formats
+  safe_dob             datetime passthrough and ISO string parsing
+  document_request_response
+                       ORM row -> response schema, with small and --photo-kb photos
+"""
+import argparse
+import base64
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")  # the route modules import the database module
+
+from benchmarks.harness import write_results  # noqa: E402
+
+CONTACTS = ["09171234567", "+639171234567", "639171234567", "0917 123 4567", "0917-123-4567"]
+
+
+def request_row(photo: str):
+    from models import DocumentRequestDB, UserDB
+
+    now = datetime(2025, 6, 30, 9, 30, tzinfo=timezone.utc)
+    user = UserDB(
+        id=7, first_name="Maria", middle_name="Santos", last_name="Dela Cruz", dob=datetime(1987, 3, 4),
+        gender="Female", civil_status="Married", contact="09171234567", purok="Centro", barangay="Tilhaong",
+        city="Consolacion", province="Cebu", postal_code="6001", password="x", photo=photo,
+        role="resident", status="Approved",
+    )
+    return DocumentRequestDB(
+        id=42, document_type="Barangay Clearance", purpose="employment", copies=1, photo=photo,
+        authorization_photo=photo, status="Pending", action="Review", contact="09171234567",
+        user_id=7, user=user, created_at=now, updated_at=now, is_deleted=False,
+    )
+
+
+def bench(fn, number: int, repeat: int) -> float:
+    """Best microseconds per call."""
+    return round(min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--photo-kb", type=float, default=120, help="Photo size for the large-row case")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    from routes import document_requests, users
+
+    rng = random.Random(42)
+    large_photo = "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(int(args.photo_kb * 1024))).decode()
+    small_row, large_row = request_row("photo.png"), request_row(large_photo)
+    n, r = args.number, args.repeat
+
+    results = {
+        "normalize_contact_users_us": bench(lambda: [users.normalize_contact(c) for c in CONTACTS], n, r) / len(CONTACTS),
+        "normalize_contact_requests_us": bench(
+            lambda: [document_requests.normalize_contact(c) for c in CONTACTS], n, r
+        ) / len(CONTACTS),
+        "safe_dob_datetime_us": bench(lambda: users.safe_dob(datetime(1987, 3, 4)), n, r),
+        "safe_dob_string_us": bench(lambda: users.safe_dob("1987-03-04T00:00:00"), n, r),
+        "document_request_response_small_us": bench(lambda: document_requests.document_request_response(small_row), n // 10, r),
+        "document_request_response_large_us": bench(lambda: document_requests.document_request_response(large_row), n // 10, r),
+    }
+    results = {key: round(value, 3) for key, value in results.items()}
+    for key, value in results.items():
+        print(f"{key:>36}: {value}")
+    write_results(args.output, "microbench", results, number=n, repeat=r, photo_kb=args.photo_kb)
+
+
+if __name__ == "__main__":
+    main()
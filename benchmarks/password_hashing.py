@@ -0,0 +1,93 @@
+# benchmarks/password_hashing.py
+"""
+Password verification throughput (logins/sec) on the KDF worker pool.
+
+Runs in-process, no server needed:
+    python benchmarks/password_hashing.py --workers 1,2,4 --duration 10
+
+For each worker count the pool is saturated with verify_password_async calls
+for --duration seconds. Reports verifications/sec overall and per worker
+(≈ per core for the thread pool, since hashlib.scrypt releases the GIL), plus
+the cost of a single hash. Use --n/--r/--p to size the scrypt parameters
+against a latency budget before changing PASSWORD_SCRYPT_* in production.
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import latency_summary, write_results  # noqa: E402
+
+
+def load_passwords_module(workers: int, pool: str, n: int, r: int, p: int):
+    os.environ.update({
+        "PASSWORD_WORKERS": str(workers),
+        "PASSWORD_POOL": pool,
+        "PASSWORD_SCRYPT_N": str(n),
+        "PASSWORD_SCRYPT_R": str(r),
+        "PASSWORD_SCRYPT_P": str(p),
+    })
+    import utils.passwords as passwords
+    return importlib.reload(passwords)
+
+
+async def run_level(passwords, duration: float) -> dict:
+    stored = passwords.hash_password("benchmark-password")
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            assert await passwords.verify_password_async("benchmark-password", stored)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    # Enough clients to keep every worker busy without tripping the queue limit
+    await asyncio.gather(*[client() for _ in range(min(passwords.MAX_QUEUE, passwords.WORKERS * 2))])
+    elapsed = time.perf_counter() - started
+
+    per_second = len(latencies) / elapsed
+    return {
+        "workers": passwords.WORKERS,
+        "verifications": len(latencies),
+        "logins_per_sec": round(per_second, 1),
+        "logins_per_sec_per_worker": round(per_second / passwords.WORKERS, 1),
+        **latency_summary(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=str(os.cpu_count() or 1), help="Comma-separated pool sizes")
+    parser.add_argument("--pool", default="thread", choices=("thread", "process"))
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per pool size")
+    parser.add_argument("--n", type=int, default=2 ** 14)
+    parser.add_argument("--r", type=int, default=8)
+    parser.add_argument("--p", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for workers in [int(w) for w in args.workers.split(",")]:
+        passwords = load_passwords_module(workers, args.pool, args.n, args.r, args.p)
+        result = asyncio.run(run_level(passwords, args.duration))
+        print(
+            f"{workers:>3} workers: {result['logins_per_sec']:>8} logins/s  "
+            f"{result['logins_per_sec_per_worker']:>7} /worker  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms"
+        )
+        results.append(result)
+        passwords._get_executor().shutdown(wait=True)
+
+    write_results(
+        args.output, "password_hashing", results,
+        pool=args.pool, scrypt={"n": args.n, "r": args.r, "p": args.p}, duration=args.duration,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/run_all.py
+"""
+Run every offline benchmark and merge the results into one file.
+
+    python benchmarks/run_all.py --output results-$(git rev-parse --short HEAD).json
+    python benchmarks/compare.py results-old.json results-new.json
+
+Needs no server or network: the HTTP scenarios run in-process on a temporary
+SQLite database built by datagen.py (same seed every run). --quick shrinks
+every suite to a smoke test. Each suite runs in its own interpreter so module
+settings (pool sizes, env) don't leak between them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import REPO_ROOT, write_results  # noqa: E402
+
+# suite -> (full arguments, --quick arguments)
+SUITES = {
+    "microbench": ([], ["--number", "2000", "--repeat", "3"]),
+    "certificate_rendering": ([], ["--certificates", "200"]),
+    "census_analytics": (["--with-db"], ["--residents", "20000", "--repeat", "2"]),
+    "password_hashing": (["--duration", "5"], ["--duration", "1"]),
+    "load_scenarios": (
+        ["--in-process", "--users", "2000", "--concurrency", "10,50", "--duration", "10"],
+        ["--in-process", "--users", "200", "--concurrency", "5", "--duration", "2"],
+    ),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma-separated subset to run")
+    parser.add_argument("--quick", action="store_true", help="Small sizes, for checking the suite itself")
+    parser.add_argument("--output", default=None, help="Write merged results as JSON to this file")
+    args = parser.parse_args()
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    merged, failed = {}, []
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        for suite in suites:
+            full, quick = SUITES[suite]
+            path = os.path.join(workdir, f"{suite}.json")
+            command = [sys.executable, os.path.join(REPO_ROOT, "benchmarks", f"{suite}.py"), *(quick if args.quick else full), "--output", path]
+            print(f"== {suite}", flush=True)
+            started = time.perf_counter()
+            if subprocess.run(command, cwd=REPO_ROOT).returncode != 0 or not os.path.exists(path):
+                failed.append(suite)
+                continue
+            with open(path) as f:
+                result = json.load(f)
+            merged[suite] = {"parameters": result.get("parameters"), "results": result["results"]}
+            print(f"   ({time.perf_counter() - started:.1f}s)", flush=True)
+
+    write_results(args.output, "all", merged, quick=args.quick, failed=failed)
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
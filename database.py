@@ -1,21 +1,335 @@
 # database.py
+import asyncio
 import os
-from sqlalchemy import create_engine
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+from db_config import settings, install_sql_logging
+from utils.read_routing import prefer_primary
+from utils.metrics import track_engine_pool, untrack_engine_pool
+from utils.slow_query import register_async_engine, unregister_async_engine
+from utils.tenancy import Tenant, current_tenant
 
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.url
+MAX_TENANT_ENGINES = int(os.getenv("MAX_TENANT_ENGINES", 20))
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The default tenant's engines (DATABASE_URL / DB_REPLICA_URL)
+engine = create_engine(DATABASE_URL, **settings.engine_kwargs(DATABASE_URL))
+install_sql_logging(engine)
+track_engine_pool("primary", engine)
 Base = declarative_base()
 
+# ✅ Read replica (falls back to the primary when DB_REPLICA_URL is not set)
+if settings.replica_url:
+    replica_engine = create_engine(settings.replica_url, **settings.engine_kwargs(settings.replica_url))
+    install_sql_logging(replica_engine)
+    track_engine_pool("replica", replica_engine)
+else:
+    replica_engine = None
+
+
+# ---------------------------
+# Async engine (asyncpg for PostgreSQL, aiosqlite for SQLite)
+# ---------------------------
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str, override_env: str = "ASYNC_DATABASE_URL") -> str:
+    """Derive the async driver URL unless an explicit override is set."""
+    override = os.getenv(override_env) if override_env else None
+    if override:
+        return override
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _create_async_engine(async_url: str, name: str, search_path: str = None):
+    async_eng = create_async_engine(async_url, **settings.engine_kwargs(async_url, search_path))
+    install_sql_logging(async_eng.sync_engine)
+    track_engine_pool(name, async_eng.sync_engine)
+    register_async_engine(async_eng)
+    return async_eng
+
+
+# Created on first use so scripts that only need the sync engine
+# (seeders, migrations) don't require the async drivers to be installed.
+async_engine = None
+async_replica_engine = None
+_async_lock = threading.Lock()
+
+
+def _default_async_engine(replica: bool):
+    global async_engine, async_replica_engine
+    with _async_lock:
+        if replica and settings.replica_url:
+            if async_replica_engine is None:
+                async_replica_engine = _create_async_engine(
+                    async_database_url(settings.replica_url, "ASYNC_DB_REPLICA_URL"), "async_replica"
+                )
+            return async_replica_engine
+        if async_engine is None:
+            async_engine = _create_async_engine(async_database_url(DATABASE_URL), "async_primary")
+        return async_engine
+
+
+# ---------------------------
+# Per-tenant engines (one pool per tenant and role, LRU-evicted)
+# ---------------------------
+ROLES = ("primary", "replica", "async_primary", "async_replica")
+
+
+def _create_tenant_engine(tenant: Tenant, role: str):
+    replica = role.endswith("replica")
+    if tenant.database_url:
+        url = (tenant.replica_url if replica else None) or tenant.database_url
+    else:  # schema on the shared server
+        url = (tenant.replica_url or settings.replica_url if replica else None) or DATABASE_URL
+    name = f"{tenant.slug}:{role}"
+    if role.startswith("async"):
+        return _create_async_engine(async_database_url(url, override_env=None), name, tenant.schema)
+    eng = create_engine(url, **settings.engine_kwargs(url, tenant.schema))
+    install_sql_logging(eng)
+    track_engine_pool(name, eng)
+    return eng
+
+
+def _dispose_engine(eng):
+    if hasattr(eng, "sync_engine"):
+        untrack_engine_pool(eng.sync_engine)
+        unregister_async_engine(eng)
+        try:
+            asyncio.get_running_loop().create_task(eng.dispose())
+        except RuntimeError:
+            eng.sync_engine.dispose()
+    else:
+        untrack_engine_pool(eng)
+        eng.dispose()  # idle connections close now; checked-out ones close when returned
+
+
+class TenantEngineCache:
+    """
+    Engines for tenants with their own database or schema, at most `max_engines`
+    per worker; the least recently used is disposed to release its connections.
+    """
+
+    def __init__(self, max_engines: int = MAX_TENANT_ENGINES):
+        self.max_engines = max_engines
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant: Tenant, role: str):
+        key = (tenant.slug, role)
+        with self._lock:
+            eng = self._engines.get(key)
+            if eng is not None:
+                self._engines.move_to_end(key)
+                return eng
+            eng = self._engines[key] = _create_tenant_engine(tenant, role)
+            while len(self._engines) > self.max_engines:
+                _, evicted = self._engines.popitem(last=False)
+                _dispose_engine(evicted)
+            return eng
+
+    def __len__(self):
+        return len(self._engines)
+
+
+tenant_engines = TenantEngineCache()
+
+
+def tenant_engine(tenant: Tenant, role: str = "primary"):
+    """Engine serving `role` for a tenant (an AsyncEngine for the async roles)."""
+    if not tenant.uses_default_database:
+        return tenant_engines.get(tenant, role)
+    if role == "primary":
+        return engine
+    if role == "replica":
+        return replica_engine or engine
+    return _default_async_engine(replica=role == "async_replica")
+
+
+def prepare_tenant_database(tenant: Tenant):
+    """Create the tenant's schema (if schema-based) and any missing tables."""
+    eng = tenant_engine(tenant)
+    if tenant.schema:
+        with eng.begin() as conn:
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{tenant.schema}"'))
+    Base.metadata.create_all(bind=eng)
+
+
+# ---------------------------
+# Sessions (bound to the tenant current when they are opened)
+# ---------------------------
+class TenantSession(Session):
+    engine_role = "primary"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.info.setdefault("tenant", current_tenant())
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        eng = tenant_engine(self.info["tenant"], self.engine_role)
+        return getattr(eng, "sync_engine", eng)
+
+
+class TenantReadSession(TenantSession):
+    engine_role = "replica"
+
+
+class TenantAsyncSession(TenantSession):
+    engine_role = "async_primary"
+
+
+class TenantAsyncReadSession(TenantSession):
+    engine_role = "async_replica"
+
+
+SessionLocal = sessionmaker(class_=TenantSession, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(class_=TenantReadSession, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(sync_session_class=TenantAsyncSession, expire_on_commit=False, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(sync_session_class=TenantAsyncReadSession, expire_on_commit=False, autoflush=False)
+
+
+# ---------------------------
+# Batch sessions (POST /batch: every sub-request reads one snapshot)
+# ---------------------------
+class BatchSessions:
+    """
+    The sessions shared by the sub-requests of one batch, opened on first use.
+    Sync and async routes can't share a Session object, so on PostgreSQL both
+    run REPEATABLE READ, READ ONLY transactions and the second one imports the
+    first one's exported snapshot: every sub-request sees the same data.
+    """
+
+    def __init__(self):
+        self.primary = prefer_primary()
+        self.sync: Optional[Session] = None
+        self.async_: Optional[AsyncSession] = None
+        self.snapshot_id: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _begin_sql(self) -> list:
+        statements = ["SET TRANSACTION READ ONLY"]
+        if self.snapshot_id:
+            statements.append(f"SET TRANSACTION SNAPSHOT '{self.snapshot_id}'")
+        return statements
+
+    def sync_session(self) -> Session:
+        with self._lock:
+            if self.sync is None:
+                db = SessionLocal() if self.primary else ReadSessionLocal()
+                if db.get_bind().dialect.name == "postgresql":
+                    conn = db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                    for statement in self._begin_sql():
+                        conn.exec_driver_sql(statement)
+                    if self.snapshot_id is None:
+                        self.snapshot_id = conn.exec_driver_sql("SELECT pg_export_snapshot()").scalar()
+                self.sync = db
+            return self.sync
+
+    async def async_session(self) -> AsyncSession:
+        if self.async_ is None:
+            db = (get_async_sessionmaker() if self.primary else get_async_read_sessionmaker())()
+            if db.sync_session.get_bind().dialect.name == "postgresql":
+                conn = await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                for statement in self._begin_sql():
+                    await conn.exec_driver_sql(statement)
+                if self.snapshot_id is None:
+                    self.snapshot_id = (await conn.exec_driver_sql("SELECT pg_export_snapshot()")).scalar()
+            self.async_ = db
+        return self.async_
+
+    async def close(self):
+        if self.async_ is not None:
+            await self.async_.close()
+        if self.sync is not None:
+            self.sync.close()
+
+
+_batch: ContextVar[Optional[BatchSessions]] = ContextVar("db_batch", default=None)
+
+
+@asynccontextmanager
+async def batch_sessions():
+    """Route every session dependency opened inside the block to one shared snapshot."""
+    batch = BatchSessions()
+    token = _batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _batch.reset(token)
+        await batch.close()
+
+
 # ✅ Database dependency (can be imported anywhere)
 def get_db():
+    batch = _batch.get()
+    if batch is not None:
+        yield batch.sync_session()
+        return
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ✅ Read-only dependency: replica, unless this client wrote in the last few seconds
+def get_read_db():
+    batch = _batch.get()
+    if batch is not None:
+        yield batch.sync_session()
+        return
+    db = SessionLocal() if prefer_primary() else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    return AsyncSessionLocal
+
+
+def get_async_read_sessionmaker() -> async_sessionmaker:
+    return AsyncReadSessionLocal
+
+
+# ✅ Async database dependency for `async def` routes
+async def get_async_db():
+    batch = _batch.get()
+    if batch is not None:
+        yield await batch.async_session()
+        return
+    db: AsyncSession = get_async_sessionmaker()()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# ✅ Async read-only dependency (replica routing, same stickiness rules as get_read_db)
+async def get_async_read_db():
+    batch = _batch.get()
+    if batch is not None:
+        yield await batch.async_session()
+        return
+    factory = get_async_sessionmaker() if prefer_primary() else get_async_read_sessionmaker()
+    db: AsyncSession = factory()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,129 @@
+# db_config.py
+import logging
+import os
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+load_dotenv()
+
+sql_logger = logging.getLogger("sql")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+# ======================================================
+# ⚙️ DATABASE RUNTIME SETTINGS
+# ======================================================
+@dataclass(frozen=True)
+class DBSettings:
+    """
+    Engine settings read from the environment:
+
+    DATABASE_URL             primary database
+    DB_REPLICA_URL           optional read replica for read-only routes
+    DB_POOL_SIZE             persistent connections per worker (default 5)
+    DB_MAX_OVERFLOW          extra connections allowed under burst (default 10)
+    DB_POOL_TIMEOUT          seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE          seconds before a connection is replaced (default 1800)
+    DB_POOL_PRE_PING         test connections on checkout (default true)
+    DB_STATEMENT_TIMEOUT_MS  PostgreSQL statement_timeout, 0 = none (default 0)
+    DB_SQL_LOG               off | on | sample (default off)
+    DB_SQL_LOG_SAMPLE_RATE   fraction of statements logged in sample mode (default 0.01)
+    DB_REPLICA_STICKY_SECONDS  reads go to the primary this long after a client writes (default 5)
+    """
+    url: str
+    replica_url: Optional[str] = None
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: int = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_timeout_ms: int = 0
+    sql_log: str = "off"
+    sql_log_sample_rate: float = 0.01
+    replica_sticky_seconds: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "DBSettings":
+        return cls(
+            url=os.getenv("DATABASE_URL"),
+            replica_url=os.getenv("DB_REPLICA_URL") or None,
+            pool_size=_env_int("DB_POOL_SIZE", 5),
+            max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+            pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+            pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+            pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+            statement_timeout_ms=_env_int("DB_STATEMENT_TIMEOUT_MS", 0),
+            sql_log=os.getenv("DB_SQL_LOG", "off").strip().lower(),
+            sql_log_sample_rate=_env_float("DB_SQL_LOG_SAMPLE_RATE", 0.01),
+            replica_sticky_seconds=_env_float("DB_REPLICA_STICKY_SECONDS", 5.0),
+        )
+
+    def engine_kwargs(self, url: str, search_path: Optional[str] = None) -> dict:
+        """
+        Keyword arguments for create_engine / create_async_engine for the given URL.
+        `search_path` pins every connection to one PostgreSQL schema (schema-per-tenant).
+        """
+        parsed = make_url(url)
+        backend = parsed.get_backend_name()
+        kwargs = {"echo": False}
+        if search_path and backend != "postgresql":
+            raise ValueError("Schema-per-tenant requires PostgreSQL; give the tenant a database_url instead")
+        if backend == "sqlite":
+            return kwargs  # SQLite picks its own pool; pool sizing doesn't apply
+
+        from utils.metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
+
+        is_async = parsed.get_driver_name() in ("asyncpg", "aiosqlite", "aiomysql")
+        kwargs.update(
+            poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+        )
+        server_settings = {}
+        if backend == "postgresql" and self.statement_timeout_ms > 0:
+            server_settings["statement_timeout"] = str(self.statement_timeout_ms)
+        if search_path:
+            server_settings["search_path"] = search_path
+        if server_settings:
+            if parsed.get_driver_name() == "asyncpg":
+                kwargs["connect_args"] = {"server_settings": server_settings}
+            else:
+                kwargs["connect_args"] = {"options": " ".join(f"-c {k}={v}" for k, v in server_settings.items())}
+        return kwargs
+
+
+settings = DBSettings.from_env()
+
+
+# ======================================================
+# 📝 SQL STATEMENT LOGGING (off / on / sampled)
+# ======================================================
+def install_sql_logging(engine, db_settings: DBSettings = settings):
+    """Log statements through the `sql` logger instead of engine echo to stdout."""
+    if db_settings.sql_log == "off":
+        return
+    rate = 1.0 if db_settings.sql_log == "on" else db_settings.sql_log_sample_rate
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _log_statement(conn, cursor, statement, parameters, context, executemany):
+        if rate >= 1.0 or random.random() < rate:
+            sql_logger.info(statement)
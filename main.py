@@ -1,13 +1,32 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from routes import users, document_requests, notifications, secretary
-from database import Base, engine
+from routes import users, document_requests, notifications, secretary, exports, sync, review_queue, admin, stats, batch, certificates
+from database import prepare_tenant_database
 from seed_admins import seed_admins
+from utils.idempotency import IdempotencyMiddleware
+from utils.read_routing import ReadYourWritesMiddleware
+from db_config import settings as db_settings
+from utils.metrics import MetricsMiddleware, render_metrics
+from utils.query_budget import QueryBudgetMiddleware
+from utils.logging_setup import configure_logging, RequestIdMiddleware
+from utils.tracing import TracingMiddleware, instrument_fastapi_serialization
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from utils.admission import TRUSTED_PROXIES, AdmissionControlMiddleware
+from utils.tenancy import TenantMiddleware, all_tenants, use_tenant
+from utils.invalidation import start_listeners, stop_listeners
 
 # ---------------------------
-# Database initialization
+# Logging (JSON records, written by a background thread)
 # ---------------------------
-Base.metadata.create_all(bind=engine)
+configure_logging()
+logger = logging.getLogger("main")
+
+# ---------------------------
+# Database initialization (every hosted barangay's database or schema)
+# ---------------------------
+for tenant in all_tenants():
+    prepare_tenant_database(tenant)
 
 # ---------------------------
 # FastAPI app setup
@@ -35,14 +54,67 @@ origins = [
 ]
 
 
+# ---------------------------
+# Idempotency-Key support for retried mobile POSTs
+# ---------------------------
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=["/document-requests/", "/document-requests/status", "/document-requests/status/bulk", "/users/"],
+)
+
+# ---------------------------
+# Per-request query budget / N+1 detection (QUERY_BUDGET_MODE=warn|raise)
+# ---------------------------
+app.add_middleware(QueryBudgetMiddleware)
+
+# ---------------------------
+# Read replica stickiness (reads follow the client's own writes)
+# ---------------------------
+app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=db_settings.replica_sticky_seconds)
+
+# ---------------------------
+# Admission control: rate limits on login/OTP/verify + global concurrency cap
+# (inside CORS so 429/503 responses still carry CORS headers)
+# ---------------------------
+app.add_middleware(AdmissionControlMiddleware)
+
+# ---------------------------
+# Tenant (barangay) resolution: X-Barangay header, Host subdomain or token claim
+# (wraps everything that opens a session, so each request hits its barangay's database)
+# ---------------------------
+app.add_middleware(TenantMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,      # explicitly list origins
     allow_credentials=True,     # allow cookies and auth headers
     allow_methods=["*"],        # allow all HTTP methods
     allow_headers=["*"],        # allow all headers including Authorization
+    expose_headers=["Retry-After"],
 )
 
+# ---------------------------
+# Request metrics (outermost, so it sees the full request time)
+# ---------------------------
+app.add_middleware(MetricsMiddleware)
+
+# ---------------------------
+# Request ids on every log record (X-Request-ID in and out)
+# ---------------------------
+app.add_middleware(RequestIdMiddleware)
+
+# ---------------------------
+# Tracing (head-sampled; TRACE_SAMPLE_RATE / traceparent from TRACE_TRUSTED_PARENTS)
+# ---------------------------
+app.add_middleware(TracingMiddleware)
+instrument_fastapi_serialization()
+
+# ---------------------------
+# Client address from X-Forwarded-For, but only when the peer is a TRUSTED_PROXIES hop
+# (outermost, so rate limits, stickiness and logs all see the same address)
+# ---------------------------
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=TRUSTED_PROXIES)
+
 # ---------------------------
 # Root endpoints
 # ---------------------------
@@ -54,6 +126,11 @@ def read_root():
 def ping():
     return {"message": "Backend is alive!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, DB, pool and SMS metrics."""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ---------------------------
 # Routers
 # ---------------------------
@@ -61,6 +138,13 @@ app.include_router(users.router)
 app.include_router(document_requests.router)
 app.include_router(notifications.router)
 app.include_router(secretary.router)
+app.include_router(exports.router)
+app.include_router(sync.router)
+app.include_router(review_queue.router)
+app.include_router(admin.router)
+app.include_router(stats.router)
+app.include_router(batch.router)
+app.include_router(certificates.router)
 
 # ---------------------------
 # Startup event
@@ -68,9 +152,15 @@ app.include_router(secretary.router)
 @app.on_event("startup")
 def startup_tasks():
     """Tasks that run when the backend starts."""
-    seed_admins()
-    print("✅ Startup complete — routes loaded:")
-    for route in app.routes:
-        if hasattr(route, "methods"):
-            print(f"  {route.path} → {list(route.methods)}")
-    print("🚀 Backend running and CORS configured for localhost + EC2")
+    for tenant in all_tenants():
+        with use_tenant(tenant):
+            seed_admins()
+    start_listeners()
+    routes = [f"{route.path} {sorted(route.methods)}" for route in app.routes if hasattr(route, "methods")]
+    logger.info("Startup complete", extra={"route_count": len(routes)})
+    logger.debug("Routes loaded", extra={"routes": routes})
+
+
+@app.on_event("shutdown")
+def shutdown_tasks():
+    stop_listeners()
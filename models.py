@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import BigInteger, Column, Integer, SmallInteger, String, Text, ForeignKey, DateTime, Boolean, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -24,8 +24,9 @@ class UserDB(Base):
     password = Column(String, nullable=False)
     photo = Column(Text, nullable=True)  # ✅ make nullable=True for flexibility
     role = Column(String, nullable=False, default="Resident")  # ✅ default role
-    status = Column(String, default="Pending", nullable=False)
+    status = Column(String, default="Pending", nullable=False, index=True)
     pending_updates = Column(JSON, nullable=True)
+    # Legacy OTP columns; codes now live in the OTP store (otp_codes / utils.otp_store)
     new_contact_temp = Column(String, nullable=True)
     new_contact_otp = Column(String, nullable=True)
     new_contact_otp_created_at = Column(DateTime, nullable=True)
@@ -70,6 +71,26 @@ class DocumentRequestDB(Base):
 
     user = relationship("UserDB", back_populates="document_requests")
 
+    __table_args__ = (
+        Index("ix_document_requests_status_deleted_created", "status", "is_deleted", "created_at"),
+    )
+
+
+# ---------------- Document Request Events (append-only status history) ----------------
+class DocumentRequestEventDB(Base):
+    __tablename__ = "document_request_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    request_id = Column(Integer, ForeignKey("document_requests.id", ondelete="CASCADE"), nullable=False)
+    status = Column(SmallInteger, nullable=False)  # code from utils.request_events.STATUS_CODES
+    actor_id = Column(Integer, nullable=True)      # staff (or resident) who made the change; no FK so history outlives users
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_document_request_events_request_id", "request_id", "id"),
+        Index("ix_document_request_events_status_created", "status", "created_at"),
+    )
+
 
 # ---------------- Notifications Table ----------------
 class NotificationDB(Base):
@@ -100,3 +121,60 @@ class ResidentMasterlistDB(Base):
     city = Column(String, nullable=True)
     province = Column(String, nullable=True)
     number_of_years = Column(Integer, nullable=True)
+    natural_key = Column(String(64), unique=True, index=True, nullable=True)  # ✅ hash of name + DOB for dedupe
+
+# ---------------- Change Log Table (offline sync) ----------------
+class ChangeLogDB(Base):
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # ✅ monotonically increasing sync token
+    entity = Column(String(32), nullable=False)  # document_request | notification | user
+    entity_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, nullable=True)  # user whose client should receive the change
+    op = Column(String(8), nullable=False, default="upsert")  # upsert | delete
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    txid = Column(BigInteger, nullable=True)  # PostgreSQL only: writing transaction's id (sync watermark)
+
+    __table_args__ = (
+        Index("ix_change_log_owner_seq", "owner_id", "seq"),
+        Index("ix_change_log_entity_seq", "entity", "seq"),
+        Index("ix_change_log_owner_txid", "owner_id", "txid", "seq"),
+        Index("ix_change_log_entity_txid", "entity", "txid", "seq"),
+    )
+
+# ---------------- Idempotency Keys Table ----------------
+class IdempotencyKeyDB(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)  # sha256 of method + path + Idempotency-Key header
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String(16), nullable=False, default="in_progress")  # in_progress | completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    response_content_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# ---------------- One-Time Codes ----------------
+class OTPCodeDB(Base):
+    __tablename__ = "otp_codes"
+
+    purpose = Column(String(32), primary_key=True)   # password_reset | contact_change
+    subject = Column(String(64), primary_key=True)   # contact number or user id the code was sent for
+    code_hash = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=True)            # e.g. the new contact number awaiting verification
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# ---------------- Dashboard Rollups ----------------
+class StatsRollupDB(Base):
+    __tablename__ = "stats_rollup"
+
+    entity = Column(String(32), primary_key=True)      # requests | users
+    dimension = Column(String(32), primary_key=True)   # document_type | purok | month | role | gender
+    bucket = Column(String(100), primary_key=True)     # e.g. "Barangay Clearance", "Purok 3", "2025-06"
+    status = Column(String(32), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,86 @@
+# routes/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_db
+from schemas import SlowQueryResponse
+from utils.slow_query import THRESHOLD_MS, recent_slow_queries, slow_query_summary, clear_slow_queries
+from utils import tracing
+from utils.auth import Principal
+from utils.request_events import backfill_request_events
+from utils.invalidation import publish, registered_kinds
+from .secretary import get_current_staff
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"]
+)
+
+# ======================================================
+# 🐢 SLOW QUERY LOG
+# ======================================================
+@router.get("/slow-queries", response_model=SlowQueryResponse)
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Principal = Depends(get_current_staff)
+):
+    """
+    Recent statements slower than SLOW_QUERY_MS, newest first, plus a summary
+    grouped by statement shape. Sampled SELECTs include their captured plan.
+    """
+    return SlowQueryResponse(
+        threshold_ms=THRESHOLD_MS,
+        summary=slow_query_summary(),
+        entries=recent_slow_queries(limit),
+    )
+
+
+@router.delete("/slow-queries")
+def reset_slow_queries(current_user: Principal = Depends(get_current_staff)):
+    clear_slow_queries()
+    return {"message": "Slow query log cleared"}
+
+
+# ======================================================
+# 🧵 RECENT TRACES
+# ======================================================
+@router.get("/traces")
+def get_traces(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: Principal = Depends(get_current_staff)
+):
+    """Sampled request traces held by the in-memory exporter, newest first (OTLP/JSON)."""
+    exporter = tracing.exporter
+    return {"exporter": tracing.EXPORTER, "traces": exporter.recent(limit) if exporter else []}
+
+
+# ======================================================
+# 🧱 REQUEST HISTORY BACKFILL
+# ======================================================
+@router.post("/backfill-request-events")
+def backfill_events(
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """Seed document_request_events for requests created before status history was recorded."""
+    return {"message": "Request history backfilled", "events": backfill_request_events(db)}
+
+
+# ======================================================
+# 🧹 CACHE INVALIDATION
+# ======================================================
+@router.post("/invalidate-caches")
+def invalidate_caches(
+    kind: Optional[str] = Query(None, description="Only this cache (principal, census, ...)"),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """Drop this barangay's cached entries on every worker (e.g. after editing the database by hand)."""
+    kinds = registered_kinds()
+    if kind is not None and kind not in kinds:
+        raise HTTPException(status_code=400, detail=f"Unknown cache '{kind}'; expected one of {', '.join(kinds)}")
+    for name in [kind] if kind else kinds:
+        publish(db, name)
+    db.commit()
+    return {"message": "Caches invalidated", "kinds": [kind] if kind else kinds}
@@ -0,0 +1,123 @@
+# routes/batch.py
+"""
+POST /batch: several GETs in one round trip.
+
+BATCH_MAX_REQUESTS   sub-requests allowed per batch (default 20)
+
+The app's start-up screen needs the user, their document requests and their
+notifications; on a mobile link each separate call pays the full round trip.
+A batch runs its sub-requests in-process against the same routers, in order,
+with the caller's headers (Authorization, X-Barangay, ...), and all of them read
+through one shared database snapshot (database.batch_sessions). Each item gets
+its own status code; one failing item doesn't fail the batch.
+
+Sub-requests skip the middleware stack, so each one is charged against the
+admission rate limits here; twenty /users/verify/{contact} lookups in one batch
+cost the same as twenty separate calls.
+"""
+import json
+import logging
+import os
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from database import batch_sessions
+from schemas import BatchRequest, BatchResponse, BatchItemResult, BatchSubRequest
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", 20))
+
+# Request headers not passed on to sub-requests (they describe the batch's own body)
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"transfer-encoding", b"idempotency-key"}
+# Keys Starlette's router fills in per route
+_ROUTING_KEYS = ("endpoint", "route", "path_params", "router", "root_path_params")
+
+router = APIRouter(tags=["Batch"])
+
+
+def _sub_scope(scope: dict, item: BatchSubRequest) -> dict:
+    sub = {k: v for k, v in scope.items() if k not in _ROUTING_KEYS}
+    sub.update(
+        method="GET",
+        path=item.path,
+        raw_path=item.path.encode(),
+        query_string=urlencode(item.params or {}, doseq=True).encode(),
+        headers=[(k, v) for k, v in scope["headers"] if k not in _DROPPED_HEADERS],
+        state={},
+    )
+    return sub
+
+
+async def _run(app, scope: dict) -> BatchItemResult:
+    response = {"status": 500, "content_type": "", "body": bytearray()}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["content_type"] = dict(message.get("headers") or []).get(b"content-type", b"").decode("latin-1")
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    admission = scope.get("admission")  # set by AdmissionControlMiddleware
+    if admission is not None:
+        rejection, receive = await admission.rate_limit(scope, receive)
+        if rejection is not None:
+            return BatchItemResult(status=rejection.status_code, body=json.loads(rejection.body))
+
+    try:
+        await app.router(scope, receive, send)
+    except StarletteHTTPException as e:  # raised by the router itself, e.g. no route matched
+        return BatchItemResult(status=e.status_code, body={"detail": e.detail})
+
+    body = bytes(response["body"])
+    if response["content_type"].startswith("application/json"):
+        parsed = json.loads(body) if body else None
+    else:
+        parsed = body.decode("utf-8", errors="replace")
+    return BatchItemResult(status=response["status"], body=parsed)
+
+
+# ======================================================
+# 📦 BATCH
+# ======================================================
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(payload: BatchRequest, request: Request):
+    """
+    Run up to BATCH_MAX_REQUESTS GET sub-requests, e.g.
+
+        {"requests": [
+            {"path": "/users/12"},
+            {"path": "/document-requests/", "params": {"contact": "09171234567"}},
+            {"path": "/notifications/", "params": {"user_id": 12}}
+        ]}
+
+    Results come back in the same order as {"status": ..., "body": ...}.
+    """
+    if not payload.requests:
+        raise HTTPException(status_code=400, detail="No sub-requests given")
+    if len(payload.requests) > MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REQUESTS} sub-requests per batch")
+
+    results = []
+    async with batch_sessions():
+        for item in payload.requests:
+            if item.method.upper() != "GET":
+                results.append(BatchItemResult(status=405, body={"detail": "Only GET sub-requests can be batched"}))
+                continue
+            if not item.path.startswith("/") or item.path.rstrip("/") == "/batch":
+                results.append(BatchItemResult(status=400, body={"detail": "Invalid sub-request path"}))
+                continue
+            with span(f"batch GET {item.path}"):
+                try:
+                    results.append(await _run(request.app, _sub_scope(request.scope, item)))
+                except Exception:
+                    logger.exception("Batch sub-request failed", extra={"path": item.path})
+                    results.append(BatchItemResult(status=500, body={"detail": "Internal server error"}))
+    return BatchResponse(results=results)
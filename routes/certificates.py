@@ -0,0 +1,158 @@
+# routes/certificates.py
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import DocumentRequestDB, UserDB
+from utils.auth import Principal
+from utils.certificates import render_certificate, render_many
+from utils.pdf import write_pdf
+from utils.query_budget import query_budget
+from utils.tenancy import current_tenant
+from .secretary import get_current_staff
+
+router = APIRouter(
+    prefix="/certificates",
+    tags=["Certificates"]
+)
+
+PRINTABLE_STATUSES = ("Approved", "For Print", "For Pickup", "Completed")
+MAX_PRINT_BATCH = 500
+
+_COLUMNS = (
+    DocumentRequestDB.id, DocumentRequestDB.document_type, DocumentRequestDB.purpose,
+    DocumentRequestDB.copies, DocumentRequestDB.status,
+    UserDB.first_name, UserDB.middle_name, UserDB.last_name, UserDB.dob, UserDB.gender,
+    UserDB.civil_status, UserDB.place_of_birth, UserDB.purok, UserDB.city, UserDB.province,
+)
+
+
+# ======================================================
+# 🧾 CONTEXTS (plain dicts, so print workers never touch the DB)
+# ======================================================
+def _ordinal(day: int) -> str:
+    suffix = "th" if 11 <= day % 100 <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+
+def _age(dob: Optional[datetime], on: date) -> str:
+    if not dob:
+        return ""
+    return str(on.year - dob.year - ((on.month, on.day) < (dob.month, dob.day)))
+
+
+def captain_name(db: Session) -> str:
+    row = db.execute(
+        select(UserDB.first_name, UserDB.middle_name, UserDB.last_name)
+        .where(func.lower(UserDB.role) == "captain").order_by(UserDB.id).limit(1)
+    ).first()
+    if not row:
+        return ""
+    initial = f" {row.middle_name[0]}." if row.middle_name else ""
+    return f"{row.first_name}{initial} {row.last_name}"
+
+
+def certificate_context(row, captain: str, issued_on: date) -> Dict[str, str]:
+    tenant = current_tenant()
+    middle = f" {row.middle_name}" if row.middle_name else ""
+    return {
+        "full_name": f"{row.first_name}{middle} {row.last_name}".upper(),
+        "age": _age(row.dob, issued_on),
+        "gender": row.gender or "",
+        "civil_status": (row.civil_status or "").lower(),
+        "dob": row.dob.strftime("%B %d, %Y").replace(" 0", " ") if row.dob else "",
+        "place_of_birth": row.place_of_birth or "N/A",
+        "purok": row.purok or "",
+        "barangay": tenant.barangay,
+        "barangay_name": tenant.name,
+        "city": row.city or "",
+        "province": row.province or "",
+        "document_type": row.document_type,
+        "purpose": (row.purpose or "").lower(),
+        "control_no": f"{issued_on.year}-{row.id:06d}",
+        "issued_day": _ordinal(issued_on.day),
+        "issued_month_year": issued_on.strftime("%B %Y"),
+        "captain_name": captain,
+    }
+
+
+def _pdf_response(chunks: Iterator[bytes], filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    )
+
+
+# ======================================================
+# 🖨️ SINGLE CERTIFICATE
+# ======================================================
+@router.get("/{request_id}")
+@query_budget(max_queries=2, label="GET /certificates/{request_id}")
+def get_certificate(
+    request_id: int,
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """The filled-in certificate for one request (one page per copy)."""
+    row = db.execute(
+        select(*_COLUMNS).join(UserDB, UserDB.id == DocumentRequestDB.user_id)
+        .where(DocumentRequestDB.id == request_id, DocumentRequestDB.is_deleted == False)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if row.status not in PRINTABLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"A '{row.status}' request can't be printed yet")
+
+    page = render_certificate(row.document_type, certificate_context(row, captain_name(db), date.today()))
+    pages = [page] * max(row.copies or 1, 1)
+    return _pdf_response(write_pdf(pages, title=row.document_type), f"certificate-{request_id}.pdf")
+
+
+# ======================================================
+# 📚 BATCH PRINT (everything "For Print", one merged PDF)
+# ======================================================
+@router.get("/print/for-print")
+@query_budget(max_queries=2, label="GET /certificates/print/for-print")
+def print_all_for_print(
+    document_type: Optional[str] = Query(None),
+    limit: int = Query(MAX_PRINT_BATCH, ge=1, le=MAX_PRINT_BATCH),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """
+    Every request waiting in "For Print" (oldest first) as one PDF, ready for the
+    counter printer. Pages are rendered in a process pool and streamed in order as
+    they finish. Statuses are not changed; move the printed requests on with
+    /document-requests/status/bulk once the pages are out.
+    """
+    stmt = (
+        select(*_COLUMNS).join(UserDB, UserDB.id == DocumentRequestDB.user_id)
+        .where(DocumentRequestDB.status == "For Print", DocumentRequestDB.is_deleted == False)
+        .order_by(DocumentRequestDB.created_at, DocumentRequestDB.id)
+        .limit(limit)
+    )
+    if document_type:
+        stmt = stmt.where(DocumentRequestDB.document_type == document_type)
+    rows = db.execute(stmt).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="No requests are waiting to be printed")
+
+    captain, today = captain_name(db), date.today()
+    items: List[Tuple[str, Dict[str, str]]] = [(row.document_type, certificate_context(row, captain, today)) for row in rows]
+    copies = [max(row.copies or 1, 1) for row in rows]
+
+    def pages() -> Iterator[bytes]:
+        for page, n in zip(render_many(items), copies):
+            for _ in range(n):
+                yield page
+
+    return _pdf_response(
+        write_pdf(pages(), title=f"For Print {today.isoformat()}"),
+        f"for-print-{today.isoformat()}.pdf",
+    )
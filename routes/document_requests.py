@@ -1,22 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, BackgroundTasks
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func
-from typing import Optional, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
 from datetime import datetime, timedelta
-import traceback
+import logging
 import requests
 
-from database import get_db
+from database import get_db, get_async_read_db
 from models import DocumentRequestDB, UserDB, NotificationDB
 from schemas import (
     DocumentRequest, DocumentRequestUpdate, DocumentRequestResponse,
-    UserInfoResponse, StatusUpdate
+    UserInfoResponse, StatusUpdate, BulkStatusUpdate, BulkStatusUpdateResult,
+    BulkStatusUpdateResponse, RequestHistoryEvent
 )
-from routes.users import send_sms_semaphore # SMS helper from users.py
+from routes.users import send_sms_semaphore, send_sms_batch # SMS helpers from users.py
+from utils.query_budget import query_budget
+from utils.tracing import span, traced
+from utils.auth import Principal
+from utils.request_events import set_actor, request_history
+from utils.tenancy import render_message
 from fastapi import Body
+from .secretary import get_current_staff
 
 router = APIRouter(prefix="/document-requests", tags=["document-requests"])
+logger = logging.getLogger(__name__)
+
+STAFF_ROLES = ["secretary", "captain"]
 
 # ---------------- Helper Functions ----------------
 def normalize_contact(contact: str) -> str:
@@ -65,6 +76,7 @@ def document_request_response(db_request: DocumentRequestDB) -> DocumentRequestR
     )
 
 
+@traced()
 def get_request_by_id(db: Session, request_id: int, include_deleted: bool = False) -> DocumentRequestDB:
     """Fetch request by ID, raise 404 if not found."""
     query = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(DocumentRequestDB.id == request_id)
@@ -75,6 +87,7 @@ def get_request_by_id(db: Session, request_id: int, include_deleted: bool = Fals
         raise HTTPException(status_code=404, detail="Request not found")
     return db_request
 
+@traced()
 def create_notification(
     db: Session,
     user_id: int,
@@ -104,20 +117,37 @@ def create_notification(
             try:
                 formatted = normalize_contact(phone)
                 result = send_sms_semaphore(formatted, message)
-                print(f"📩 SMS sent to {formatted}: {result}")
-            except Exception as e:
-                print(f"⚠️ Failed to send SMS to {phone}: {e}")
+                logger.info("SMS sent", extra={"phone": formatted, "result": result})
+            except Exception:
+                logger.exception("Failed to send SMS", extra={"phone": phone})
 
        
         return notif
     except Exception:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Failed to create notification", extra={"user_id": user_id})
         return None
 
+def build_notification(user_id: int, title: str, message: str, type: str = "") -> NotificationDB:
+    """Notification row to be added with other writes and committed once."""
+    return NotificationDB(
+        user_id=user_id,
+        title=title.strip(),
+        message=message.strip(),
+        type=type.strip(),
+        is_read=False,
+        created_at=datetime.utcnow()
+    )
+
+def staff_notifications(db: Session, title: str, message: str) -> List[NotificationDB]:
+    """One staff_action notification per secretary/captain, using a single id query."""
+    staff_ids = db.execute(select(UserDB.id).where(func.lower(UserDB.role).in_(STAFF_ROLES))).scalars().all()
+    return [build_notification(staff_id, title, message, type="staff_action") for staff_id in staff_ids]
+
 def expire_old_requests(db: Session):
     """Automatically expire requests older than 6 months."""
-    six_months_ago = datetime.utcnow() - timedelta(days=180)
+    now = datetime.utcnow()
+    six_months_ago = now - timedelta(days=180)
     old_requests = db.query(DocumentRequestDB).filter(
         DocumentRequestDB.created_at <= six_months_ago,
         DocumentRequestDB.status.notin_(["Completed", "Cancelled"]),
@@ -127,18 +157,18 @@ def expire_old_requests(db: Session):
         req.status = "Cancelled"
         req.notes = "Automatically expired after 6 months"
         req.is_deleted = True
-        req.deleted_at = datetime.utcnow()
-        db.commit()
-        create_notification(
-            db,
+        req.deleted_at = now
+        db.add(build_notification(
             req.user_id,
             "Request Expired",
             f"Your {req.document_type} request has expired after 6 months.",
-            type="cancel",
-            send_sms=False
-        )
+            type="cancel"
+        ))
+    if old_requests:
+        db.commit()
 # ---------------- Create Request ----------------
 @router.post("/", response_model=DocumentRequestResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(max_queries=9, label="POST /document-requests")
 def create_request(request: DocumentRequest, db: Session = Depends(get_db)):
     try:
         contact = normalize_contact(request.contact)
@@ -164,28 +194,23 @@ def create_request(request: DocumentRequest, db: Session = Depends(get_db)):
             created_at=datetime.utcnow()
         )
 
+        set_actor(db, user.id)
         db.add(db_request)
-        db.commit()
-        db.refresh(db_request)
 
-        # Notify resident
-        create_notification(
-            db,
+        # Notify resident and staff in the same transaction
+        db.add(build_notification(
             user.id,
             "Document Request Submitted",
             f"Your request for {db_request.document_type} has been submitted and is now under review.",
             type="user_request"
-        )
-
-        # Notify staff
-        for staff in db.query(UserDB).filter(func.lower(UserDB.role).in_(["secretary", "captain"])).all():
-            create_notification(
-                db,
-                staff.id,
-                "New Document Request Received",
-                f"A new {db_request.document_type} request was submitted by {user.first_name} {user.last_name}.",
-                type="staff_action"
-            )
+        ))
+        db.add_all(staff_notifications(
+            db,
+            "New Document Request Received",
+            f"A new {db_request.document_type} request was submitted by {user.first_name} {user.last_name}."
+        ))
+        db.commit()
+        db.refresh(db_request)
 
         return document_request_response(db_request)
 
@@ -193,100 +218,102 @@ def create_request(request: DocumentRequest, db: Session = Depends(get_db)):
         raise
     except Exception:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Failed to create document request")
         raise HTTPException(status_code=500, detail="Failed to create document request")
 
 # ---------------- Get Requests ----------------
 @router.get("/", response_model=List[DocumentRequestResponse], status_code=status.HTTP_200_OK)
-def get_requests(
+@query_budget(max_queries=1, label="GET /document-requests")
+async def get_requests(
     contact: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     include_deleted: bool = Query(False, description="Include soft-deleted requests"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     try:
-        query = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user))
+        query = select(DocumentRequestDB).options(joinedload(DocumentRequestDB.user))
         if not include_deleted:
-            query = query.filter(DocumentRequestDB.is_deleted == False)
+            query = query.where(DocumentRequestDB.is_deleted == False)
 
         if contact:
-            query = query.filter(DocumentRequestDB.contact == normalize_contact(contact))
+            query = query.where(DocumentRequestDB.contact == normalize_contact(contact))
 
         if status:
-            query = query.filter(func.lower(DocumentRequestDB.status) == status.strip().lower())
+            query = query.where(func.lower(DocumentRequestDB.status) == status.strip().lower())
 
-        requests = query.order_by(DocumentRequestDB.created_at.desc()).all()
+        result = await db.execute(query.order_by(DocumentRequestDB.created_at.desc()))
+        requests = result.scalars().all()
         return [document_request_response(r) for r in requests]
 
     except SQLAlchemyError:
-        traceback.print_exc()
+        logger.exception("Database error")
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception:
-        traceback.print_exc()
+        logger.exception("Failed to fetch document requests")
         raise HTTPException(status_code=500, detail="Failed to fetch document requests")
 
 
 # ---------------- Helper for Personalized Messages ----------------
-def build_status_message(status: str, full_name: str, document_type: str) -> str:
-    match status:
-        case "Approved":
-            return (
-                f"Hi {full_name}, your {document_type} request has been approved by Barangay Tilhaong Office. "
-                "You can now log in to BarangayConnect."
-            )
+STATUS_MESSAGE_TEMPLATES = {
+    "Approved": "request_approved",
+    "For Pickup": "request_pickup",
+    "Completed": "request_completed",
+    "Returned": "request_returned",
+    "Rejected": "request_rejected",
+    "Pending": "request_resubmitted",
+}
 
-        case "For Pickup":
-            return f"Hi {full_name}, your {document_type} is now ready for pickup at Barangay Tilhaong Office. Please bring a valid ID."
-        case "Completed":
-            return f"Hi {full_name}, your {document_type} request has been completed. Thank you for using BrgyConnect!"
+
+def build_status_message(status: str, full_name: str, document_type: str) -> str:
+    """Status SMS/notification text from the current barangay's templates."""
+    key = STATUS_MESSAGE_TEMPLATES.get(status, "request_status_changed")
+    return render_message(key, full_name=full_name, document_type=document_type, status=status)
+
+# ---------------- Helper for Status Transitions ----------------
+def apply_status_update(db_request: DocumentRequestDB, payload: StatusUpdate):
+    """Apply a status transition in memory. Raises HTTPException(400) if it is not allowed."""
+    old_status = db_request.status
+    match payload.status:
         case "Returned":
-            return f"Hi {full_name}, your {document_type} request has been returned for correction. Please review and resubmit."
+            db_request.status, db_request.notes, db_request.action = "Returned", payload.notes or "Request returned for correction", "Update Request"
         case "Rejected":
-            return f"Hi {full_name}, unfortunately, your {document_type} request has been rejected. Please contact the Barangay Office for details."
+            db_request.status, db_request.notes, db_request.action = "Rejected", payload.notes or "Request rejected", "Reject"
+        case "Approved" | "For Print" | "Completed":
+            db_request.status = payload.status
+            db_request.action = payload.action or "Review"
+            db_request.notes = ""
+        case "For Pickup":
+            db_request.status = "For Pickup"
+            db_request.action = payload.action or "Ready for Pickup"
+            db_request.notes = ""
+            db_request.pickup_date = datetime.utcnow()
         case "Pending":
-            return f"Hi {full_name}, your {document_type} request has been resubmitted and is now under review."
+            if old_status != "Returned":
+                raise HTTPException(status_code=400, detail="Only Returned requests can be resubmitted.")
+            db_request.status = "Pending"
+            db_request.action = payload.action or "Resubmitted"
+            db_request.notes = ""
         case _:
-            return f"Hi {full_name}, the status of your {document_type} request is now '{status}'. Thank you!"
+            raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
+
+    db_request.updated_at = datetime.utcnow()
+
 
 # ---------------- Update Request Status ----------------
 @router.post("/status", response_model=DocumentRequestResponse)
-def update_request_status(payload: StatusUpdate = Body(...), performed_by_id: int = Body(...), db: Session = Depends(get_db)):
+def update_request_status(
+    payload: StatusUpdate = Body(..., embed=True),
+    staff_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """The acting staff member comes from the bearer token; a body performed_by_id is ignored."""
     try:
         db_request = get_request_by_id(db, payload.id)
-        old_status = db_request.status
-        # Validate the staff user performing the action
-        staff_user = db.query(UserDB).filter(UserDB.id == performed_by_id).first()
-        if not staff_user:
-            raise HTTPException(status_code=400, detail="Invalid staff user ID.")
-
-
-        match payload.status:
-            case "Returned":
-                db_request.status, db_request.notes, db_request.action = "Returned", payload.notes or "Request returned for correction", "Update Request"
-            case "Rejected":
-                db_request.status, db_request.notes, db_request.action = "Rejected", payload.notes or "Request rejected", "Reject"
-            case "Approved" | "For Print" | "Completed":
-                db_request.status = payload.status
-                db_request.action = payload.action or "Review"
-                db_request.notes = ""
-            case "For Pickup":
-                db_request.status = "For Pickup"
-                db_request.action = payload.action or "Ready for Pickup"
-                db_request.notes = ""
-                db_request.pickup_date = datetime.utcnow()
-            case "Pending":
-                if old_status != "Returned":
-                    raise HTTPException(status_code=400, detail="Only Returned requests can be resubmitted.")
-                db_request.status = "Pending"
-                db_request.action = payload.action or "Resubmitted"
-                db_request.notes = ""
-            case _:
-                raise HTTPException(status_code=400, detail=f"Invalid status: {payload.status}")
-
-
-        db_request.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_request)
+        apply_status_update(db_request, payload)
+        set_actor(db, staff_user.id)
+        with span("db.commit"):
+            db.commit()
+            db.refresh(db_request)
 
         full_name = f"{db_request.user.first_name} {db_request.user.last_name}".strip()
         message_for_user = build_status_message(payload.status, full_name, db_request.document_type)
@@ -307,23 +334,108 @@ def update_request_status(payload: StatusUpdate = Body(...), performed_by_id: in
         # Notify staff who performed action
         create_notification(
             db,
-            performed_by_id,
+            staff_user.id,
             f"Request {db_request.status} Updated",
             f"You updated {db_request.document_type} request for {full_name}.",
             type="staff_action"
         )
 
-        return document_request_response(db_request)
+        with span("build_response"):
+            return document_request_response(db_request)
 
     except HTTPException:
         raise
     except Exception:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Failed to update request status")
         raise HTTPException(status_code=500, detail="Failed to update request status")
 
+# ---------------- Bulk Update Request Status ----------------
+@router.post("/status/bulk", response_model=BulkStatusUpdateResponse)
+@query_budget(max_queries=8, label="POST /document-requests/status/bulk")
+def bulk_update_request_status(
+    background_tasks: BackgroundTasks,
+    payload: BulkStatusUpdate = Body(...),
+    staff_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many status updates in one transaction.
+    Invalid items are reported individually and do not block the rest.
+    The acting staff member comes from the bearer token.
+    """
+
+    ids = [item.id for item in payload.items]
+    requests_by_id = {
+        r.id: r for r in db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(
+            DocumentRequestDB.id.in_(ids),
+            DocumentRequestDB.is_deleted == False
+        ).all()
+    }
+
+    results: List[BulkStatusUpdateResult] = []
+    notifications: List[NotificationDB] = []
+    sms_queue: List[Tuple[str, str]] = []
+    seen = set()
+    now = datetime.utcnow()
+
+    for item in payload.items:
+        db_request = requests_by_id.get(item.id)
+        if item.id in seen:
+            results.append(BulkStatusUpdateResult(id=item.id, ok=False, error="Duplicate request id in batch"))
+            continue
+        seen.add(item.id)
+        if not db_request:
+            results.append(BulkStatusUpdateResult(id=item.id, ok=False, error="Request not found"))
+            continue
+
+        try:
+            apply_status_update(db_request, item)
+        except HTTPException as e:
+            results.append(BulkStatusUpdateResult(id=item.id, ok=False, error=e.detail))
+            continue
+
+        full_name = f"{db_request.user.first_name} {db_request.user.last_name}".strip()
+        message_for_user = build_status_message(item.status, full_name, db_request.document_type)
+        notifications.append(NotificationDB(
+            user_id=db_request.user_id,
+            title=f"Request {db_request.status}",
+            message=message_for_user,
+            type="status_update",
+            is_read=False,
+            created_at=now
+        ))
+        if db_request.status in {"For Pickup", "Completed"} and db_request.contact:
+            sms_queue.append((db_request.contact, message_for_user))
+        results.append(BulkStatusUpdateResult(id=item.id, ok=True, status=db_request.status))
+
+    updated = sum(1 for r in results if r.ok)
+    if updated:
+        notifications.append(NotificationDB(
+            user_id=staff_user.id,
+            title="Bulk Status Update",
+            message=f"You updated {updated} document request(s).",
+            type="staff_action",
+            is_read=False,
+            created_at=now
+        ))
+        try:
+            set_actor(db, staff_user.id)
+            db.add_all(notifications)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Failed to apply bulk status update")
+            raise HTTPException(status_code=500, detail="Failed to update request statuses")
+
+        if sms_queue:
+            background_tasks.add_task(send_sms_batch, sms_queue)
+
+    return BulkStatusUpdateResponse(updated=updated, failed=len(results) - updated, results=results)
+
 # ---------------- Update Request Details (User Resubmit) ----------------
 @router.post("/{request_id}/update", response_model=DocumentRequestResponse)
+@query_budget(max_queries=8, label="POST /document-requests/{request_id}/update")
 def update_request_details(request_id: int, payload: DocumentRequestUpdate = Body(...), db: Session = Depends(get_db)):
     try:
         db_request = get_request_by_id(db, request_id)
@@ -340,26 +452,21 @@ def update_request_details(request_id: int, payload: DocumentRequestUpdate = Bod
                 )
 
         db_request.status, db_request.action, db_request.updated_at = "Pending", "Resubmitted", datetime.utcnow()
+        set_actor(db, db_request.user_id)
 
-        db.commit()
-        db.refresh(db_request)
-
-        for staff in db.query(UserDB).filter(func.lower(UserDB.role).in_(["secretary", "captain"])).all():
-            create_notification(
-                db,
-                staff.id,
-                "Request Resubmitted",
-                f"{db_request.document_type} request has been resubmitted by {db_request.user.first_name} {db_request.user.last_name}.",
-                type="staff_action"
-            )
-
-        create_notification(
+        db.add_all(staff_notifications(
             db,
+            "Request Resubmitted",
+            f"{db_request.document_type} request has been resubmitted by {db_request.user.first_name} {db_request.user.last_name}."
+        ))
+        db.add(build_notification(
             db_request.user_id,
             "Request Resubmitted",
             f"Your {db_request.document_type} request has been successfully resubmitted and is now under review.",
             type="user_request"
-        )
+        ))
+        db.commit()
+        db.refresh(db_request)
 
         return document_request_response(db_request)
 
@@ -367,9 +474,19 @@ def update_request_details(request_id: int, payload: DocumentRequestUpdate = Bod
         raise
     except Exception as e:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Failed to update request details")
         raise HTTPException(status_code=500, detail=f"Failed to update request: {str(e)}")
 
+# ---------------- Request Status History ----------------
+@router.get("/{request_id}/history", response_model=List[RequestHistoryEvent])
+@query_budget(max_queries=2, label="GET /document-requests/{request_id}/history")
+def get_request_history(request_id: int, db: Session = Depends(get_db)):
+    """Status transitions for a request, oldest first, from document_request_events."""
+    events = request_history(db, request_id)
+    if not events and db.get(DocumentRequestDB, request_id) is None:
+        raise HTTPException(status_code=404, detail="Request not found")
+    return events
+
 # ---------------- Soft Delete Request ----------------
 @router.delete("/{request_id}", status_code=status.HTTP_200_OK)
 def soft_delete_request(request_id: int, db: Session = Depends(get_db)):
@@ -403,9 +520,9 @@ def soft_delete_request(request_id: int, db: Session = Depends(get_db)):
         raise
     except SQLAlchemyError:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Database error")
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
         db.rollback()
-        traceback.print_exc()
+        logger.exception("Failed to delete request")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
\ No newline at end of file
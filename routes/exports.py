@@ -0,0 +1,243 @@
+# routes/exports.py
+import csv
+import io
+import tempfile
+from datetime import datetime
+from typing import Optional, List, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+
+from database import SessionLocal
+from models import DocumentRequestDB, UserDB, ResidentMasterlistDB
+from utils.auth import Principal
+from .secretary import get_current_staff
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # XLSX export is optional
+    Workbook = None
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["Exports"]
+)
+
+CHUNK_SIZE = 1000          # rows fetched per round-trip from the server-side cursor
+FILE_CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# ======================================================
+# 🧰 STREAMING HELPERS
+# ======================================================
+def iter_partitions(stmt) -> Iterator[List]:
+    """
+    Run a Core select on its own session and yield fixed-size row chunks.
+    Uses a server-side cursor so memory stays constant regardless of row count.
+    The session is opened here (not via get_db) because the response body is
+    produced after the route function has returned.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": CHUNK_SIZE})
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(headers: List[str], stmt) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for partition in iter_partitions(stmt):
+        writer.writerows([[_cell(v) for v in row] for row in partition])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_xlsx(headers: List[str], stmt) -> Iterator[bytes]:
+    # write_only workbooks spill rows to disk as they are appended
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for partition in iter_partitions(stmt):
+        for row in partition:
+            sheet.append(list(row))
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(FILE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_response(name: str, fmt: str, columns: list, stmt) -> StreamingResponse:
+    headers = [c.key for c in columns]
+    if fmt == "xlsx":
+        if Workbook is None:
+            raise HTTPException(status_code=400, detail="XLSX export requires the 'openpyxl' package")
+        body = stream_xlsx(headers, stmt)
+    else:
+        body = stream_csv(headers, stmt)
+
+    filename = f"{name}_{datetime.utcnow():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# ======================================================
+# 📄 EXPORT DOCUMENT REQUESTS
+# ======================================================
+@router.get("/document-requests")
+def export_document_requests(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    date_from: Optional[datetime] = Query(None, description="created_at lower bound (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="created_at upper bound (exclusive)"),
+    status: Optional[str] = Query(None),
+    purok: Optional[str] = Query(None, description="Requester's purok"),
+    include_deleted: bool = Query(False),
+    include_photos: bool = Query(False, description="Include base64 photo columns"),
+    current_user: Principal = Depends(get_current_staff)
+):
+    columns = [
+        DocumentRequestDB.id,
+        DocumentRequestDB.document_type,
+        DocumentRequestDB.purpose,
+        DocumentRequestDB.copies,
+        DocumentRequestDB.status,
+        DocumentRequestDB.action,
+        DocumentRequestDB.notes,
+        DocumentRequestDB.contact,
+        DocumentRequestDB.user_id,
+        UserDB.first_name,
+        UserDB.last_name,
+        UserDB.purok,
+        DocumentRequestDB.created_at,
+        DocumentRequestDB.updated_at,
+        DocumentRequestDB.pickup_date,
+        DocumentRequestDB.is_deleted,
+        DocumentRequestDB.deleted_at,
+    ]
+    if include_photos:
+        columns += [
+            DocumentRequestDB.photo,
+            DocumentRequestDB.authorization_photo,
+            DocumentRequestDB.require_photo_update,
+        ]
+
+    stmt = select(*columns).join(UserDB, UserDB.id == DocumentRequestDB.user_id)
+    if not include_deleted:
+        stmt = stmt.where(DocumentRequestDB.is_deleted == False)
+    if date_from:
+        stmt = stmt.where(DocumentRequestDB.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(DocumentRequestDB.created_at < date_to)
+    if status:
+        stmt = stmt.where(func.lower(DocumentRequestDB.status) == status.strip().lower())
+    if purok:
+        stmt = stmt.where(func.lower(UserDB.purok) == purok.strip().lower())
+
+    stmt = stmt.order_by(DocumentRequestDB.id)
+    return export_response("document_requests", format, columns, stmt)
+
+
+# ======================================================
+# 👥 EXPORT USERS
+# ======================================================
+@router.get("/users")
+def export_users(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    status: Optional[str] = Query(None),
+    role: Optional[str] = Query(None),
+    purok: Optional[str] = Query(None),
+    include_photos: bool = Query(False, description="Include base64 photo column"),
+    current_user: Principal = Depends(get_current_staff)
+):
+    # Passwords and OTP columns are never exported
+    columns = [
+        UserDB.id,
+        UserDB.first_name,
+        UserDB.middle_name,
+        UserDB.last_name,
+        UserDB.dob,
+        UserDB.gender,
+        UserDB.civil_status,
+        UserDB.contact,
+        UserDB.purok,
+        UserDB.barangay,
+        UserDB.city,
+        UserDB.province,
+        UserDB.postal_code,
+        UserDB.place_of_birth,
+        UserDB.role,
+        UserDB.status,
+    ]
+    if include_photos:
+        columns.append(UserDB.photo)
+
+    stmt = select(*columns)
+    if status:
+        stmt = stmt.where(func.lower(UserDB.status) == status.strip().lower())
+    if role:
+        stmt = stmt.where(func.lower(UserDB.role) == role.strip().lower())
+    if purok:
+        stmt = stmt.where(func.lower(UserDB.purok) == purok.strip().lower())
+
+    stmt = stmt.order_by(UserDB.id)
+    return export_response("users", format, columns, stmt)
+
+
+# ======================================================
+# 🏘️ EXPORT RESIDENT MASTERLIST
+# ======================================================
+@router.get("/residents")
+def export_residents(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    purok: Optional[str] = Query(None),
+    barangay: Optional[str] = Query(None),
+    current_user: Principal = Depends(get_current_staff)
+):
+    columns = [
+        ResidentMasterlistDB.id,
+        ResidentMasterlistDB.first_name,
+        ResidentMasterlistDB.middle_name,
+        ResidentMasterlistDB.last_name,
+        ResidentMasterlistDB.dob,
+        ResidentMasterlistDB.gender,
+        ResidentMasterlistDB.purok,
+        ResidentMasterlistDB.barangay,
+        ResidentMasterlistDB.city,
+        ResidentMasterlistDB.province,
+        ResidentMasterlistDB.number_of_years,
+    ]
+
+    stmt = select(*columns)
+    if purok:
+        stmt = stmt.where(func.lower(ResidentMasterlistDB.purok) == purok.strip().lower())
+    if barangay:
+        stmt = stmt.where(func.lower(ResidentMasterlistDB.barangay) == barangay.strip().lower())
+
+    stmt = stmt.order_by(ResidentMasterlistDB.id)
+    return export_response("residents", format, columns, stmt)
@@ -1,13 +1,17 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_async_read_db
 from models import NotificationDB
 from schemas import NotificationResponse
+from utils.change_log import log_changes
 from datetime import datetime
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
+logger = logging.getLogger(__name__)
 
 # ---------------------------
 # Helper to create notifications
@@ -31,8 +35,8 @@ def create_notification(db: Session, user_id: int, title: str, message: str, not
 # Get notifications
 # ---------------------------
 @router.get("/", response_model=List[NotificationResponse])
-def get_notifications(
-    db: Session = Depends(get_db),
+async def get_notifications(
+    db: AsyncSession = Depends(get_async_read_db),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     role: Optional[str] = Query(None, description="User role (resident, secretary, captain)"),
     unread_only: Optional[bool] = Query(False, description="Return only unread notifications")
@@ -43,7 +47,7 @@ def get_notifications(
     - Staff see staff_action notifications.
     """
     try:
-        query = db.query(NotificationDB)
+        query = select(NotificationDB)
 
         if role:
             role = role.lower()
@@ -52,23 +56,22 @@ def get_notifications(
                     raise HTTPException(status_code=400, detail="user_id is required for residents")
                 
                 # Residents see all notifications where they are the owner
-                query = query.filter(NotificationDB.user_id == user_id)
+                query = query.where(NotificationDB.user_id == user_id)
 
             elif role in ["secretary", "captain"]:
                 # Staff sees only staff notifications
-                query = query.filter(func.lower(NotificationDB.type) == "staff_action")
+                query = query.where(func.lower(NotificationDB.type) == "staff_action")
             else:
                 raise HTTPException(status_code=400, detail="Invalid role")
 
         if unread_only:
-            query = query.filter(NotificationDB.is_read == False)
+            query = query.where(NotificationDB.is_read == False)
 
-        notifications = query.order_by(desc(NotificationDB.created_at)).all()
-        return notifications
+        result = await db.execute(query.order_by(desc(NotificationDB.created_at)))
+        return result.scalars().all()
 
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to fetch notifications")
         raise HTTPException(status_code=500, detail=f"Error fetching notifications: {e}")
 
 
@@ -93,17 +96,20 @@ def mark_notification_as_read(notif_id: int, db: Session = Depends(get_db)):
 @router.put("/mark-all-read")
 def mark_all_as_read(user_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
     try:
-        query = db.query(NotificationDB)
+        query = db.query(NotificationDB).filter(NotificationDB.is_read == False)
         if user_id:
             query = query.filter(NotificationDB.user_id == user_id)
 
-        count = query.update({NotificationDB.is_read: True})
+        # Bulk update skips the flush hook, so log the rows for offline sync
+        changed = query.with_entities(NotificationDB.id, NotificationDB.user_id).all()
+        count = query.update({NotificationDB.is_read: True}, synchronize_session=False)
+        log_changes(db, "notification", changed)
         db.commit()
         return {"message": f"{count} notifications marked as read"}
 
-    except Exception as e:
+    except Exception:
         db.rollback()
-        print(f"⚠ Failed to mark all notifications as read: {e}")
+        logger.exception("Failed to mark all notifications as read", extra={"user_id": user_id})
         raise HTTPException(status_code=500, detail="Failed to update notifications")
 
 # ---------------------------
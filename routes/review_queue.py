@@ -0,0 +1,133 @@
+# routes/review_queue.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, func, literal, union_all, and_, cast, String
+from typing import Optional, List
+
+from database import get_db
+from models import UserDB, DocumentRequestDB
+from schemas import ReviewQueueResponse, ReviewQueueItem
+from utils.auth import Principal
+from .secretary import get_current_staff
+from utils.query_budget import query_budget
+
+router = APIRouter(
+    prefix="/review-queue",
+    tags=["Review Queue"]
+)
+
+STAFF_ROLES = ["secretary", "captain"]
+
+# Queue order: registrations first, then profile updates, then document requests
+KINDS = ["registration", "profile_update", "document_request"]
+
+
+# ======================================================
+# 🔎 QUEUE PREDICATES (served by status indexes)
+# ======================================================
+def pending_registrations():
+    return and_(UserDB.status == "Pending", UserDB.role.notin_(STAFF_ROLES))
+
+
+def pending_profile_updates():
+    # Cleared updates may be stored as JSON 'null' rather than SQL NULL
+    return and_(UserDB.pending_updates.isnot(None), cast(UserDB.pending_updates, String) != "null")
+
+
+def pending_document_requests():
+    return and_(DocumentRequestDB.status == "Pending", DocumentRequestDB.is_deleted == False)
+
+
+def _full_name(user: UserDB) -> str:
+    return " ".join(p for p in [user.first_name, user.middle_name, user.last_name] if p)
+
+
+# ======================================================
+# 📋 UNIFIED REVIEW QUEUE
+# ======================================================
+@router.get("", response_model=ReviewQueueResponse)
+@query_budget(max_queries=4, label="GET /review-queue")
+def get_review_queue(
+    kind: Optional[str] = Query(None, description="registration | profile_update | document_request"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """
+    One paginated list of everything waiting for staff review.
+    Only the ids for the requested page are selected; details are loaded for that page only.
+    """
+    if kind and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind. Use one of: {', '.join(KINDS)}")
+
+    parts = {
+        "registration": select(literal(0).label("rank"), UserDB.id.label("id")).where(pending_registrations()),
+        "profile_update": select(literal(1).label("rank"), UserDB.id.label("id")).where(pending_profile_updates()),
+        "document_request": select(literal(2).label("rank"), DocumentRequestDB.id.label("id")).where(pending_document_requests()),
+    }
+
+    counts = db.execute(select(
+        select(func.count()).select_from(UserDB).where(pending_registrations()).scalar_subquery().label("registration"),
+        select(func.count()).select_from(UserDB).where(pending_profile_updates()).scalar_subquery().label("profile_update"),
+        select(func.count()).select_from(DocumentRequestDB).where(pending_document_requests()).scalar_subquery().label("document_request"),
+    )).one()._asdict()
+
+    selected = [kind] if kind else KINDS
+    queue = union_all(*[parts[k] for k in selected]).subquery()
+    page = db.execute(
+        select(queue.c.rank, queue.c.id).order_by(queue.c.rank, queue.c.id).limit(limit).offset(offset)
+    ).all()
+
+    user_ids = [r.id for r in page if r.rank in (0, 1)]
+    request_ids = [r.id for r in page if r.rank == 2]
+    users = {u.id: u for u in db.query(UserDB).filter(UserDB.id.in_(user_ids)).all()} if user_ids else {}
+    requests = {
+        r.id: r for r in db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(
+            DocumentRequestDB.id.in_(request_ids)
+        ).all()
+    } if request_ids else {}
+
+    items: List[ReviewQueueItem] = []
+    for row in page:
+        if row.rank == 2:
+            r = requests.get(row.id)
+            if not r:
+                continue
+            items.append(ReviewQueueItem(
+                kind="document_request",
+                id=r.id,
+                user_id=r.user_id,
+                name=_full_name(r.user) if r.user else "",
+                contact=r.contact,
+                summary=f"{r.document_type} — {r.purpose}",
+                created_at=r.created_at,
+            ))
+            continue
+
+        u = users.get(row.id)
+        if not u:
+            continue
+        if row.rank == 0:
+            items.append(ReviewQueueItem(
+                kind="registration",
+                id=u.id,
+                user_id=u.id,
+                name=_full_name(u),
+                contact=u.contact,
+                summary=f"New registration from Purok {u.purok}",
+            ))
+        else:
+            items.append(ReviewQueueItem(
+                kind="profile_update",
+                id=u.id,
+                user_id=u.id,
+                name=_full_name(u),
+                contact=u.contact,
+                summary=f"Profile changes: {', '.join(sorted(u.pending_updates))}",
+                pending_updates=u.pending_updates,
+            ))
+
+    total = sum(counts[k] for k in selected)
+    next_offset = offset + limit if offset + limit < total else None
+    return ReviewQueueResponse(counts=counts, total=total, items=items, next_offset=next_offset)
@@ -1,12 +1,14 @@
 # routes/secretary.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Header
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
-from models import ResidentMasterlistDB, UserDB
-from schemas import ResidentResponse
-from .users import safe_dob  # optional helper to format DOB
 from datetime import date
+from database import get_db, get_read_db
+from models import ResidentMasterlistDB
+from schemas import ResidentResponse, ResidentImportResult, CensusAnalyticsResponse
+from utils.masterlist_import import import_residents, iter_upload_rows
+from utils.auth import LEGACY_USER_ID, Principal, InvalidToken, get_principal, principal_from_token
+from utils.census import CensusUnavailable, census_summary, get_census_arrays
 
 router = APIRouter(
     prefix="/secretary",
@@ -14,15 +16,52 @@ router = APIRouter(
 )
 
 # ======================================================
-# 🔐 Dependency: Only secretaries can access
+# 🔐 Dependency: Current principal (bearer token; legacy ?user_id= only if enabled)
 # ======================================================
-def get_current_secretary(user_id: int, db: Session = Depends(get_db)) -> UserDB:
-    user = db.query(UserDB).filter(UserDB.id == user_id).first()
-    if not user:
+def get_current_principal(
+    legacy_user_id: Optional[int] = Query(
+        None, alias="user_id", description="Legacy (AUTH_LEGACY_USER_ID): acting user id when no bearer token is sent"
+    ),
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """
+    A valid bearer token is trusted on its claims (no query).
+    The unauthenticated user_id is honoured only when AUTH_LEGACY_USER_ID is on.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        try:
+            principal = principal_from_token(db, authorization[7:].strip())
+        except InvalidToken as e:
+            raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    elif legacy_user_id is not None and LEGACY_USER_ID:
+        principal = get_principal(db, legacy_user_id)
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+    if not principal:
         raise HTTPException(status_code=404, detail="User not found")
-    if user.role != "secretary":
+    return principal
+
+# ======================================================
+# 🔐 Dependency: Only secretaries can access
+# ======================================================
+def get_current_secretary(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if principal.role != "secretary":
         raise HTTPException(status_code=403, detail="Not authorized")
-    return user
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail=f"Account is not active (status: {principal.status})")
+    return principal
+
+# ======================================================
+# 🔐 Dependency: Secretaries and captains
+# ======================================================
+def get_current_staff(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if principal.role not in ("secretary", "captain"):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail=f"Account is not active (status: {principal.status})")
+    return principal
 
 # ======================================================
 # 🔍 Search Residents
@@ -32,8 +71,8 @@ def search_residents(
     query: Optional[str] = Query(None, description="Search by first, middle, last name"),
     purok: Optional[str] = Query(None),
     barangay: Optional[str] = Query(None),
-    current_user: UserDB = Depends(get_current_secretary),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_secretary),
+    db: Session = Depends(get_read_db)
 ):
     """
     Secretaries can search residents by name, purok, or barangay.
@@ -57,15 +96,51 @@ def search_residents(
     residents = residents_query.all()
 
     # Optional: Format DOB for response
+    from .users import safe_dob  # here, not at the top: routes.users imports this module's guards
     for r in residents:
         r.dob = safe_dob(r.dob)
 
     return [ResidentResponse.from_orm(r) for r in residents]
 
 
-def calculate_years(dob: datetime) -> int:
-    today = date.today()
-    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+# ======================================================
+# 📊 Census Analytics
+# ======================================================
+@router.get("/residents/analytics", response_model=CensusAnalyticsResponse)
+def census_analytics(
+    purok: Optional[str] = Query(None, description="Limit to one purok (exact name)"),
+    as_of: Optional[date] = Query(None, description="Compute ages on this date (default today)"),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Age brackets, minors/seniors, gender ratios per purok and years-of-residency
+    distribution for the masterlist, computed from cached NumPy arrays.
+    """
+    try:
+        arrays = get_census_arrays(db)
+    except CensusUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return CensusAnalyticsResponse(**census_summary(arrays, as_of=as_of, purok=purok))
+
+
+# ======================================================
+# 📥 Import Masterlist (CSV / XLSX)
+# ======================================================
+@router.post("/residents/import", response_model=ResidentImportResult)
+def import_masterlist(
+    file: UploadFile = File(..., description="Census masterlist as .csv or .xlsx"),
+    current_user: Principal = Depends(get_current_secretary),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a census file into the resident masterlist.
+    Rows already in the masterlist (same name and DOB) are skipped; invalid rows are rejected.
+    """
+    try:
+        rows = iter_upload_rows(file.filename, file.file)
+        result = import_residents(db, rows)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-# Example when adding a resident
-resident.number_of_years = calculate_years(resident.dob)
\ No newline at end of file
+    return ResidentImportResult(**result)
@@ -0,0 +1,105 @@
+# routes/stats.py
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from database import get_db, get_read_db
+from schemas import RequestStatsResponse, UserStatsResponse, TurnaroundResponse
+from utils.auth import Principal
+from utils.query_budget import query_budget
+from utils.stats_rollup import read_rollup, recompute_rollups
+from utils.request_events import STATUS_CODES, turnaround_percentiles
+from .secretary import get_current_staff
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Statistics"]
+)
+
+
+def _status_totals(breakdown: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    totals: Dict[str, int] = {}
+    for by_status in breakdown.values():
+        for status, count in by_status.items():
+            totals[status] = totals.get(status, 0) + count
+    return totals
+
+
+# ======================================================
+# 📊 DASHBOARD STATISTICS (served from stats_rollup)
+# ======================================================
+@router.get("/requests", response_model=RequestStatsResponse)
+@query_budget(max_queries=1, label="GET /stats/requests")
+def request_stats(
+    months: Optional[int] = Query(None, ge=1, le=120, description="Only the most recent N months in by_month"),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_read_db)
+):
+    """Non-deleted document requests by status, document type, requester's purok and month filed."""
+    rollup = read_rollup(db, "requests")
+    by_month = dict(sorted(rollup["month"].items()))
+    if months:
+        by_month = dict(list(by_month.items())[-months:])
+
+    # Every request sits in exactly one document_type bucket, so it doubles as the status total
+    by_status = _status_totals(rollup["document_type"])
+    return RequestStatsResponse(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_document_type=rollup["document_type"],
+        by_purok=rollup["purok"],
+        by_month=by_month,
+    )
+
+
+@router.get("/users", response_model=UserStatsResponse)
+@query_budget(max_queries=1, label="GET /stats/users")
+def user_stats(
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_read_db)
+):
+    """Registered users by status, role, purok and gender."""
+    rollup = read_rollup(db, "users")
+    by_status = _status_totals(rollup["role"])
+    return UserStatsResponse(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_role=rollup["role"],
+        by_purok=rollup["purok"],
+        by_gender=rollup["gender"],
+    )
+
+
+@router.get("/turnaround", response_model=TurnaroundResponse)
+def turnaround_stats(
+    from_status: str = Query("Pending"),
+    to_status: str = Query("Completed"),
+    days: int = Query(90, ge=1, le=366),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Turnaround percentiles (hours) per document type, from the first `from_status`
+    event to the first `to_status` event, for requests that reached `to_status`
+    in the last `days` days. Read from document_request_events, not notifications.
+    """
+    for value in (from_status, to_status):
+        if value not in STATUS_CODES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {value}")
+    return TurnaroundResponse(
+        from_status=from_status,
+        to_status=to_status,
+        days=days,
+        by_document_type=turnaround_percentiles(db, from_status, to_status, days),
+    )
+
+
+@router.post("/recompute")
+def recompute_stats(
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    """Rebuild the rollups from the source tables (repair after Core writes or manual SQL)."""
+    rows = recompute_rollups(db)
+    return {"message": "Statistics recomputed", "rows": rows}
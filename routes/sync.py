@@ -0,0 +1,176 @@
+# routes/sync.py
+"""
+Delta sync for the offline client.
+
+Tokens are opaque to the client. On SQLite (one writer at a time) a token is
+the last change-log seq sent. On PostgreSQL concurrent transactions commit out
+of seq order, so seq 10 can become visible after seq 11 was already handed
+out; there a token is "<txid>:<seq>" and a sync only returns rows written by
+transactions older than the oldest one still running (pg_snapshot_xmin), so
+every row below the token is final. A long-open transaction therefore delays
+(never loses) changes.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, select, func, or_, text, tuple_
+from typing import Optional, Tuple
+
+from database import get_db
+from models import ChangeLogDB, DocumentRequestDB, NotificationDB, UserDB
+from schemas import SyncResponse, DeletedDocumentRequest, UserResponse, NotificationResponse
+from utils.auth import Principal
+from utils.change_log import record_changes  # noqa: F401  (registers the flush hook)
+from .document_requests import document_request_response
+from .secretary import get_current_principal
+from .users import safe_dob
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"]
+)
+
+SYNC_PAGE_SIZE = 500
+
+
+def _watermark(db: Session) -> Optional[int]:
+    """PostgreSQL: oldest transaction id still running; None elsewhere."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+
+def _parse_token(since: str) -> Tuple[Optional[int], int]:
+    """(txid or None, seq) from "<seq>" or "<txid>:<seq>"."""
+    txid, _, seq = since.rpartition(":")
+    try:
+        return (int(txid) if txid else None), int(seq)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def _profile(user: UserDB) -> UserResponse:
+    user.dob = safe_dob(user.dob)
+    return UserResponse.from_orm(user)
+
+
+# ======================================================
+# 📦 FULL SNAPSHOT (first sync)
+# ======================================================
+def _snapshot(db: Session, user: UserDB, is_staff: bool) -> SyncResponse:
+    # Read the token first: anything committed while we load is re-sent next sync
+    watermark = _watermark(db)
+    if watermark is None:
+        token = str(db.query(func.coalesce(func.max(ChangeLogDB.seq), 0)).scalar())
+    else:
+        token = f"{watermark}:0"
+
+    requests_query = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(
+        DocumentRequestDB.is_deleted == False
+    )
+    if not is_staff:
+        requests_query = requests_query.filter(DocumentRequestDB.user_id == user.id)
+
+    notifications = db.query(NotificationDB).filter(NotificationDB.user_id == user.id).all()
+
+    return SyncResponse(
+        token=token,
+        has_more=False,
+        document_requests=[document_request_response(r) for r in requests_query.all()],
+        notifications=[NotificationResponse.from_orm(n) for n in notifications],
+        profile=_profile(user),
+    )
+
+
+# ======================================================
+# 🔄 DELTA SYNC
+# ======================================================
+@router.get("", response_model=SyncResponse)
+def sync_changes(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full snapshot"),
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """
+    Return only what changed since `since`, for the bearer token's user:
+    - document requests (all requests for active staff, own requests otherwise)
+    - the user's notifications
+    - the user's profile
+    Soft-deleted requests and deleted notifications come back as tombstones.
+    """
+    user = db.query(UserDB).filter(UserDB.id == principal.id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    is_staff = principal.is_staff and principal.is_active
+
+    if since is None:
+        return _snapshot(db, user, is_staff)
+
+    since_txid, since_seq = _parse_token(since)
+    watermark = _watermark(db)
+
+    visible = ChangeLogDB.owner_id == user.id
+    if is_staff:
+        visible = or_(visible, ChangeLogDB.entity == "document_request")
+
+    if watermark is None:
+        after, order = ChangeLogDB.seq > since_seq, (ChangeLogDB.seq,)
+    else:
+        if since_txid is None:
+            # A plain seq token: resume from the oldest transaction that wrote past it
+            since_txid = db.query(func.min(ChangeLogDB.txid)).filter(ChangeLogDB.seq > since_seq).scalar()
+            since_txid, since_seq = (watermark, 0) if since_txid is None else (since_txid, 0)
+        after = and_(
+            ChangeLogDB.txid < watermark,
+            tuple_(ChangeLogDB.txid, ChangeLogDB.seq) > tuple_(since_txid, since_seq),
+        )
+        order = (ChangeLogDB.txid, ChangeLogDB.seq)
+
+    changes = db.execute(
+        select(ChangeLogDB.seq, ChangeLogDB.txid, ChangeLogDB.entity, ChangeLogDB.entity_id)
+        .where(after, visible)
+        .order_by(*order)
+        .limit(SYNC_PAGE_SIZE + 1)
+    ).all()
+
+    has_more = len(changes) > SYNC_PAGE_SIZE
+    changes = changes[:SYNC_PAGE_SIZE]
+    if watermark is None:
+        token = str(changes[-1].seq if changes else since_seq)
+    elif has_more:
+        token = f"{changes[-1].txid}:{changes[-1].seq}"
+    else:
+        # Every row below the watermark has been sent; start at it next time
+        token = f"{max(watermark, since_txid)}:0"
+    if not changes:
+        return SyncResponse(token=token, has_more=False)
+
+    # Collapse repeated changes to the same row; the current row state is what gets sent
+    request_ids = {c.entity_id for c in changes if c.entity == "document_request"}
+    notification_ids = {c.entity_id for c in changes if c.entity == "notification"}
+    profile_changed = any(c.entity == "user" and c.entity_id == user.id for c in changes)
+
+    response = SyncResponse(token=token, has_more=has_more)
+
+    if request_ids:
+        rows = db.query(DocumentRequestDB).options(joinedload(DocumentRequestDB.user)).filter(
+            DocumentRequestDB.id.in_(request_ids)
+        ).all()
+        found = set()
+        for r in rows:
+            found.add(r.id)
+            if r.is_deleted:
+                response.deleted_document_requests.append(DeletedDocumentRequest(id=r.id, deleted_at=r.deleted_at))
+            else:
+                response.document_requests.append(document_request_response(r))
+        # Hard-deleted rows (e.g. removed with their user)
+        response.deleted_document_requests += [DeletedDocumentRequest(id=i) for i in request_ids - found]
+
+    if notification_ids:
+        rows = db.query(NotificationDB).filter(NotificationDB.id.in_(notification_ids)).all()
+        response.notifications = [NotificationResponse.from_orm(n) for n in rows]
+        response.deleted_notifications = sorted(notification_ids - {n.id for n in rows})
+
+    if profile_changed:
+        response.profile = _profile(user)
+
+    return response
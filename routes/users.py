@@ -1,30 +1,53 @@
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List
-import hashlib
+from typing import List, Tuple
+import logging
+import os
 from datetime import datetime, timedelta
-from database import get_db
+from database import get_db, get_async_db
+from utils.metrics import observe_sms
+from utils.tracing import span, KIND_CLIENT
+from utils.auth import Principal, issue_token, TOKEN_TTL_SECONDS
+from utils.tenancy import render_message
+from utils.otp_store import otp_store, generate_code, OTPResult, EXPIRED, LOCKED, MISSING
+from utils.passwords import (
+    verify_password_async, hash_password_async, hash_password_bounded,
+    needs_rehash, PasswordServiceBusy,
+)
 from models import UserDB, NotificationDB
-from schemas import UserCreate, UserResponse, UserLogin, UserUpdate
-from sqlalchemy import func
+from schemas import (
+    UserCreate, UserResponse, UserLogin, UserUpdate,
+    BulkReviewAction, BulkReviewResponse, BulkStatusUpdateResult
+)
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
+import time
 import requests
 import json
 import re
+from .secretary import get_current_staff
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"]
 )
+logger = logging.getLogger(__name__)
+sms_logger = logging.getLogger("sms")
+
+# Log outgoing SMS instead of calling the provider (benchmarks, load tests, local dev)
+SMS_DRY_RUN = os.getenv("SMS_DRY_RUN", "").strip().lower() in ("1", "true", "yes")
 
 # ======================================================
 # 🔐 PASSWORD HANDLING
 # ======================================================
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return hash_password(plain) == hashed
+# Hashing lives in utils/passwords.py (scrypt on a bounded worker pool).
+def password_service_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
 
 
 # ======================================================
@@ -122,6 +145,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     if not user.photo or user.photo.strip() == "":
         raise HTTPException(status_code=400, detail="Photo is required")
 
+    try:
+        hashed_password = hash_password_bounded(user.password.strip())
+    except PasswordServiceBusy:
+        raise password_service_busy()
+
     # ---------------- Create UserDB Object ----------------
     db_user = UserDB(
         first_name=user.firstName.strip(),
@@ -137,7 +165,7 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         province=user.province.strip(),
         postal_code=str(user.postalCode).strip(),
         place_of_birth=user.placeOfBirth.strip() if user.placeOfBirth else None,  # ✅ Added
-        password=hash_password(user.password.strip()),
+        password=hashed_password,
         photo=user.photo,
         role=user.role.strip() if user.role else "resident",
         status="Pending"
@@ -167,18 +195,27 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 # 🔑 LOGIN
 # ======================================================
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     try:
         normalized_contact = normalize_contact(user.contact)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    db_user = db.query(UserDB).filter(UserDB.contact == normalized_contact).first()
+    result = await db.execute(select(UserDB).where(UserDB.contact == normalized_contact))
+    db_user = result.scalars().first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(user.password, db_user.password):
-        raise HTTPException(status_code=401, detail="Incorrect password")
+    try:
+        if not await verify_password_async(user.password, db_user.password):
+            raise HTTPException(status_code=401, detail="Incorrect password")
+
+        # Upgrade legacy SHA-256 (or weaker scrypt) hashes while we have the plaintext
+        if needs_rehash(db_user.password):
+            db_user.password = await hash_password_async(user.password)
+            await db.commit()
+    except PasswordServiceBusy:
+        raise password_service_busy()
 
     if db_user.role == "resident" and db_user.status != "Approved":
         raise HTTPException(
@@ -189,6 +226,9 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     db_user.dob = safe_dob(db_user.dob)
     return {
         "user": UserResponse.from_orm(db_user),
+        "access_token": issue_token(db_user),
+        "token_type": "bearer",
+        "expires_in": TOKEN_TTL_SECONDS,
         "message": "Login successful — user synced for offline use.",
         "can_offline": True
     }
@@ -198,13 +238,16 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 # 🔍 VERIFY USER STATUS
 # ======================================================
 @router.get("/verify/{contact}")
-def verify_user_status(contact: str, db: Session = Depends(get_db)):
+async def verify_user_status(contact: str, db: AsyncSession = Depends(get_async_db)):
     try:
         normalized_contact = normalize_contact(contact)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid contact number")
 
-    user = db.query(UserDB).filter(UserDB.contact == normalized_contact).first()
+    result = await db.execute(
+        select(UserDB.status, UserDB.role).where(UserDB.contact == normalized_contact)
+    )
+    user = result.first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -224,7 +267,7 @@ def get_users(db: Session = Depends(get_db)):
             u.dob = safe_dob(u.dob)
             valid_users.append(UserResponse.from_orm(u))
         except Exception as e:
-            print(f"⚠️ Skipping user {u.id}: {e}")
+            logger.warning("Skipping user %s: %s", u.id, e)
 
     return valid_users
 
@@ -233,8 +276,8 @@ def get_users(db: Session = Depends(get_db)):
 # 🔍 GET USER BY ID
 # ======================================================
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = db.query(UserDB).filter(UserDB.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.get(UserDB, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -251,6 +294,7 @@ def send_sms_semaphore(ph_number: str, message: str):
     url = "https://api.semaphore.co/api/v4/messages"
 
     if not (ph_number.startswith("09") and len(ph_number) == 11):
+        observe_sms("invalid_number", 0.0)
         return {"error": f"Invalid PH number: {ph_number}"}
 
     payload = {
@@ -260,15 +304,21 @@ def send_sms_semaphore(ph_number: str, message: str):
         "sendername": sender_name
     }
 
-    print("\n=== 📤 Sending SMS via SEMAPHORE ===")
-    print("To:", ph_number)
-    print("Message:", message)
-    print("=====================\n")
+    if SMS_DRY_RUN:
+        observe_sms("dry_run", 0.0)
+        sms_logger.info("SMS dry run", extra={"phone": ph_number, "sms_message": message})
+        return {"dry_run": True}
+
+    sms_logger.info("Sending SMS via Semaphore", extra={"phone": ph_number, "sms_message": message})
 
+    start = time.perf_counter()
     try:
-        resp = requests.post(url, data=payload, timeout=15)
-        print("HTTP Status:", resp.status_code)
-        print("Raw Response:", resp.text)
+        with span("sms.send", KIND_CLIENT, **{"http.method": "POST", "http.url": url}) as sms_span:
+            resp = requests.post(url, data=payload, timeout=15)
+            if sms_span:
+                sms_span.set_attribute("http.status_code", resp.status_code)
+        observe_sms("sent" if resp.status_code < 400 else "rejected", time.perf_counter() - start)
+        sms_logger.info("Semaphore response", extra={"phone": ph_number, "http_status": resp.status_code, "body": resp.text[:500]})
 
         try:
             result = resp.json()
@@ -278,34 +328,29 @@ def send_sms_semaphore(ph_number: str, message: str):
         return result
 
     except Exception as e:
-        print("💥 Error sending SMS:", e)
+        observe_sms("error", time.perf_counter() - start)
+        sms_logger.exception("Error sending SMS", extra={"phone": ph_number})
         return {"error": str(e)}
 
+def send_sms_batch(messages: List[Tuple[str, str]]):
+    """Send queued (phone, message) SMS after the response has been returned."""
+    for phone, message in messages:
+        try:
+            result = send_sms_semaphore(phone, message)
+            sms_logger.info("SMS sent", extra={"phone": phone, "result": result})
+        except Exception:
+            sms_logger.exception("Failed to send SMS", extra={"phone": phone})
+
 # ======================================================
-# ✅ APPROVE OR REJECT PENDING UPDATES (BY SECRETARY)
+# 📝 REVIEW DECISION HELPERS
 # ======================================================
-@router.put("/approve/{user_id}")
-def approve_pending_update(
-    user_id: int,
-    action: dict = Body(...),
-    db: Session = Depends(get_db)
-):
-    user = db.query(UserDB).filter(UserDB.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    if not user.pending_updates:
-        raise HTTPException(status_code=400, detail="No pending updates to approve")
-
-    decision = action.get("action")
+def apply_profile_update_decision(user: UserDB, decision: str) -> Tuple[NotificationDB, str]:
+    """Apply or discard pending profile changes. Returns the notification and SMS text."""
     if decision == "approve":
-        # Apply all pending updates
         for field, value in user.pending_updates.items():
             setattr(user, field, value)
         user.pending_updates = None
         user.status = "Approved"
-
-        # Create notification
         notif = NotificationDB(
             title="Profile Update Approved",
             message="Your profile update has been approved.",
@@ -313,42 +358,150 @@ def approve_pending_update(
             user_id=user.id,
             created_at=datetime.utcnow()
         )
-        db.add(notif)
-        db.commit()
-
-        # Send SMS to user
-        try:
-            send_sms_semaphore(user.contact, "Hi, your profile update has been approved. - BarangayConnect")
-        except Exception as e:
-            print("Failed to send approval SMS:", e)
+        return notif, render_message("profile_update_approved_sms")
+
+    user.pending_updates = None
+    user.status = "Rejected"
+    notif = NotificationDB(
+        title="Profile Update Rejected",
+        message="Your requested profile changes were rejected.",
+        type="rejection",
+        user_id=user.id,
+        created_at=datetime.utcnow()
+    )
+    return notif, render_message("profile_update_rejected_sms")
 
-        return {"message": "Pending updates approved."}
 
-    elif decision == "reject":
-        # Clear pending updates
-        user.pending_updates = None
-        user.status = "Rejected"
+def apply_registration_decision(user: UserDB, decision: str) -> Tuple[NotificationDB, str]:
+    """Approve or reject a new registration. Returns the notification and SMS text (<150 chars)."""
+    full_name = f"{user.first_name} {user.last_name}".strip()
 
-        # Create notification
+    if decision == "approve":
+        user.status = "Approved"
         notif = NotificationDB(
-            title="Profile Update Rejected",
-            message="Your requested profile changes were rejected.",
-            type="rejection",
+            title="Account Approved",
+            message=render_message("registration_approved", full_name=full_name),
+            type="registration_approval",
             user_id=user.id,
             created_at=datetime.utcnow()
         )
-        db.add(notif)
+        return notif, render_message("registration_approved_sms", full_name=full_name)
+
+    user.status = "Rejected"
+    notif = NotificationDB(
+        title="Registration Rejected",
+        message=render_message("registration_rejected", full_name=full_name),
+        type="registration_rejection",
+        user_id=user.id,
+        created_at=datetime.utcnow()
+    )
+    return notif, render_message("registration_rejected_sms", full_name=full_name)
+
+
+def bulk_review(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    payload: BulkReviewAction,
+    is_pending,
+    not_pending_error: str,
+    apply_decision,
+    actor: Principal,
+    what: str
+) -> BulkReviewResponse:
+    """
+    Apply one decision to many users in a single transaction with batched notifications and SMS.
+    The reviewing staff member (actor) gets a staff_action notification as the record.
+    """
+    if payload.action not in ["approve", "reject"]:
+        raise HTTPException(status_code=400, detail="Invalid action parameter. Use 'approve' or 'reject'.")
+
+    users_by_id = {u.id: u for u in db.query(UserDB).filter(UserDB.id.in_(payload.user_ids)).all()}
+    results: List[BulkStatusUpdateResult] = []
+    notifications: List[NotificationDB] = []
+    sms_queue: List[Tuple[str, str]] = []
+
+    for user_id in dict.fromkeys(payload.user_ids):
+        user = users_by_id.get(user_id)
+        if not user:
+            results.append(BulkStatusUpdateResult(id=user_id, ok=False, error="User not found"))
+            continue
+        if not is_pending(user):
+            results.append(BulkStatusUpdateResult(id=user_id, ok=False, error=not_pending_error))
+            continue
+
+        notif, sms_message = apply_decision(user, payload.action)
+        notifications.append(notif)
+        sms_queue.append((user.contact, sms_message))
+        results.append(BulkStatusUpdateResult(id=user_id, ok=True, status=user.status))
+
+    updated = len(notifications)
+    if notifications:
+        verb = "approved" if payload.action == "approve" else "rejected"
+        notifications.append(NotificationDB(
+            title="Bulk Review",
+            message=f"You {verb} {updated} {what}.",
+            type="staff_action",
+            user_id=actor.id,
+            created_at=datetime.utcnow()
+        ))
+        db.add_all(notifications)
         db.commit()
+        logger.info("Bulk review", extra={"actor_id": actor.id, "action": payload.action, "what": what, "updated": updated})
+        background_tasks.add_task(send_sms_batch, sms_queue)
 
-        # Send SMS to user
-        try:
-            send_sms_semaphore(user.contact, "Hi, your profile update was not approved. Please visit the barangay office for details. - BarangayConnect")
-        except Exception as e:
-            print("Failed to send rejection SMS:", e)
+    return BulkReviewResponse(updated=updated, failed=len(results) - updated, results=results)
 
-        return {"message": "Pending updates rejected."}
+# ======================================================
+# ✅ APPROVE OR REJECT PENDING UPDATES (BY SECRETARY)
+# ======================================================
+@router.put("/approve/{user_id}")
+def approve_pending_update(
+    user_id: int,
+    action: dict = Body(...),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    user = db.query(UserDB).filter(UserDB.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
 
-    raise HTTPException(status_code=400, detail="Invalid action parameter.")
+    if not user.pending_updates:
+        raise HTTPException(status_code=400, detail="No pending updates to approve")
+
+    decision = action.get("action")
+    if decision not in ["approve", "reject"]:
+        raise HTTPException(status_code=400, detail="Invalid action parameter.")
+
+    notif, sms_message = apply_profile_update_decision(user, decision)
+    db.add(notif)
+    db.commit()
+
+    # Send SMS to user
+    try:
+        send_sms_semaphore(user.contact, sms_message)
+    except Exception:
+        sms_logger.exception("Failed to send %s SMS", decision, extra={"phone": user.contact})
+
+    if decision == "approve":
+        return {"message": "Pending updates approved."}
+    return {"message": "Pending updates rejected."}
+
+
+@router.post("/approve/bulk", response_model=BulkReviewResponse)
+def bulk_approve_pending_updates(
+    background_tasks: BackgroundTasks,
+    payload: BulkReviewAction = Body(...),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    return bulk_review(
+        db, background_tasks, payload,
+        is_pending=lambda u: bool(u.pending_updates),
+        not_pending_error="No pending updates",
+        apply_decision=apply_profile_update_decision,
+        actor=current_user,
+        what="profile update(s)"
+    )
 
 # ======================================================
 # ✅ VERIFY NEWLY REGISTERED USER (Approve or Reject)
@@ -357,6 +510,7 @@ def approve_pending_update(
 def verify_registration(
     user_id: int,
     action: dict = Body(...),  # expects {"action": "approve"} or {"action": "reject"}
+    current_user: Principal = Depends(get_current_staff),
     db: Session = Depends(get_db)
 ):
     # 🔍 Fetch user
@@ -371,110 +525,100 @@ def verify_registration(
             detail="Invalid action parameter. Use 'approve' or 'reject'."
         )
 
-    full_name = f"{user.first_name} {user.last_name}".strip()
+    notif, sms_message = apply_registration_decision(user, decision)
+    db.add(notif)
+    db.commit()
+    db.refresh(user)
+
+    try:
+        send_sms_semaphore(user.contact, sms_message)
+        sms_logger.info("SMS sent", extra={"phone": user.contact})
+    except Exception:
+        sms_logger.exception("Failed to send %s SMS", decision, extra={"phone": user.contact})
 
-    # ✅ APPROVE
     if decision == "approve":
-        user.status = "Approved"
+        return {"message": "User registration approved and SMS sent."}
+    return {"message": "User registration rejected and SMS sent."}
 
-        notif = NotificationDB(
-            title="Account Approved",
-            message=(
-                f"Hi {full_name}, your registration has been approved. "
-                "You can now log in to the BarangayConnect system."
-            ),
-            type="registration_approval",
-            user_id=user.id,
-            created_at=datetime.utcnow()
-        )
-        db.add(notif)
-        db.commit()
-        db.refresh(user)
 
-        # ✉️ Concise SMS (<150 chars)
-        sms_message = (
-            f"Hi {full_name}, your registration is approved by Barangay Tilhaong. "
-            "You may now log in to BarangayConnect."
-        )
+@router.post("/verify/bulk", response_model=BulkReviewResponse)
+def bulk_verify_registrations(
+    background_tasks: BackgroundTasks,
+    payload: BulkReviewAction = Body(...),
+    current_user: Principal = Depends(get_current_staff),
+    db: Session = Depends(get_db)
+):
+    return bulk_review(
+        db, background_tasks, payload,
+        is_pending=lambda u: u.status == "Pending",
+        not_pending_error="Registration is not pending",
+        apply_decision=apply_registration_decision,
+        actor=current_user,
+        what="registration(s)"
+    )
 
-        try:
-            send_sms_semaphore(user.contact, sms_message)
-            print(f"SMS sent to {user.contact}: {sms_message}")
-        except Exception as e:
-            print("Failed to send approval SMS:", e)
+# ======================================================
+# 🔢 ONE-TIME CODES
+# ======================================================
+OTP_TTL_SECONDS = 300
 
-        return {"message": "User registration approved and SMS sent."}
+def raise_for_otp(result: OTPResult, mismatch_detail: str):
+    """Translate a failed OTP check into the HTTP error the app expects."""
+    if result.status == EXPIRED:
+        raise HTTPException(status_code=400, detail="OTP expired. Request a new one.")
+    if result.status == MISSING:  # never sent, already used, or deleted after a lockout
+        raise HTTPException(status_code=400, detail="No active code. Request a new one.")
+    if result.status == LOCKED:
+        raise HTTPException(status_code=429, detail="Too many incorrect attempts. Request a new code.")
+    raise HTTPException(status_code=400, detail=mismatch_detail)
 
-    # ❌ REJECT
-    elif decision == "reject":
-        user.status = "Rejected"
 
-        notif = NotificationDB(
-            title="Registration Rejected",
-            message=(
-                f"Hi {full_name}, your registration has been rejected. "
-                "Please contact the Barangay Tilhaong Office for more information."
-            ),
-            type="registration_rejection",
-            user_id=user.id,
-            created_at=datetime.utcnow()
-        )
-        db.add(notif)
-        db.commit()
-        db.refresh(user)
+@router.post("/verify-contact/{user_id}/send-otp")
+def send_contact_change_otp(user_id: int, data: dict = Body(...), db: Session = Depends(get_db)):
+    """Send a code to the new number; the user's contact only changes once it is verified."""
+    try:
+        new_contact = normalize_contact(data.get("new_contact") or "")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid new contact number format")
 
-        # ✉️ Concise rejection SMS (<150 chars)
-        sms_message = (
-            f"Hi {full_name}, your registration was not approved. "
-            "Please visit the Barangay Tilhaong office for assistance."
-        )
+    if not db.query(UserDB.id).filter(UserDB.id == user_id).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    if db.query(UserDB.id).filter(UserDB.contact == new_contact).first():
+        raise HTTPException(status_code=400, detail="Contact number already in use")
 
-        try:
-            send_sms_semaphore(user.contact, sms_message)
-            print(f"SMS sent to {user.contact}: {sms_message}")
-        except Exception as e:
-            print("Failed to send rejection SMS:", e)
+    otp = generate_code()
+    otp_store.issue("contact_change", str(user_id), otp, OTP_TTL_SECONDS, payload={"new_contact": new_contact})
+
+    try:
+        send_sms_semaphore(new_contact, render_message("contact_change_otp", otp=otp))
+    except Exception:
+        sms_logger.exception("Failed to send contact change OTP SMS")
+
+    return {"message": "Verification code sent. It is valid for 5 minutes."}
 
-        return {"message": "User registration rejected and SMS sent."}
 
 @router.post("/verify-contact/{user_id}")
 def verify_contact_change(user_id: int, data: dict = Body(...), db: Session = Depends(get_db)):
-    user = db.query(UserDB).filter(UserDB.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     otp_provided = data.get("otp")
     if not otp_provided:
         raise HTTPException(status_code=400, detail="OTP is required")
 
-    # Check OTP match
-    if user.new_contact_otp != otp_provided:
-        raise HTTPException(status_code=400, detail="Invalid OTP")
-
-    # Check OTP expiration
-    from datetime import datetime, timedelta
-    if not user.new_contact_otp_created_at or datetime.utcnow() > user.new_contact_otp_created_at + timedelta(minutes=5):
-        user.new_contact_temp = None
-        user.new_contact_otp = None
-        user.new_contact_otp_created_at = None
-        db.commit()
-        raise HTTPException(status_code=400, detail="OTP expired. Request a new one.")
-
-    # Normalize new contact
-    try:
-        normalized_contact = normalize_contact(user.new_contact_temp)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid new contact number format")
+    # Check the code without touching the users table
+    result = otp_store.verify("contact_change", str(user_id), str(otp_provided))
+    if not result.ok:
+        raise_for_otp(result, "Invalid OTP")
+    normalized_contact = result.payload["new_contact"]
 
     # Check for duplicates
-    if db.query(UserDB).filter(UserDB.contact == normalized_contact).first():
+    if db.query(UserDB.id).filter(UserDB.contact == normalized_contact).first():
         raise HTTPException(status_code=400, detail="Contact number already in use")
 
+    user = db.get(UserDB, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Apply new contact
     user.contact = normalized_contact
-    user.new_contact_temp = None
-    user.new_contact_otp = None
-    user.new_contact_otp_created_at = None
     user.status = "Approved"
     db.add(NotificationDB(
         user_id=user.id,
@@ -489,8 +633,8 @@ def verify_contact_change(user_id: int, data: dict = Body(...), db: Session = De
     # SMS confirmation
     try:
         send_sms_semaphore(user.contact, "Your contact number has been updated successfully.")
-    except Exception as e:
-        print("SMS sending failed:", e)
+    except Exception:
+        sms_logger.exception("Failed to send contact update SMS")
 
     return {"message": "Contact number updated successfully."}
 
@@ -505,29 +649,20 @@ def forgot_password_send_otp(data: dict = Body(...), db: Session = Depends(get_d
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid contact number format")
 
-    user = db.query(UserDB).filter(UserDB.contact == normalized_contact).first()
-    if not user:
+    if not db.query(UserDB.id).filter(UserDB.contact == normalized_contact).first():
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Generate OTP
-    import random
-    import secrets
-    otp = str(secrets.randbelow(900000) + 100000)
-
-
-    from datetime import datetime
-    user.reset_otp = otp
-    user.reset_otp_created_at = datetime.utcnow()
-
-    db.commit()
+    # Generate OTP (stored outside the users table until it is verified)
+    otp = generate_code()
+    otp_store.issue("password_reset", normalized_contact, otp, OTP_TTL_SECONDS)
 
     try:
         send_sms_semaphore(
             normalized_contact,
-            f"BarangayConnect: Your password reset code is {otp}. It expires in 5 minutes."
+            render_message("password_reset_otp", otp=otp)
         )
-    except Exception as e:
-        print("Failed to send reset OTP SMS:", e)
+    except Exception:
+        sms_logger.exception("Failed to send reset OTP SMS")
 
     return {"message": "Verification code sent. It is valid for 5 minutes."}
 
@@ -545,36 +680,30 @@ def forgot_password_verify(data: dict = Body(...), db: Session = Depends(get_db)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid contact number format")
 
+    # Check OTP
+    result = otp_store.verify("password_reset", normalized_contact, str(otp))
+    if not result.ok:
+        raise_for_otp(result, "Incorrect OTP")
+
     user = db.query(UserDB).filter(UserDB.contact == normalized_contact).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Check OTP match
-    if user.reset_otp != otp:
-        raise HTTPException(status_code=400, detail="Incorrect OTP")
-
-    # Check OTP expiration
-    from datetime import datetime, timedelta
-    if datetime.utcnow() > user.reset_otp_created_at + timedelta(minutes=5):
-        user.reset_otp = None
-        user.reset_otp_created_at = None
-        db.commit()
-        raise HTTPException(status_code=400, detail="OTP expired. Request a new one.")
-
     # Update password
-    user.password = hash_password(new_password)
-    user.reset_otp = None
-    user.reset_otp_created_at = None
+    try:
+        user.password = hash_password_bounded(new_password)
+    except PasswordServiceBusy:
+        raise password_service_busy()
 
     db.commit()
 
     try:
         send_sms_semaphore(
             normalized_contact,
-            "Your password has been successfully reset. - BarangayConnect"
+            render_message("password_reset_done")
         )
-    except Exception as e:
-        print("Failed to send password reset confirmation SMS:", e)
+    except Exception:
+        sms_logger.exception("Failed to send password reset confirmation SMS")
 
     return {"message": "Password reset successful."}
 
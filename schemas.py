@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, ConfigDict
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Any, Optional, List, Dict
 
 # ---------------- User Schemas ----------------
 class UserCreate(BaseModel):
@@ -137,6 +137,62 @@ class StatusUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class BulkStatusUpdate(BaseModel):
+    items: List[StatusUpdate]
+    performed_by_id: Optional[int] = None  # ignored: the actor is the token's staff user
+
+
+class BulkStatusUpdateResult(BaseModel):
+    id: int
+    ok: bool
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkStatusUpdateResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkStatusUpdateResult]
+
+
+class RequestHistoryEvent(BaseModel):
+    status: str
+    performed_by_id: Optional[int] = None
+    performed_by_name: Optional[str] = None
+    performed_by_role: Optional[str] = None
+    at: datetime
+
+
+# ---------------- Review Queue Schemas ----------------
+class ReviewQueueItem(BaseModel):
+    kind: str  # registration | profile_update | document_request
+    id: int  # user id, or request id for document requests
+    user_id: int
+    name: str
+    contact: str
+    summary: str
+    pending_updates: Optional[dict] = None
+    created_at: Optional[datetime] = None
+
+
+class ReviewQueueResponse(BaseModel):
+    counts: Dict[str, int]
+    total: int
+    items: List[ReviewQueueItem]
+    next_offset: Optional[int] = None
+
+
+class BulkReviewAction(BaseModel):
+    user_ids: List[int]
+    action: str  # approve | reject
+
+
+class BulkReviewResponse(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkStatusUpdateResult]
+
+
 # ---------------- Notification Schema ----------------
 class NotificationResponse(BaseModel):
     id: int
@@ -169,3 +225,137 @@ class ResidentResponse(ResidentBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+
+class ResidentImportError(BaseModel):
+    row: int
+    reason: str
+
+
+class ResidentImportResult(BaseModel):
+    inserted: int
+    skipped: int
+    rejected: int
+    errors: List[ResidentImportError] = []
+
+
+class PurokCensus(BaseModel):
+    total: int
+    male: int
+    female: int
+    other: int
+    males_per_100_females: Optional[float] = None
+    minors: int
+    seniors: int
+
+
+class CensusAnalyticsResponse(BaseModel):
+    as_of: date
+    total: int
+    male: int
+    female: int
+    other: int
+    males_per_100_females: Optional[float] = None
+    minors: int
+    seniors: int
+    working_age: int
+    median_age: Optional[float] = None
+    age_brackets: Dict[str, int] = {}
+    by_purok: Dict[str, PurokCensus] = {}
+    residency_years: Dict[str, int] = {}
+    median_residency_years: Optional[float] = None
+
+
+# ---------------- Sync Schemas ----------------
+class DeletedDocumentRequest(BaseModel):
+    id: int
+    deleted_at: Optional[datetime] = None
+
+
+class SyncResponse(BaseModel):
+    token: str
+    has_more: bool = False
+    document_requests: List[DocumentRequestResponse] = []
+    deleted_document_requests: List[DeletedDocumentRequest] = []
+    notifications: List[NotificationResponse] = []
+    deleted_notifications: List[int] = []
+    profile: Optional[UserResponse] = None
+
+
+# ---------------- Admin / Diagnostics Schemas ----------------
+class SlowQueryEntry(BaseModel):
+    id: int
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Optional[Any] = None
+    database: Optional[str] = None
+    request: Optional[str] = None
+    plan: Optional[str] = None
+    plan_status: str
+
+
+class SlowQueryGroup(BaseModel):
+    shape: str
+    count: int
+    total_ms: float
+    max_ms: float
+    requests: List[str] = []
+
+
+class SlowQueryResponse(BaseModel):
+    threshold_ms: float
+    summary: List[SlowQueryGroup] = []
+    entries: List[SlowQueryEntry] = []
+
+
+# ---------------- Dashboard Statistics Schemas ----------------
+# Breakdowns map bucket -> status -> count, e.g. {"Purok 1": {"Pending": 3, "Completed": 10}}
+class RequestStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int] = {}
+    by_document_type: Dict[str, Dict[str, int]] = {}
+    by_purok: Dict[str, Dict[str, int]] = {}
+    by_month: Dict[str, Dict[str, int]] = {}
+
+
+class UserStatsResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int] = {}
+    by_role: Dict[str, Dict[str, int]] = {}
+    by_purok: Dict[str, Dict[str, int]] = {}
+    by_gender: Dict[str, Dict[str, int]] = {}
+
+
+class TurnaroundStats(BaseModel):
+    count: int
+    p50_hours: float
+    p90_hours: float
+    p95_hours: float
+
+
+class TurnaroundResponse(BaseModel):
+    from_status: str
+    to_status: str
+    days: int
+    by_document_type: Dict[str, TurnaroundStats] = {}
+
+
+# ---------------- Batch Schemas ----------------
+class BatchSubRequest(BaseModel):
+    method: str = "GET"
+    path: str
+    params: Optional[Dict[str, Any]] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+
+class BatchItemResult(BaseModel):
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
@@ -1,10 +1,11 @@
 from database import SessionLocal
 from models import UserDB
-import hashlib
+from utils.passwords import hash_password
+from utils.tenancy import current_tenant
+import logging
+from datetime import datetime
 
-# --- Helper function for hashing ---
-def hash_password(password: str):
-    return hashlib.sha256(password.encode()).hexdigest()
+logger = logging.getLogger(__name__)
 
 # --- Seed admins (secretary & captain) ---
 def seed_admins():
@@ -17,21 +18,21 @@ def seed_admins():
                 first_name="System",
                 middle_name=None,
                 last_name="Secretary",
-                dob="1970-01-01",            # default dob
+                dob=datetime(1970, 1, 1),     # default dob
                 gender="N/A",
                 civil_status="N/A",
                 contact="+639123456789",
                 purok="N/A",                  # default purok
-                barangay="DefaultBarangay",
+                barangay=current_tenant().barangay,
                 city="DefaultCity",
                 province="DefaultProvince",
                 postal_code="0000",
                 password=hash_password("secret123"),
                 photo="default_photo.png",     # default photo
                 role="secretary",
-                status="Pending",
+                status="Approved",
             ))
-            print("✅ Secretary account created.")
+            logger.info("Secretary account created.")
 
         # Captain account
         captain = db.query(UserDB).filter(UserDB.role == "captain").first()
@@ -40,21 +41,28 @@ def seed_admins():
                 first_name="System",
                 middle_name=None,
                 last_name="Captain",
-                dob="1970-01-01",            # default dob
+                dob=datetime(1970, 1, 1),     # default dob
                 gender="N/A",
                 civil_status="N/A",
                 contact="+639987654321",
                 purok="N/A",                  # default purok
-                barangay="DefaultBarangay",
+                barangay=current_tenant().barangay,
                 city="DefaultCity",
                 province="DefaultProvince",
                 postal_code="0000",
                 password=hash_password("captain123"),
                 photo="default_photo.png",     # default photo
                 role="captain",
-                status="Pending",
+                status="Approved",
             ))
-            print("✅ Captain account created.")
+            logger.info("Captain account created.")
+
+        # Staff routes require an Approved account; earlier seeds left staff Pending and
+        # there is no review flow for staff. Changed through the ORM so cached principals
+        # and already-issued tokens are re-checked.
+        for staff in db.query(UserDB).filter(UserDB.role.in_(("secretary", "captain")), UserDB.status == "Pending"):
+            staff.status = "Approved"
+            logger.info("Staff account activated.", extra={"user_id": staff.id, "role": staff.role})
 
         db.commit()
     finally:
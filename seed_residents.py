@@ -2,7 +2,7 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
 from database import engine, Base, SessionLocal
-from models import ResidentMasterlistDB
+from utils.masterlist_import import import_residents
 
 # ===========================
 # Step 1: Create Tables (if not exist)
@@ -86,18 +86,8 @@ residents_data = [
 # Step 3: Insert Seed Data
 # ===========================
 def seed_residents(session: Session):
-    for r in residents_data:
-        exists = session.query(ResidentMasterlistDB).filter(
-            ResidentMasterlistDB.first_name == r["first_name"],
-            ResidentMasterlistDB.middle_name == r["middle_name"],
-            ResidentMasterlistDB.last_name == r["last_name"],
-            ResidentMasterlistDB.dob == r["dob"]
-        ).first()
-        if not exists:
-            resident = ResidentMasterlistDB(**r)
-            session.add(resident)
-    session.commit()
-    print("✅ Seeded all residents successfully!")
+    result = import_residents(session, residents_data)
+    print(f"✅ Seeded residents: {result['inserted']} inserted, {result['skipped']} already present, {result['rejected']} rejected.")
 
 # ===========================
 # Step 4: Run Seeder
@@ -82,10 +82,12 @@ export class DocumentRequestService {
   // -----------------------------------------
   // HEADERS
   // -----------------------------------------
-  private getHeaders() {
+  private getHeaders(): Record<string, string> {
+    const token = localStorage.getItem('token');
     return {
       'Content-Type': 'application/json',
-      'Accept': 'application/json'
+      'Accept': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {})
     };
   }
 
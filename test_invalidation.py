@@ -0,0 +1,123 @@
+"""
+Cross-worker cache invalidation against a real PostgreSQL server.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/barangay_test pytest test_invalidation.py
+
+Starts two worker processes with listeners and publishes from this one (a third
+worker): every committed event must reach both, rolled-back ones neither.
+Skipped without TEST_POSTGRES_URL (needs psycopg2 and a database you can LISTEN on).
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+PG_URL = os.getenv("TEST_POSTGRES_URL")
+pytestmark = pytest.mark.skipif(not PG_URL, reason="set TEST_POSTGRES_URL to a local PostgreSQL database")
+if PG_URL:
+    os.environ.setdefault("DATABASE_URL", PG_URL)
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+KIND = "test_probe"
+TIMEOUT = 15.0
+
+WORKER = f"""
+import sys
+from utils import invalidation
+
+@invalidation.on_invalidate({KIND!r})
+def probe(slug, key):
+    # key None is the drop-everything call made once LISTEN is in place
+    print("listening" if key is None else f"event {{slug}} {{key}}", flush=True)
+
+invalidation.start_listeners()
+sys.stdin.read()  # until the test closes stdin
+invalidation.stop_listeners()
+"""
+
+
+class Worker:
+    def __init__(self):
+        env = {**os.environ, "DATABASE_URL": PG_URL, "INVALIDATION_BUS": "postgres"}
+        self.proc = subprocess.Popen(
+            [sys.executable, "-c", WORKER], cwd=REPO_ROOT, env=env, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self.lines: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            self.lines.put(line.strip())
+
+    def expect(self, line: str, timeout: float = TIMEOUT):
+        deadline = time.monotonic() + timeout
+        seen = []
+        while time.monotonic() < deadline:
+            try:
+                got = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if got == line:
+                return seen
+            seen.append(got)
+        pytest.fail(f"worker never printed {line!r} (got {seen})")
+
+    def stop(self):
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+@pytest.fixture
+def workers():
+    pytest.importorskip("psycopg2")
+    started = [Worker(), Worker()]
+    try:
+        for worker in started:
+            worker.expect("listening")
+        yield started
+    finally:
+        for worker in started:
+            worker.stop()
+
+
+@pytest.fixture
+def session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(PG_URL)
+    with Session(engine) as s:
+        yield s
+    engine.dispose()
+
+
+def test_committed_events_reach_every_worker(workers, session):
+    from utils.invalidation import publish
+    from utils.tenancy import current_tenant
+
+    publish(session, KIND, "42")
+    session.commit()
+    for worker in workers:
+        worker.expect(f"event {current_tenant().slug} 42")
+
+
+def test_rolled_back_events_are_not_sent(workers, session):
+    from utils.invalidation import publish
+    from utils.tenancy import current_tenant
+
+    publish(session, KIND, "rolled-back")
+    session.rollback()
+    publish(session, KIND, "after")
+    session.commit()
+    for worker in workers:
+        skipped = worker.expect(f"event {current_tenant().slug} after")
+        assert not any(line.endswith(" rolled-back") for line in skipped)
+
@@ -0,0 +1,79 @@
+"""
+Delta sync against a real PostgreSQL server.
+
+    TEST_POSTGRES_URL=postgresql://postgres@localhost/barangay_test pytest test_sync.py
+
+Two transactions write change-log rows and commit in the opposite order to the
+one they took their seqs in; no sync may skip the row that committed last.
+Skipped without TEST_POSTGRES_URL (needs psycopg2).
+"""
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+PG_URL = os.getenv("TEST_POSTGRES_URL")
+pytestmark = pytest.mark.skipif(not PG_URL, reason="set TEST_POSTGRES_URL to a local PostgreSQL database")
+if PG_URL:
+    os.environ["DATABASE_URL"] = PG_URL
+
+
+@pytest.fixture
+def user_id():
+    pytest.importorskip("psycopg2")
+    from database import SessionLocal, prepare_tenant_database
+    from models import UserDB
+    from utils.tenancy import current_tenant
+
+    prepare_tenant_database(current_tenant())
+    with SessionLocal() as db:
+        user = UserDB(
+            first_name="Sync", last_name="Test", dob=datetime(1990, 1, 1), gender="Female",
+            civil_status="Single", contact=f"test-{uuid.uuid4().hex[:12]}", purok="Centro",
+            barangay="Tilhaong", city="Consolacion", province="Cebu", postal_code="6001",
+            password="x", role="resident", status="Approved",
+        )
+        db.add(user)
+        db.commit()
+        yield user.id
+        db.delete(user)
+        db.commit()
+
+
+def sync(user_id: int, since):
+    from database import SessionLocal
+    from routes.sync import sync_changes
+    from utils.auth import get_principal
+
+    with SessionLocal() as db:
+        return sync_changes(since=since, principal=get_principal(db, user_id), db=db)
+
+
+def notify(db, user_id: int, title: str):
+    from models import NotificationDB
+
+    db.add(NotificationDB(user_id=user_id, title=title, message=title))
+    db.flush()  # takes its change-log seq now
+
+
+def test_out_of_order_commits_are_not_skipped(user_id):
+    from database import SessionLocal
+
+    token = sync(user_id, None).token
+    seen = []
+    with SessionLocal() as slow, SessionLocal() as fast:
+        notify(slow, user_id, "slow")  # lower seq, still in flight
+        notify(fast, user_id, "fast")
+        fast.commit()
+
+        response = sync(user_id, token)
+        seen += [n.title for n in response.notifications]
+        token = response.token
+        assert "fast" not in seen, "handed out a token past an in-flight transaction's seq"
+
+        slow.commit()
+
+    response = sync(user_id, token)
+    seen += [n.title for n in response.notifications]
+    assert sorted(seen) == ["fast", "slow"]
@@ -0,0 +1,313 @@
+# utils/admission.py
+"""
+Admission control: token-bucket rate limits and a global concurrency cap.
+
+ADMISSION_MAX_CONCURRENCY      requests in flight per worker, 0 = no cap (default 200)
+ADMISSION_STAFF_RESERVED       slots of that cap only staff requests may use (default 20)
+ADMISSION_REDIS_URL            share buckets between workers through Redis (optional;
+                               needs the `redis` package), otherwise buckets are per worker
+TRUSTED_PROXIES                comma-separated proxy addresses/CIDRs whose X-Forwarded-For
+                               is believed (default none); main.py applies it app-wide
+                               with uvicorn's ProxyHeadersMiddleware
+
+Per-endpoint limits are "<burst>/<seconds>" strings, e.g. ADMISSION_LOGIN_IP="30/60"
+allows bursts of 30 that refill over 60 seconds. Rejected requests get 429 (rate
+limit) or 503 (overloaded) with Retry-After.
+
+Per-IP buckets are keyed by the connection's peer address (scope["client"]),
+never by a raw X-Forwarded-For header: a client could rotate that to get a
+fresh bucket on every request.
+
+The middleware puts itself in scope["admission"] so in-process dispatchers
+(POST /batch) can charge each sub-request through rate_limit() as well.
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from utils.auth import InvalidToken, decode_token
+from utils.metrics import Counter
+
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total", "Requests rejected by admission control", ("reason", "rule"),
+)
+
+TRUSTED_PROXIES = [p.strip() for p in os.getenv("TRUSTED_PROXIES", "").split(",") if p.strip()]
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_TRACKED_BUCKETS = 100000
+
+STAFF_PATH_PREFIXES = ("/secretary", "/review-queue", "/exports", "/admin", "/users/approve", "/users/verify/bulk")
+UNCAPPED_PATHS = ("/metrics", "/ping")
+
+
+def parse_limit(spec: str) -> Tuple[float, float]:
+    """'30/60' -> (burst=30, refill_rate=0.5 tokens/s)."""
+    burst, _, seconds = spec.partition("/")
+    return float(burst), float(burst) / float(seconds or 1)
+
+
+def _contact_key(value) -> Optional[str]:
+    digits = re.sub(r"\D", "", str(value or ""))
+    return digits[-10:] if len(digits) >= 10 else None
+
+
+# ======================================================
+# 🪣 TOKEN BUCKET STORES
+# ======================================================
+class MemoryBucketStore:
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, burst: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_TRACKED_BUCKETS:
+                    self._prune(now)
+                bucket = self._buckets[key] = [burst, now, burst, rate]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, 0.0
+            bucket[0] = tokens
+            return False, (cost - tokens) / rate
+
+    def _prune(self, now: float):
+        # Buckets that would be full again carry no state worth keeping
+        for key in [k for k, (tokens, ts, burst, rate) in self._buckets.items() if tokens + (now - ts) * rate >= burst]:
+            del self._buckets[key]
+
+
+_REDIS_TAKE = """
+local b = redis.call('HMGET', KEYS[1], 't', 'ts')
+local burst, rate, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed, retry = 0, 0
+if tokens >= cost then tokens = tokens - cost; allowed = 1 else retry = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared by all workers; each take is one atomic Lua call."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("ADMISSION_REDIS_URL is set but the 'redis' package is not installed")
+        self._redis = redis_asyncio.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TAKE)
+
+    async def take(self, key: str, burst: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, retry = await self._script(keys=[f"admission:{key}"], args=[burst, rate, time.time(), cost])
+        return bool(int(allowed)), float(retry)
+
+
+def create_bucket_store():
+    url = os.getenv("ADMISSION_REDIS_URL")
+    return RedisBucketStore(url) if url else MemoryBucketStore()
+
+
+# ======================================================
+# 📏 RATE LIMIT RULES
+# ======================================================
+@dataclass
+class RateRule:
+    name: str
+    method: str
+    pattern: "re.Pattern"
+    ip_limit: Optional[Tuple[float, float]] = None
+    contact_limit: Optional[Tuple[float, float]] = None
+    contact_from_body: bool = False
+    contact_field: str = "contact"
+
+    def contact(self, match, body: bytes) -> Optional[str]:
+        if "contact" in match.groupdict():
+            return _contact_key(match.group("contact"))
+        if self.contact_from_body and body and len(body) <= MAX_BODY_BYTES:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                return None
+            if isinstance(data, dict):
+                return _contact_key(data.get(self.contact_field))
+        return None
+
+
+def _limit(env: str, default: str) -> Tuple[float, float]:
+    return parse_limit(os.getenv(env, default))
+
+
+def default_rules() -> List[RateRule]:
+    return [
+        RateRule(
+            "login", "POST", re.compile(r"^/users/login/?$"),
+            ip_limit=_limit("ADMISSION_LOGIN_IP", "30/60"),
+            contact_limit=_limit("ADMISSION_LOGIN_CONTACT", "10/300"),
+            contact_from_body=True,
+        ),
+        RateRule(
+            "send_otp", "POST", re.compile(r"^/users/forgot-password/send-otp/?$"),
+            ip_limit=_limit("ADMISSION_OTP_IP", "10/600"),
+            contact_limit=_limit("ADMISSION_OTP_CONTACT", "3/900"),
+            contact_from_body=True,
+        ),
+        RateRule(
+            "contact_change_otp", "POST", re.compile(r"^/users/verify-contact/\d+/send-otp/?$"),
+            ip_limit=_limit("ADMISSION_OTP_IP", "10/600"),
+            contact_limit=_limit("ADMISSION_OTP_CONTACT", "3/900"),
+            contact_from_body=True,
+            contact_field="new_contact",
+        ),
+        RateRule(
+            "verify_contact", "GET", re.compile(r"^/users/verify/(?P<contact>(?!bulk/?$)[^/]+)/?$"),
+            ip_limit=_limit("ADMISSION_VERIFY_IP", "60/60"),
+            contact_limit=_limit("ADMISSION_VERIFY_CONTACT", "20/60"),
+        ),
+    ]
+
+
+# ======================================================
+# 🚦 MIDDLEWARE
+# ======================================================
+def _client_ip(scope) -> str:
+    """The peer address; already the real client's when it came through a TRUSTED_PROXIES hop."""
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _is_staff_request(scope) -> bool:
+    if scope["path"].startswith(STAFF_PATH_PREFIXES):
+        return True
+    authorization = dict(scope["headers"]).get(b"authorization", b"")
+    if authorization[:7].lower() != b"bearer ":
+        return False
+    try:
+        claims = decode_token(authorization[7:].decode("latin-1").strip())
+    except (InvalidToken, UnicodeDecodeError):
+        return False
+    return (claims.get("role") or "").lower() in ("secretary", "captain")
+
+
+def _reject(status_code: int, retry_after: float, detail: str) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionControlMiddleware:
+    def __init__(
+        self,
+        app,
+        rules: Optional[List[RateRule]] = None,
+        store=None,
+        max_concurrency: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 200)),
+        staff_reserved: int = int(os.getenv("ADMISSION_STAFF_RESERVED", 20)),
+    ):
+        self.app = app
+        self.rules = rules if rules is not None else default_rules()
+        self.store = store or create_bucket_store()
+        self.max_concurrency = max_concurrency
+        self.staff_reserved = min(staff_reserved, max_concurrency)
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+        scope["admission"] = self
+
+        # ---- rate limits (only the throttled endpoints pay for this) ----
+        rejection, receive = await self.rate_limit(scope, receive)
+        if rejection is not None:
+            return await rejection(scope, receive, send)
+
+        # ---- global concurrency cap, with headroom kept for staff ----
+        if self.max_concurrency <= 0 or scope["path"] in UNCAPPED_PATHS:
+            return await self.app(scope, receive, send)
+
+        limit = self.max_concurrency if _is_staff_request(scope) else self.max_concurrency - self.staff_reserved
+        if self.in_flight >= limit:
+            ADMISSION_REJECTIONS.inc(reason="overloaded", rule="global")
+            return await _reject(503, 1, "Server is busy, please retry shortly.")(scope, receive, send)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def rate_limit(self, scope, receive) -> Tuple[Optional[JSONResponse], Callable]:
+        """
+        Charge the request against the first matching rule's buckets.
+        Returns (429 response or None, receive to use from now on).
+        """
+        for rule in self.rules:
+            if scope["method"] != rule.method:
+                continue
+            match = rule.pattern.match(scope["path"])
+            if not match:
+                continue
+            body = b""
+            if rule.contact_from_body:
+                body = await self._read_body(receive)
+                receive = self._replay(body, receive)
+            return await self._check_rule(rule, match, scope, body), receive
+        return None, receive
+
+    async def _check_rule(self, rule: RateRule, match, scope, body: bytes) -> Optional[JSONResponse]:
+        checks = []
+        if rule.ip_limit:
+            checks.append(("ip", f"{rule.name}:ip:{_client_ip(scope)}", rule.ip_limit))
+        contact = rule.contact(match, body) if rule.contact_limit else None
+        if contact:
+            checks.append(("contact", f"{rule.name}:contact:{contact}", rule.contact_limit))
+
+        for kind, key, (burst, rate) in checks:
+            allowed, retry_after = await self.store.take(key, burst, rate)
+            if not allowed:
+                ADMISSION_REJECTIONS.inc(reason=f"rate_limit_{kind}", rule=rule.name)
+                return _reject(429, retry_after, "Too many requests, please try again later.")
+        return None
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _replay(body: bytes, receive) -> Callable:
+        sent = False
+
+        async def replay_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay_receive
@@ -0,0 +1,238 @@
+# utils/auth.py
+"""
+Signed bearer tokens and an in-process principal cache.
+
+AUTH_SECRET_KEY          HMAC key for access tokens (required in production; a random
+                         per-process key is used otherwise, so tokens die on restart)
+AUTH_TOKEN_TTL_SECONDS   access token lifetime (default 43200 = 12 hours)
+PRINCIPAL_CACHE_TTL      seconds a looked-up principal is reused (default 60)
+AUTH_LEGACY_USER_ID      accept the unauthenticated ?user_id= on staff routes (default off;
+                         only for clients that predate bearer tokens, it trusts the caller)
+
+Tokens are HS256 JWTs carrying the user's id, role and status, so a valid token
+authorizes a request without touching the database. When a user's role or status
+is committed, their cached principal is dropped on every worker (utils.invalidation)
+and tokens issued before the change stop being trusted on their claims alone (they
+fall back to a cached lookup).
+
+Tokens name the barangay (tenant) they were issued for and are refused by any
+other; cached principals are keyed by tenant as user ids repeat across tenants.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from models import UserDB
+from utils.invalidation import on_invalidate, publish
+from utils.tenancy import DEFAULT_TENANT, Tenant, current_tenant
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", 12 * 3600))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+MAX_CACHED_PRINCIPALS = 10000
+LEGACY_USER_ID = os.getenv("AUTH_LEGACY_USER_ID", "").strip().lower() in ("1", "true", "yes")
+ACTIVE_STATUSES = ("Approved",)
+
+_secret = os.getenv("AUTH_SECRET_KEY")
+if not _secret:
+    logger.warning("AUTH_SECRET_KEY is not set; using a random key, tokens will not survive a restart")
+    _secret = os.urandom(32).hex()
+SECRET_KEY = _secret.encode()
+
+
+class InvalidToken(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    role: str
+    status: str
+    first_name: str = ""
+    last_name: str = ""
+
+    @property
+    def is_staff(self) -> bool:
+        return (self.role or "").lower() in ("secretary", "captain")
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+
+# ======================================================
+# 🔏 TOKENS (HS256 JWT)
+# ======================================================
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(SECRET_KEY, signing_input.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user: UserDB, ttl: int = TOKEN_TTL_SECONDS) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": str(user.id),
+        "role": user.role,
+        "status": user.status,
+        "name": [user.first_name or "", user.last_name or ""],
+        "tnt": current_tenant().slug,
+        "iat": now,
+        "exp": now + ttl,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{_HEADER}.{payload}"
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+def decode_token(token: str) -> dict:
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    try:
+        # compare_digest refuses non-ASCII str; anything but base64url is a bad signature anyway
+        supplied = signature.encode("ascii")
+        expected = _sign(f"{header}.{payload}").encode("ascii")
+    except UnicodeEncodeError:
+        raise InvalidToken("Bad signature")
+    if not hmac.compare_digest(supplied, expected):
+        raise InvalidToken("Bad signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if not isinstance(claims, dict) or "sub" not in claims:
+        raise InvalidToken("Malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("Token expired")
+    return claims
+
+
+# ======================================================
+# 🧠 PRINCIPAL CACHE
+# ======================================================
+# (tenant slug, user id) -> (expires_at, Principal)
+_principals: Dict[Tuple[str, int], tuple] = {}
+# (tenant slug, user id) -> time of the last committed role/status change
+_claims_changed_at: Dict[Tuple[str, int], float] = {}
+# tenant slug -> time every cached principal and claim was last distrusted
+_tenant_changed_at: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def _tenant_slug(db: Optional[Session] = None) -> str:
+    tenant = db.info.get("tenant") if db is not None else None
+    return (tenant or current_tenant()).slug
+
+
+def principal_from_user(user: UserDB) -> Principal:
+    return Principal(user.id, user.role, user.status, user.first_name or "", user.last_name or "")
+
+
+def invalidate_principal(user_id: int, tenant: Optional[Tenant] = None):
+    """Drop one user's cached principal in this worker; commits reach every worker via the flush hook."""
+    _invalidate((tenant or current_tenant()).slug, user_id)
+
+
+def _invalidate(slug: str, user_id: int):
+    key = (slug, user_id)
+    with _lock:
+        _principals.pop(key, None)
+        _claims_changed_at[key] = time.time()
+        if len(_claims_changed_at) > MAX_CACHED_PRINCIPALS:
+            cutoff = time.time() - TOKEN_TTL_SECONDS
+            for k in [k for k, at in _claims_changed_at.items() if at < cutoff]:
+                del _claims_changed_at[k]
+
+
+def invalidate_tenant_principals(slug: str):
+    """Forget every principal of a tenant and distrust all of its tokens' claims once."""
+    with _lock:
+        for key in [k for k in _principals if k[0] == slug]:
+            del _principals[key]
+        _tenant_changed_at[slug] = time.time()
+
+
+@on_invalidate("principal")
+def _on_principal_invalidated(slug: str, user_id: Optional[int]):
+    if user_id is None:
+        invalidate_tenant_principals(slug)
+    else:
+        _invalidate(slug, user_id)
+
+
+def get_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Cached principal for a user id; one primary-key lookup on a miss."""
+    now = time.monotonic()
+    key = (_tenant_slug(db), user_id)
+    cached = _principals.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    row = db.query(UserDB.id, UserDB.role, UserDB.status, UserDB.first_name, UserDB.last_name).filter(
+        UserDB.id == user_id
+    ).first()
+    if not row:
+        return None
+    principal = Principal(row.id, row.role, row.status, row.first_name or "", row.last_name or "")
+    with _lock:
+        if len(_principals) >= MAX_CACHED_PRINCIPALS:
+            for k in [k for k, (exp, _) in _principals.items() if exp <= now]:
+                del _principals[k]
+        _principals[key] = (now + PRINCIPAL_CACHE_TTL, principal)
+    return principal
+
+
+def principal_from_token(db: Session, token: str) -> Optional[Principal]:
+    """Principal for a bearer token; only looks the user up if their role/status changed after issue."""
+    claims = decode_token(token)
+    slug = _tenant_slug(db)
+    if (claims.get("tnt") or DEFAULT_TENANT) != slug:  # tokens from before tenancy belong to the default
+        raise InvalidToken("Token was issued for another barangay")
+    user_id = int(claims["sub"])
+    changed_at = max(_claims_changed_at.get((slug, user_id), 0), _tenant_changed_at.get(slug, 0))
+    if changed_at and claims.get("iat", 0) <= changed_at:
+        return get_principal(db, user_id)
+    first_name, last_name = (claims.get("name") or ["", ""])[:2]
+    return Principal(user_id, claims.get("role"), claims.get("status"), first_name, last_name)
+
+
+# ======================================================
+# 🔔 INVALIDATION ON ROLE / STATUS CHANGES
+# ======================================================
+_WATCHED = ("role", "status")
+
+
+@event.listens_for(Session, "after_flush")
+def _publish_principal_changes(session, flush_context):
+    """Queue a principal invalidation for every user whose role/status changed or who was deleted."""
+    for obj in session.dirty:
+        if isinstance(obj, UserDB):
+            state = sa_inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in _WATCHED):
+                publish(session, "principal", obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, UserDB):
+            publish(session, "principal", obj.id)
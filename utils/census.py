@@ -0,0 +1,226 @@
+# utils/census.py
+"""
+Vectorized demographic analytics over the resident masterlist.
+
+CENSUS_CACHE_TTL   seconds the loaded arrays are reused before re-reading the table (default 600)
+
+The masterlist's DOB, gender, purok and years-of-residency columns are read once
+into NumPy arrays (~13 bytes per resident) and every statistic is computed from
+them with array operations, so a 500k-resident masterlist is summarised in tens
+of milliseconds. Arrays are cached per tenant. Imports publish a "census" event
+(utils.invalidation), which drops the cached arrays on every worker.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import ResidentMasterlistDB
+from utils.invalidation import on_invalidate
+from utils.tenancy import current_tenant
+
+try:
+    import numpy as np
+except ImportError:  # analytics are optional
+    np = None
+
+CACHE_TTL = float(os.getenv("CENSUS_CACHE_TTL", 600))
+LOAD_CHUNK = 50000
+
+# Lower bounds of each age bracket (years)
+AGE_BRACKETS = (0, 5, 12, 18, 30, 45, 60, 75)
+AGE_LABELS = ("0-4", "5-11", "12-17", "18-29", "30-44", "45-59", "60-74", "75+")
+MINOR_AGE = 18
+SENIOR_AGE = 60  # Senior Citizens Act
+
+RESIDENCY_BRACKETS = (0, 1, 5, 10, 20)
+RESIDENCY_LABELS = ("<1", "1-4", "5-9", "10-19", "20+")
+
+GENDERS = ("male", "female", "other")
+UNKNOWN_PUROK = "Unknown"
+
+
+class CensusUnavailable(RuntimeError):
+    pass
+
+
+@dataclass
+class CensusArrays:
+    birth_year: "np.ndarray"    # int16
+    birth_mmdd: "np.ndarray"    # int16, month * 100 + day
+    gender: "np.ndarray"        # int8 index into GENDERS
+    purok: "np.ndarray"         # int16 index into puroks
+    years: "np.ndarray"         # int16 years of residency, -1 = unknown
+    puroks: List[str]
+
+    def __len__(self):
+        return len(self.birth_year)
+
+
+def _gender_code(value: Optional[str]) -> int:
+    initial = (value or "").strip()[:1].lower()
+    return 0 if initial == "m" else 1 if initial == "f" else 2
+
+
+def build_arrays(dobs: Sequence, genders: Sequence, puroks: Sequence, years: Sequence) -> CensusArrays:
+    """Encode raw column values (dates/datetimes, strings, ints or None) as compact arrays."""
+    if np is None:
+        raise CensusUnavailable("Census analytics require the 'numpy' package")
+    dob = np.array([d.date() if hasattr(d, "date") else d for d in dobs], dtype="datetime64[D]")
+    month_start = dob.astype("datetime64[M]")
+    birth_year = (dob.astype("datetime64[Y]").astype(np.int64) + 1970).astype(np.int16)
+    birth_mmdd = ((month_start.astype(np.int64) % 12 + 1) * 100 + (dob - month_start).astype(np.int64) + 1).astype(np.int16)
+
+    purok_names = [(p or "").strip() or UNKNOWN_PUROK for p in puroks]
+    categories = sorted(set(purok_names))
+    index = {name: i for i, name in enumerate(categories)}
+
+    return CensusArrays(
+        birth_year=birth_year,
+        birth_mmdd=birth_mmdd,
+        gender=np.fromiter((_gender_code(g) for g in genders), dtype=np.int8, count=len(genders)),
+        purok=np.fromiter((index[p] for p in purok_names), dtype=np.int16, count=len(purok_names)),
+        years=np.fromiter((-1 if y is None else y for y in years), dtype=np.int16, count=len(years)),
+        puroks=categories,
+    )
+
+
+def load_arrays(db: Session) -> CensusArrays:
+    dobs, genders, puroks, years = [], [], [], []
+    result = db.execute(
+        select(
+            ResidentMasterlistDB.dob, ResidentMasterlistDB.gender,
+            ResidentMasterlistDB.purok, ResidentMasterlistDB.number_of_years,
+        ).execution_options(yield_per=LOAD_CHUNK)
+    )
+    for dob, gender, purok, number_of_years in result:
+        dobs.append(dob)
+        genders.append(gender)
+        puroks.append(purok)
+        years.append(number_of_years)
+    return build_arrays(dobs, genders, puroks, years)
+
+
+# ======================================================
+# 🧠 CACHE
+# ======================================================
+# tenant slug -> {"arrays", "loaded_at", "generation"}
+_caches: Dict[str, dict] = {}
+_cache_lock = threading.Lock()
+
+
+def _tenant_cache(slug: str) -> dict:
+    with _cache_lock:
+        return _caches.setdefault(slug, {"arrays": None, "loaded_at": 0.0, "generation": 0})
+
+
+@on_invalidate("census")
+def _on_census_invalidated(slug: str, key=None):
+    invalidate_census_cache(slug)
+
+
+def invalidate_census_cache(slug: Optional[str] = None):
+    cache = _tenant_cache(slug or current_tenant().slug)
+    with _cache_lock:
+        cache["arrays"] = None
+        cache["generation"] += 1
+
+
+def get_census_arrays(db: Session) -> CensusArrays:
+    """Cached arrays for the session's tenant; one full read of its masterlist per TTL or invalidation."""
+    cache = _tenant_cache((db.info.get("tenant") or current_tenant()).slug)
+    arrays, loaded_at = cache["arrays"], cache["loaded_at"]
+    if arrays is not None and time.monotonic() - loaded_at < CACHE_TTL:
+        return arrays
+
+    generation = cache["generation"]
+    arrays = load_arrays(db)
+    with _cache_lock:
+        # Don't install a snapshot an import invalidated while we were reading
+        if cache["generation"] == generation:
+            cache["arrays"], cache["loaded_at"] = arrays, time.monotonic()
+    return arrays
+
+
+# ======================================================
+# 📊 ANALYTICS
+# ======================================================
+def ages_on(arrays: CensusArrays, as_of: date) -> "np.ndarray":
+    before_birthday = (as_of.month * 100 + as_of.day) < arrays.birth_mmdd
+    return as_of.year - arrays.birth_year.astype(np.int32) - before_birthday
+
+
+def _counts(labels: Sequence[str], bins: "np.ndarray") -> Dict[str, int]:
+    return dict(zip(labels, np.bincount(bins, minlength=len(labels)).tolist()))
+
+
+def census_summary(arrays: CensusArrays, as_of: Optional[date] = None, purok: Optional[str] = None) -> dict:
+    as_of = as_of or date.today()
+    mask = None
+    if purok is not None:
+        if purok not in arrays.puroks:
+            mask = np.zeros(len(arrays), dtype=bool)
+        else:
+            mask = arrays.purok == arrays.puroks.index(purok)
+
+    ages = ages_on(arrays, as_of)
+    gender, purok_codes, years = arrays.gender, arrays.purok, arrays.years
+    if mask is not None:
+        ages, gender, purok_codes, years = ages[mask], gender[mask], purok_codes[mask], years[mask]
+
+    valid_ages = np.clip(ages, 0, None)
+    age_bins = np.searchsorted(AGE_BRACKETS, valid_ages, side="right") - 1
+    minor = ages < MINOR_AGE
+    senior = ages >= SENIOR_AGE
+
+    # Per-purok gender counts in one bincount over (purok, gender) pairs
+    n_puroks, n_genders = len(arrays.puroks), len(GENDERS)
+    by_gender = np.bincount(purok_codes.astype(np.int64) * n_genders + gender, minlength=n_puroks * n_genders)
+    by_gender = by_gender.reshape(n_puroks, n_genders)
+    minors_by_purok = np.bincount(purok_codes[minor], minlength=n_puroks)
+    seniors_by_purok = np.bincount(purok_codes[senior], minlength=n_puroks)
+
+    by_purok = {}
+    for i, name in enumerate(arrays.puroks):
+        male, female, other = by_gender[i].tolist()
+        total = male + female + other
+        if not total:
+            continue
+        by_purok[name] = {
+            "total": total,
+            "male": male,
+            "female": female,
+            "other": other,
+            "males_per_100_females": round(male * 100 / female, 1) if female else None,
+            "minors": int(minors_by_purok[i]),
+            "seniors": int(seniors_by_purok[i]),
+        }
+
+    known_years = years[years >= 0]
+    residency_bins = np.searchsorted(RESIDENCY_BRACKETS, known_years, side="right") - 1
+    residency = _counts(RESIDENCY_LABELS, residency_bins)
+    residency["unknown"] = int(len(years) - len(known_years))
+
+    total = int(len(ages))
+    male, female, other = np.bincount(gender, minlength=n_genders).tolist()
+    return {
+        "as_of": as_of,
+        "total": total,
+        "male": male,
+        "female": female,
+        "other": other,
+        "males_per_100_females": round(male * 100 / female, 1) if female else None,
+        "minors": int(minor.sum()),
+        "seniors": int(senior.sum()),
+        "working_age": int(total - minor.sum() - senior.sum()),
+        "median_age": float(np.median(ages)) if total else None,
+        "age_brackets": _counts(AGE_LABELS, age_bins),
+        "by_purok": by_purok,
+        "residency_years": residency,
+        "median_residency_years": float(np.median(known_years)) if len(known_years) else None,
+    }
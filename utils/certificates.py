@@ -0,0 +1,187 @@
+# utils/certificates.py
+"""
+Certificate rendering: per-document-type templates filled with resident data.
+
+CERTIFICATE_WORKERS          processes for batch printing (default: CPU count)
+CERTIFICATE_POOL_THRESHOLD   batches smaller than this render inline (default 16)
+
+A template is compiled once per process (compiled_template() is cached): its
+fixed text and rules become ready-made PDF operators and its paragraphs are
+pre-parsed into literal/field pieces, so rendering one certificate is string
+joins, word wrap and one zlib call. This module imports nothing from the app
+(no database), so the spawned print workers start quickly; routes build the
+plain-dict contexts (see CONTEXT_FIELDS) and hand them over.
+"""
+import multiprocessing
+import os
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from utils.pdf import BOLD, ITALIC, PAGE_HEIGHT, PAGE_WIDTH, REGULAR, PdfCanvas
+
+WORKERS = int(os.getenv("CERTIFICATE_WORKERS", 0)) or (os.cpu_count() or 1)
+POOL_THRESHOLD = int(os.getenv("CERTIFICATE_POOL_THRESHOLD", 16))
+
+CONTEXT_FIELDS = (
+    "full_name", "age", "gender", "civil_status", "dob", "place_of_birth",
+    "purok", "barangay", "barangay_name", "city", "province",
+    "document_type", "purpose", "control_no", "issued_day", "issued_month_year",
+    "captain_name",
+)
+
+# ======================================================
+# 📝 TEMPLATES
+# ======================================================
+_CERTIFY = "This is to certify that {full_name}, {age} years old, {civil_status}, "
+TEMPLATES: Dict[str, dict] = {
+    "Barangay Clearance": {
+        "title": "BARANGAY CLEARANCE",
+        "body": [
+            _CERTIFY + "a bona fide resident of Purok {purok}, {barangay_name}, {city}, {province}, "
+            "is known to be of good moral character and has no derogatory record on file in this office.",
+            "This clearance is issued upon the request of the above-named person for {purpose}.",
+        ],
+    },
+    "Certificate of Residency": {
+        "title": "CERTIFICATE OF RESIDENCY",
+        "body": [
+            _CERTIFY + "born on {dob} in {place_of_birth}, is a bona fide resident of Purok {purok}, "
+            "{barangay_name}, {city}, {province}.",
+            "This certification is issued upon the request of the above-named person for {purpose}.",
+        ],
+    },
+    "Certificate of Indigency": {
+        "title": "CERTIFICATE OF INDIGENCY",
+        "body": [
+            _CERTIFY + "a resident of Purok {purok}, {barangay_name}, {city}, {province}, "
+            "belongs to an indigent family of this barangay.",
+            "This certification is issued upon the request of the above-named person for {purpose}.",
+        ],
+    },
+}
+ALIASES = {"Barangay Indigency": "Certificate of Indigency"}
+GENERIC = {
+    "title": "CERTIFICATION",
+    "body": [
+        _CERTIFY + "is a resident of Purok {purok}, {barangay_name}, {city}, {province}.",
+        "This {document_type} is issued upon the request of the above-named person for {purpose}.",
+    ],
+}
+
+# Layout (points)
+MARGIN = 56
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+CENTER = PAGE_WIDTH / 2
+BODY_SIZE = 12
+LEADING = 19
+PARAGRAPH_GAP = 10
+INDENT = 36
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    document_type: str
+    static_ops: bytes                                   # border, fixed headings, signature block
+    paragraphs: Tuple[Tuple[Tuple[str, Optional[str]], ...], ...]   # (literal, field) pieces
+
+    def fill(self, pieces, context: Dict[str, str]) -> str:
+        return "".join(literal + (context.get(field) or "") if field else literal for literal, field in pieces)
+
+
+def _parse(text: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    pieces = []
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        if field is not None and field not in CONTEXT_FIELDS:
+            raise ValueError(f"Unknown certificate field '{{{field}}}'")
+        if spec or conversion:
+            raise ValueError(f"Format specs aren't supported in certificate templates: '{{{field}}}'")
+        pieces.append((literal, field))
+    return tuple(pieces)
+
+
+def _static_ops(title: str) -> bytes:
+    canvas = PdfCanvas()
+    canvas.rect(MARGIN / 2, MARGIN / 2, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN, width=1.5)
+    canvas.text(CENTER, PAGE_HEIGHT - 80, "Republic of the Philippines", REGULAR, 11, align="center")
+    canvas.text(CENTER, PAGE_HEIGHT - 152, "OFFICE OF THE PUNONG BARANGAY", BOLD, 11, align="center")
+    canvas.line(MARGIN, PAGE_HEIGHT - 166, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 166, width=1.2)
+    canvas.text(CENTER, PAGE_HEIGHT - 215, title, BOLD, 20, align="center")
+    canvas.text(MARGIN, PAGE_HEIGHT - 265, "TO WHOM IT MAY CONCERN:", BOLD, BODY_SIZE)
+    canvas.line(PAGE_WIDTH - MARGIN - 200, 190, PAGE_WIDTH - MARGIN, 190, width=0.8)
+    canvas.text(PAGE_WIDTH - MARGIN - 100, 176, "Punong Barangay", REGULAR, 11, align="center")
+    canvas.text(MARGIN, 80, "Not valid without the official barangay dry seal.", ITALIC, 9)
+    return canvas.ops()
+
+
+@lru_cache(maxsize=None)
+def compiled_template(document_type: str) -> CompiledTemplate:
+    """The template for a document type, compiled on first use in this process."""
+    source = TEMPLATES.get(ALIASES.get(document_type, document_type), GENERIC)
+    return CompiledTemplate(
+        document_type=document_type,
+        static_ops=_static_ops(source["title"]),
+        paragraphs=tuple(_parse(p) for p in source["body"]),
+    )
+
+
+# ======================================================
+# 🖨️ RENDERING
+# ======================================================
+def render_certificate(document_type: str, context: Dict[str, str]) -> bytes:
+    """One certificate page as a finished (compressed) PDF content stream."""
+    template = compiled_template(document_type)
+    canvas = PdfCanvas()
+    canvas.raw(template.static_ops)
+
+    canvas.text(CENTER, PAGE_HEIGHT - 96, f"Province of {context.get('province') or ''}", REGULAR, 11, align="center")
+    canvas.text(CENTER, PAGE_HEIGHT - 112, f"Municipality of {context.get('city') or ''}", REGULAR, 11, align="center")
+    canvas.text(CENTER, PAGE_HEIGHT - 132, (context.get("barangay_name") or "").upper(), BOLD, 14, align="center")
+
+    y = PAGE_HEIGHT - 300
+    for pieces in template.paragraphs:
+        y = canvas.paragraph(MARGIN, y, TEXT_WIDTH, template.fill(pieces, context), REGULAR, BODY_SIZE, LEADING, INDENT)
+        y -= PARAGRAPH_GAP
+    issued = (
+        f"Issued this {context.get('issued_day')} day of {context.get('issued_month_year')} at "
+        f"{context.get('barangay_name')}, {context.get('city')}, {context.get('province')}."
+    )
+    canvas.paragraph(MARGIN, y, TEXT_WIDTH, issued, REGULAR, BODY_SIZE, LEADING, INDENT)
+
+    canvas.text(PAGE_WIDTH - MARGIN - 100, 196, (context.get("captain_name") or "").upper(), BOLD, 12, align="center")
+    canvas.text(MARGIN, 96, f"Control No. {context.get('control_no')}", REGULAR, 9)
+    return canvas.finish()
+
+
+def _render_item(item: Tuple[str, Dict[str, str]]) -> bytes:
+    return render_certificate(*item)
+
+
+# ======================================================
+# 🧵 PRINT POOL
+# ======================================================
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the server process has threads (pools, listeners, log writer)
+            _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def render_many(items: Iterable[Tuple[str, Dict[str, str]]]) -> Iterator[bytes]:
+    """Pages for (document_type, context) items, in order; large batches use the process pool."""
+    items = list(items)
+    if len(items) < POOL_THRESHOLD or WORKERS <= 1:
+        for item in items:
+            yield _render_item(item)
+        return
+    chunksize = max(1, len(items) // (WORKERS * 4))
+    yield from _get_executor().map(_render_item, items, chunksize=chunksize)
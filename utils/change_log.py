@@ -0,0 +1,72 @@
+# utils/change_log.py
+from typing import Iterable, Tuple, Optional
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.orm import Session
+
+from models import ChangeLogDB, DocumentRequestDB, NotificationDB, UserDB
+
+# Only these user columns are synced to the client's offline profile
+SYNCED_PROFILE_FIELDS = [
+    "first_name", "middle_name", "last_name", "dob", "gender", "civil_status",
+    "contact", "purok", "barangay", "city", "province", "postal_code",
+    "place_of_birth", "photo", "role", "status",
+]
+
+
+def _insert(connection):
+    stmt = insert(ChangeLogDB.__table__)
+    if connection.dialect.name == "postgresql":
+        # Concurrent transactions commit out of seq order; /sync pages by transaction id instead
+        stmt = stmt.values(txid=text("pg_current_xact_id()::text::bigint"))
+    return stmt
+
+
+def _entry(obj, deleted: bool = False) -> Optional[dict]:
+    if isinstance(obj, DocumentRequestDB):
+        op = "delete" if deleted or obj.is_deleted else "upsert"
+        return {"entity": "document_request", "entity_id": obj.id, "owner_id": obj.user_id, "op": op}
+    if isinstance(obj, NotificationDB):
+        return {"entity": "notification", "entity_id": obj.id, "owner_id": obj.user_id, "op": "delete" if deleted else "upsert"}
+    if isinstance(obj, UserDB):
+        return {"entity": "user", "entity_id": obj.id, "owner_id": obj.id, "op": "delete" if deleted else "upsert"}
+    return None
+
+
+def _profile_changed(user: UserDB) -> bool:
+    state = inspect(user)
+    return any(state.attrs[f].history.has_changes() for f in SYNCED_PROFILE_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def record_changes(session: Session, flush_context):
+    """Append a change-log row for every synced entity written in this flush."""
+    entries = []
+    for obj in session.new:
+        entries.append(_entry(obj))
+    for obj in session.dirty:
+        if isinstance(obj, UserDB) and not _profile_changed(obj):
+            continue
+        if session.is_modified(obj, include_collections=False):
+            entries.append(_entry(obj))
+    for obj in session.deleted:
+        entries.append(_entry(obj, deleted=True))
+
+    entries = [e for e in entries if e is not None]
+    if entries:
+        # Core insert on the flush connection: same transaction as the change itself
+        connection = session.connection()
+        connection.execute(_insert(connection), entries)
+
+
+def log_changes(db: Session, entity: str, rows: Iterable[Tuple[int, Optional[int]]], op: str = "upsert"):
+    """
+    Record changes made with bulk Core statements, which bypass the flush hook.
+    `rows` are (entity_id, owner_id) pairs.
+    """
+    entries = [
+        {"entity": entity, "entity_id": entity_id, "owner_id": owner_id, "op": op}
+        for entity_id, owner_id in rows
+    ]
+    if entries:
+        db.execute(_insert(db.connection()), entries)
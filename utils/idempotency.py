@@ -0,0 +1,250 @@
+# utils/idempotency.py
+import asyncio
+import hashlib
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from database import SessionLocal
+from models import IdempotencyKeyDB
+from utils.auth import InvalidToken, decode_token
+
+HEADER = b"idempotency-key"
+TTL = timedelta(hours=int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+STALE_AFTER = timedelta(seconds=60)   # an in_progress claim older than this is considered abandoned
+WAIT_TIMEOUT = 10.0                   # seconds a duplicate waits for the original to finish
+POLL_INTERVAL = 0.1
+PURGE_EVERY = timedelta(minutes=10)
+
+CLAIMED = "claimed"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+
+# ======================================================
+# 🗄️ KEY STORE
+# ======================================================
+def _purge_expired(db, now: datetime):
+    db.execute(delete(IdempotencyKeyDB).where(IdempotencyKeyDB.expires_at < now))
+    db.commit()
+
+
+def claim_key(record_key: str, request_hash: str, purge: bool = False):
+    """
+    Try to claim a key for execution.
+    Returns CLAIMED, IN_PROGRESS, MISMATCH, or the stored IdempotencyKeyDB row for a replay.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        if purge:
+            _purge_expired(db, now)
+
+        for _ in range(2):
+            row = db.get(IdempotencyKeyDB, record_key)
+            if row and (row.expires_at < now or (row.status == IN_PROGRESS and row.created_at < now - STALE_AFTER)):
+                db.delete(row)
+                db.commit()
+                row = None
+
+            if row:
+                if row.request_hash != request_hash:
+                    return MISMATCH
+                if row.status == IN_PROGRESS:
+                    return IN_PROGRESS
+                db.expunge(row)
+                return row
+
+            try:
+                db.add(IdempotencyKeyDB(
+                    key=record_key,
+                    request_hash=request_hash,
+                    status=IN_PROGRESS,
+                    created_at=now,
+                    expires_at=now + TTL
+                ))
+                db.commit()
+                return CLAIMED
+            except IntegrityError:
+                db.rollback()  # another worker claimed it first; re-read its row
+        return IN_PROGRESS
+    finally:
+        db.close()
+
+
+def complete_key(record_key: str, status_code: int, body: bytes, content_type: Optional[str]):
+    db = SessionLocal()
+    try:
+        row = db.get(IdempotencyKeyDB, record_key)
+        if row:
+            row.status = "completed"
+            row.response_status = status_code
+            row.response_body = body.decode("utf-8", errors="replace")
+            row.response_content_type = content_type
+            db.commit()
+    finally:
+        db.close()
+
+
+def release_key(record_key: str):
+    """Drop a claim so a retry can execute again (used when the request failed)."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKeyDB).where(IdempotencyKeyDB.key == record_key))
+        db.commit()
+    finally:
+        db.close()
+
+
+# ======================================================
+# 🔁 MIDDLEWARE
+# ======================================================
+class IdempotencyMiddleware:
+    """
+    Makes POST endpoints safe to retry when the client sends an `Idempotency-Key` header.
+
+    - First request with a key executes normally; its response is stored for TTL.
+    - A replay with the same key and body gets the stored response without
+      re-running the endpoint (no inserts, notifications or SMS).
+    - Concurrent duplicates wait for the first execution and share its response.
+    - Reusing a key with a different body is rejected with 422.
+    Responses with status >= 500, 401 or 403 are not stored, so the client can
+    retry them (e.g. after refreshing an expired token).
+    Keys are scoped to the caller (the token's user, else the raw Authorization
+    header), so one caller can neither collide with nor replay another's key.
+    """
+
+    def __init__(self, app, paths: Iterable[str]):
+        self.app = app
+        self.paths = {p.rstrip("/") for p in paths}
+        self._locks = {}
+        self._last_purge = datetime.min
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"].rstrip("/") not in self.paths:
+            return await self.app(scope, receive, send)
+
+        header = dict(scope["headers"]).get(HEADER)
+        if not header:
+            return await self.app(scope, receive, send)
+
+        body = await self._read_body(receive)
+        record_key = hashlib.sha256(
+            b"POST " + scope["path"].encode() + b" " + self._caller(scope) + b" " + header
+        ).hexdigest()
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        # Collapse duplicates inside this worker; the table collapses them across workers
+        entry = self._locks.setdefault(record_key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._handle(scope, receive, send, body, record_key, request_hash)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(record_key, None)
+
+    async def _handle(self, scope, receive, send, body, record_key, request_hash):
+        now = datetime.utcnow()
+        purge = now - self._last_purge > PURGE_EVERY
+        if purge:
+            self._last_purge = now
+
+        waited = 0.0
+        while True:
+            outcome = await run_in_threadpool(claim_key, record_key, request_hash, purge)
+            purge = False
+            if outcome != IN_PROGRESS or waited >= WAIT_TIMEOUT:
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+            waited += POLL_INTERVAL
+
+        if outcome == MISMATCH:
+            response = JSONResponse(
+                status_code=422,
+                content={"detail": "Idempotency-Key was already used with a different request body."}
+            )
+            return await response(scope, self._empty_receive, send)
+
+        if outcome == IN_PROGRESS:
+            response = JSONResponse(
+                status_code=409,
+                content={"detail": "A request with this Idempotency-Key is still being processed."},
+                headers={"Retry-After": "1"}
+            )
+            return await response(scope, self._empty_receive, send)
+
+        if outcome != CLAIMED:
+            response = Response(
+                content=outcome.response_body,
+                status_code=outcome.response_status,
+                media_type=outcome.response_content_type,
+                headers={"Idempotent-Replayed": "true"}
+            )
+            return await response(scope, self._empty_receive, send)
+
+        await self._execute(scope, receive, send, body, record_key)
+
+    async def _execute(self, scope, receive, send, body, record_key):
+        captured = {"status": 500, "content_type": None, "body": bytearray()}
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()  # body already consumed; only a disconnect can follow
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        captured["content_type"] = value.decode()
+            elif message["type"] == "http.response.body":
+                captured["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await run_in_threadpool(release_key, record_key)
+            raise
+
+        if captured["status"] >= 500 or captured["status"] in (401, 403):
+            await run_in_threadpool(release_key, record_key)
+        else:
+            await run_in_threadpool(
+                complete_key, record_key, captured["status"], bytes(captured["body"]), captured["content_type"]
+            )
+
+    @staticmethod
+    def _caller(scope) -> bytes:
+        authorization = dict(scope["headers"]).get(b"authorization", b"")
+        if authorization[:7].lower() == b"bearer ":
+            try:
+                claims = decode_token(authorization[7:].decode("latin-1").strip())
+                return f"user:{claims['sub']}".encode()  # same user across token refreshes
+            except InvalidToken:
+                pass
+        return b"auth:" + authorization
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _empty_receive():
+        return {"type": "http.disconnect"}
@@ -0,0 +1,215 @@
+# utils/invalidation.py
+"""
+Cross-worker cache invalidation.
+
+INVALIDATION_BUS   auto | postgres | local (default auto: postgres for PostgreSQL databases)
+
+Write paths call publish(session, kind, key) inside their transaction. On PostgreSQL
+this runs pg_notify on the transaction's own connection, so the event reaches the
+other workers only if the write commits. Every worker runs a listener thread
+(LISTEN cache_invalidation, one per tenant database) that calls the handlers
+registered for `kind`. The publishing worker applies its events right after commit
+instead of waiting for its own notification. The local bus (SQLite, one worker)
+only does that last step.
+
+Notifications sent while a listener is disconnected are lost, so after every
+(re)connect the listener calls each handler with key=None: drop everything.
+"""
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, event, func, select as sa_select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from db_config import settings
+from utils.metrics import CACHE_INVALIDATIONS
+from utils.tenancy import Tenant, all_tenants, current_tenant
+
+logger = logging.getLogger(__name__)
+
+BUS = os.getenv("INVALIDATION_BUS", "auto").strip().lower()
+CHANNEL = "cache_invalidation"
+POLL_SECONDS = 5.0
+RECONNECT_SECONDS = (1, 2, 5, 10, 30)
+
+# Tells this worker's own notifications apart from the others'
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# kind -> handlers called as handler(tenant_slug, key); key None means "everything"
+Handler = Callable[[str, object], None]
+_handlers: Dict[str, List[Handler]] = {}
+
+
+def on_invalidate(kind: str):
+    """Register a handler for one kind of event (decorator)."""
+    def register(handler: Handler) -> Handler:
+        _handlers.setdefault(kind, []).append(handler)
+        return handler
+    return register
+
+
+def registered_kinds() -> List[str]:
+    return sorted(_handlers)
+
+
+def dispatch(slug: str, kind: str, key=None, source: str = "local"):
+    for handler in _handlers.get(kind, ()):
+        try:
+            handler(slug, key)
+        except Exception:
+            logger.exception("Invalidation handler failed", extra={"kind": kind, "tenant": slug})
+    CACHE_INVALIDATIONS.inc(kind=kind, source=source)
+
+
+def _encode(slug: str, kind: str, key) -> str:
+    return json.dumps({"o": ORIGIN, "t": slug, "k": kind, "i": key}, separators=(",", ":"))
+
+
+def _uses_notify(bind) -> bool:
+    if BUS == "local":
+        return False
+    return BUS == "postgres" or bind.dialect.name == "postgresql"
+
+
+# ======================================================
+# 📣 PUBLISH (in the writer's transaction)
+# ======================================================
+def publish(session: Session, kind: str, key=None):
+    """
+    Invalidate `kind`/`key` on every worker once the session's transaction commits.
+    Safe to call from flush hooks; repeated events in one transaction are sent once.
+    """
+    tenant: Tenant = session.info.get("tenant") or current_tenant()
+    pending: List[Tuple[str, str, object]] = session.info.setdefault("invalidations", [])
+    entry = (tenant.slug, kind, key)
+    if entry in pending:
+        return
+    pending.append(entry)
+    if _uses_notify(session.get_bind()):
+        session.connection().execute(sa_select(func.pg_notify(CHANNEL, _encode(*entry))))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_local(session):
+    for slug, kind, key in session.info.pop("invalidations", ()):
+        dispatch(slug, kind, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_local(session):
+    session.info.pop("invalidations", None)
+
+
+# ======================================================
+# 👂 LISTENERS (one thread per PostgreSQL database)
+# ======================================================
+class _Listener(threading.Thread):
+    def __init__(self, url: str, tenant_slugs: List[str]):
+        super().__init__(name=f"invalidation-listener-{make_url(url).database}", daemon=True)
+        self.engine = create_engine(url, poolclass=NullPool)
+        self.tenant_slugs = tenant_slugs
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _connect(self):
+        # Keep the pool's wrapper for as long as we listen: under NullPool, dropping
+        # it closes the DBAPI connection underneath us
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+        except Exception:
+            raw.close()
+            raise
+        return raw
+
+    def _drop_everything(self):
+        for slug in self.tenant_slugs:
+            for kind in list(_handlers):
+                dispatch(slug, kind, None, source="reconnect")
+
+    def _handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation payload", extra={"payload": payload[:200]})
+            return
+        if message.get("o") == ORIGIN:
+            return  # applied after our own commit
+        dispatch(message["t"], message["k"], message.get("i"), source="notify")
+
+    def run(self):
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                raw = self._connect()
+            except Exception:
+                delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+                logger.warning("Invalidation listener cannot connect; retrying", extra={"retry_in": delay}, exc_info=True)
+                attempt += 1
+                self._stop_event.wait(delay)
+                continue
+
+            attempt = 0
+            conn = raw.driver_connection
+            self._drop_everything()
+            try:
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._handle(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.warning("Invalidation listener lost its connection", exc_info=True)
+            finally:
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+
+
+_listeners: List[_Listener] = []
+
+
+def _listen_urls() -> Dict[str, List[str]]:
+    """PostgreSQL database URL -> slugs of the tenants stored in it."""
+    urls: Dict[str, List[str]] = {}
+    for tenant in all_tenants():
+        url = tenant.database_url or settings.url
+        if make_url(url).get_backend_name() == "postgresql":
+            urls.setdefault(url, []).append(tenant.slug)
+    return urls
+
+
+def start_listeners():
+    """Start this worker's listeners (startup); a no-op on the local bus."""
+    if BUS == "local" or _listeners:
+        return
+    for url, slugs in _listen_urls().items():
+        if make_url(url).get_driver_name() != "psycopg2":
+            logger.warning("Invalidation listener needs psycopg2; other workers' writes reach this one only by TTL",
+                           extra={"database": make_url(url).database})
+            continue
+        listener = _Listener(url, slugs)
+        listener.start()
+        _listeners.append(listener)
+
+
+def stop_listeners():
+    for listener in _listeners:
+        listener.stop()
+    for listener in _listeners:
+        listener.join(timeout=POLL_SECONDS + 1)
+    _listeners.clear()
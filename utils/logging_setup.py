@@ -0,0 +1,199 @@
+# utils/logging_setup.py
+"""
+Application logging: records are filtered and redacted in the calling thread,
+then handed to a queue; a single background thread does the actual I/O.
+
+LOG_LEVEL        root level (default INFO)
+LOG_FORMAT       json | text (default json)
+LOG_SAMPLE       per-logger sampling of records below WARNING, e.g. "sql=0.01,sms=0.5"
+LOG_QUEUE_SIZE   records buffered before new ones are dropped (default 10000)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is emitted as a field
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_REDACTIONS = [
+    # OTPs and verification codes: "code is 123456", "otp=123456", "OTP: 123456"
+    (re.compile(r"(?i)\b(otp|code|pin)(\s*(?:is|=|:)\s*)\d{4,8}\b"), r"\1\2[REDACTED]"),
+    # API keys and secrets in key=value / JSON form
+    (re.compile(r"(?i)\b(api_?key|apikey|secret|token|password)(['\"]?\s*[:=]\s*['\"]?)[^\s'\",&]+"), r"\1\2[REDACTED]"),
+    # Bare 32+ character hex strings (provider API keys)
+    (re.compile(r"\b[0-9a-f]{32,}\b"), "[REDACTED]"),
+]
+
+_listener: Optional[logging.handlers.QueueListener] = None
+dropped_records = 0
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+# ======================================================
+# 🧹 FILTERS (run in the calling thread)
+# ======================================================
+class RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of sub-WARNING records for configured loggers (and their children)."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def _rate(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RedactingFilter(logging.Filter):
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and isinstance(value, str):
+                setattr(record, key, redact(value))
+        return True
+
+
+# ======================================================
+# 🧾 FORMATTERS (run on the listener thread)
+# ======================================================
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Renders the traceback before queuing and drops records instead of blocking when full."""
+
+    def prepare(self, record):
+        if record.exc_info:
+            record.exc_text = redact(logging.Formatter().formatException(record.exc_info))
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record):
+        global dropped_records
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records += 1
+
+
+# ======================================================
+# ⚙️ SETUP
+# ======================================================
+def configure_logging():
+    """Install the queue-based pipeline on the root logger. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    fmt = os.getenv("LOG_FORMAT", "json").strip().lower()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000)))
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(_parse_sample_rates(os.getenv("LOG_SAMPLE", ""))))
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(RedactingFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+# ======================================================
+# 🪪 REQUEST IDS
+# ======================================================
+class RequestIdMiddleware:
+    """Tags every log record of a request with its X-Request-ID (generated if absent) and echoes it back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode())
+        request_id = incoming.decode("latin-1")[:64] if incoming else uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,360 @@
+# utils/masterlist_import.py
+import csv
+import hashlib
+import io
+import re
+from datetime import datetime, date, timedelta
+from typing import Iterable, Iterator, Optional, List, Dict, Any
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import ResidentMasterlistDB
+from utils.invalidation import publish
+
+try:
+    from openpyxl import load_workbook
+except ImportError:  # XLSX support is optional
+    load_workbook = None
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+COLUMNS = [
+    "first_name", "middle_name", "last_name", "dob", "gender",
+    "purok", "barangay", "city", "province", "number_of_years", "natural_key",
+]
+
+# Accepted spellings of each column in census spreadsheets
+HEADER_ALIASES = {
+    "first_name": "first_name", "firstname": "first_name", "first name": "first_name", "given name": "first_name",
+    "middle_name": "middle_name", "middlename": "middle_name", "middle name": "middle_name",
+    "last_name": "last_name", "lastname": "last_name", "last name": "last_name", "surname": "last_name",
+    "dob": "dob", "birthdate": "dob", "birthday": "dob", "date_of_birth": "dob", "date of birth": "dob",
+    "gender": "gender", "sex": "gender",
+    "purok": "purok",
+    "barangay": "barangay",
+    "city": "city", "municipality": "city",
+    "province": "province",
+    "number_of_years": "number_of_years", "years": "number_of_years", "years_of_residency": "number_of_years",
+}
+
+DOB_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m-%d-%Y", "%d-%b-%Y", "%b %d, %Y", "%B %d, %Y"]
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+class RowRejected(ValueError):
+    """Raised when a masterlist row cannot be normalized."""
+
+
+# ======================================================
+# 🧮 AGE / YEARS HELPER
+# ======================================================
+def calculate_years(dob: datetime) -> int:
+    today = date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+# ======================================================
+# 🧹 NORMALIZATION
+# ======================================================
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = re.sub(r"\s+", " ", str(value)).strip()
+    return value or None
+
+
+def normalize_name(value) -> Optional[str]:
+    value = _clean(value)
+    if value is None:
+        return None
+    if not re.fullmatch(r"[A-Za-zÑñ\s.'-]+", value):
+        raise RowRejected(f"Invalid characters in name '{value}'")
+    return value.title()
+
+
+def normalize_dob(value) -> datetime:
+    if isinstance(value, datetime):
+        dob = value
+    elif isinstance(value, date):
+        dob = datetime(value.year, value.month, value.day)
+    elif isinstance(value, (int, float)):
+        dob = EXCEL_EPOCH + timedelta(days=int(value))  # Excel serial date
+    else:
+        text = _clean(value)
+        if not text:
+            raise RowRejected("DOB is required")
+        dob = None
+        try:
+            dob = datetime.fromisoformat(text)
+        except ValueError:
+            for fmt in DOB_FORMATS:
+                try:
+                    dob = datetime.strptime(text, fmt)
+                    break
+                except ValueError:
+                    continue
+        if dob is None:
+            raise RowRejected(f"Unrecognized DOB '{text}'")
+
+    dob = datetime(dob.year, dob.month, dob.day)
+    if dob > datetime.utcnow():
+        raise RowRejected("DOB is in the future")
+    return dob
+
+
+def normalize_gender(value) -> str:
+    text = (_clean(value) or "").lower()
+    if text in ("m", "male"):
+        return "Male"
+    if text in ("f", "female"):
+        return "Female"
+    raise RowRejected(f"Unrecognized gender '{value}'")
+
+
+def natural_key(first_name: str, middle_name: Optional[str], last_name: str, dob: datetime) -> str:
+    """Hash of the resident's identity: case-insensitive full name + birth date."""
+    raw = "|".join([
+        (first_name or "").lower(),
+        (middle_name or "").lower(),
+        (last_name or "").lower(),
+        dob.strftime("%Y-%m-%d"),
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    first_name = normalize_name(row.get("first_name"))
+    last_name = normalize_name(row.get("last_name"))
+    if not first_name or not last_name:
+        raise RowRejected("First and last name are required")
+    middle_name = normalize_name(row.get("middle_name"))
+    dob = normalize_dob(row.get("dob"))
+
+    years = row.get("number_of_years")
+    if years in (None, ""):
+        number_of_years = calculate_years(dob)
+    else:
+        try:
+            number_of_years = int(float(years))
+        except (TypeError, ValueError):
+            raise RowRejected(f"Invalid number_of_years '{years}'")
+
+    return {
+        "first_name": first_name,
+        "middle_name": middle_name,
+        "last_name": last_name,
+        "dob": dob,
+        "gender": normalize_gender(row.get("gender")),
+        "purok": _clean(row.get("purok")),
+        "barangay": _clean(row.get("barangay")),
+        "city": _clean(row.get("city")),
+        "province": _clean(row.get("province")),
+        "number_of_years": number_of_years,
+        "natural_key": natural_key(first_name, middle_name, last_name, dob),
+    }
+
+
+# ======================================================
+# 📄 STREAMING READERS
+# ======================================================
+def _map_headers(headers) -> List[Optional[str]]:
+    return [HEADER_ALIASES.get((_clean(h) or "").lower()) for h in headers]
+
+
+# Readers yield None for blank rows so import_residents() can still number rows
+# as the spreadsheet does.
+def iter_csv_rows(fileobj) -> Iterator[Optional[Dict[str, Any]]]:
+    """Yield rows from a binary CSV stream without loading it into memory."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    headers = _map_headers(next(reader, []))
+    for values in reader:
+        if not any(v.strip() for v in values):
+            yield None
+            continue
+        yield {h: v for h, v in zip(headers, values) if h}
+
+
+def iter_xlsx_rows(fileobj) -> Iterator[Optional[Dict[str, Any]]]:
+    """Yield rows from the first sheet of an XLSX workbook in read-only mode."""
+    if load_workbook is None:
+        raise ValueError("XLSX import requires the 'openpyxl' package")
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = _map_headers(next(rows, []))
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                yield None
+                continue
+            yield {h: v for h, v in zip(headers, values) if h}
+    finally:
+        workbook.close()
+
+
+def iter_upload_rows(filename: str, fileobj) -> Iterator[Optional[Dict[str, Any]]]:
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return iter_xlsx_rows(fileobj)
+    if name.endswith(".csv") or not name:
+        return iter_csv_rows(fileobj)
+    raise ValueError("Unsupported file type. Upload a .csv or .xlsx file.")
+
+
+# ======================================================
+# 🚚 BULK LOAD
+# ======================================================
+def _copy_rows(db: Session, rows: List[Dict[str, Any]]) -> bool:
+    """Load rows with PostgreSQL COPY. Returns False if the driver has no COPY support."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for r in rows:
+        writer.writerow([
+            r[c].strftime("%Y-%m-%d") if isinstance(r[c], datetime) else r[c]
+            for c in COLUMNS
+        ])
+    buffer.seek(0)
+
+    sql = f"COPY {ResidentMasterlistDB.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        elif hasattr(cursor, "copy"):  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            return False
+    finally:
+        cursor.close()
+    return True
+
+
+def bulk_insert_residents(db: Session, rows: List[Dict[str, Any]]):
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql" and _copy_rows(db, rows):
+        return
+    db.execute(insert(ResidentMasterlistDB), rows)  # executemany
+
+
+def insert_new_residents(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Insert rows whose natural key isn't taken yet (ON CONFLICT DO NOTHING). Returns how many went in."""
+    if not rows:
+        return 0
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(db.get_bind().dialect.name)
+    if dialect is None:
+        db.execute(insert(ResidentMasterlistDB), rows)
+        return len(rows)
+    stmt = (
+        dialect.insert(ResidentMasterlistDB)
+        .on_conflict_do_nothing(index_elements=["natural_key"])
+        .returning(ResidentMasterlistDB.natural_key)
+    )
+    return len(db.execute(stmt, rows).all())
+
+
+def _is_duplicate_key(db: Session, error: Exception) -> bool:
+    # COPY runs on the raw DBAPI cursor, so its errors arrive unwrapped
+    dbapi = db.get_bind().dialect.dbapi
+    return isinstance(error, IntegrityError) or (dbapi is not None and isinstance(error, dbapi.IntegrityError))
+
+
+def backfill_natural_keys(db: Session):
+    """Compute natural keys for rows inserted before the key column existed."""
+    legacy = db.execute(
+        select(
+            ResidentMasterlistDB.id,
+            ResidentMasterlistDB.first_name,
+            ResidentMasterlistDB.middle_name,
+            ResidentMasterlistDB.last_name,
+            ResidentMasterlistDB.dob,
+        ).where(ResidentMasterlistDB.natural_key.is_(None))
+    ).all()
+    if not legacy:
+        return
+
+    seen = set(db.scalars(
+        select(ResidentMasterlistDB.natural_key).where(ResidentMasterlistDB.natural_key.is_not(None))
+    ))
+    updates = []
+    for r in legacy:
+        key = natural_key(_clean(r.first_name), _clean(r.middle_name), _clean(r.last_name), r.dob)
+        if key in seen:
+            continue  # legacy duplicate; leave it unkeyed
+        seen.add(key)
+        updates.append({"id": r.id, "natural_key": key})
+    if updates:
+        db.execute(update(ResidentMasterlistDB), updates)
+        db.commit()
+
+
+# ======================================================
+# 📥 IMPORT PIPELINE
+# ======================================================
+def _flush_batch(db: Session, batch: Dict[str, Dict[str, Any]], result: Dict[str, Any]):
+    existing = set(db.scalars(
+        select(ResidentMasterlistDB.natural_key).where(ResidentMasterlistDB.natural_key.in_(list(batch)))
+    ))
+    new_rows = [row for key, row in batch.items() if key not in existing]
+    try:
+        bulk_insert_residents(db, new_rows)
+        inserted = len(new_rows)
+        if inserted:
+            publish(db, "census")  # delivered with this commit, to every worker
+        db.commit()
+    except Exception as e:
+        if not _is_duplicate_key(db, e):
+            raise
+        # A concurrent import committed some of these keys after the check above
+        db.rollback()
+        inserted = insert_new_residents(db, new_rows)
+        if inserted:
+            publish(db, "census")
+        db.commit()
+    result["inserted"] += inserted
+    result["skipped"] += len(batch) - inserted
+
+
+def import_residents(db: Session, rows: Iterable[Dict[str, Any]], batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Normalize, dedupe and bulk-load masterlist rows.
+    Rows are processed in batches so memory stays bounded for large census files.
+    None entries are blank sheet rows: skipped, but counted for row numbers.
+    """
+    result = {"inserted": 0, "skipped": 0, "rejected": 0, "errors": []}
+    backfill_natural_keys(db)
+
+    batch: Dict[str, Dict[str, Any]] = {}
+    try:
+        for row_number, raw in enumerate(rows, start=2):  # row 1 is the header
+            if raw is None:
+                continue
+            try:
+                row = normalize_row(raw)
+            except RowRejected as e:
+                result["rejected"] += 1
+                if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                    result["errors"].append({"row": row_number, "reason": str(e)})
+                continue
+
+            if row["natural_key"] in batch:
+                result["skipped"] += 1  # duplicate within the same file
+                continue
+            batch[row["natural_key"]] = row
+
+            if len(batch) >= batch_size:
+                _flush_batch(db, batch, result)
+                batch = {}
+
+        if batch:
+            _flush_batch(db, batch, result)
+    except Exception:
+        db.rollback()
+        raise
+
+    return result
@@ -0,0 +1,276 @@
+# utils/metrics.py
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+SMS_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# ======================================================
+# 📈 METRIC TYPES (Prometheus text format)
+# ======================================================
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_labels(self.labelnames, key, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class GaugeCallback(_Metric):
+    """Gauge whose samples are read at scrape time, so it costs nothing between scrapes."""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], fn: Callable[[], Iterable[Tuple[tuple, float]]]):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def collect(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"
+            for key, value in self.fn()
+        ]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# ======================================================
+# 📊 APPLICATION METRICS
+# ======================================================
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database statements executed per HTTP request",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in database statements per HTTP request",
+    ("method", "route"),
+)
+DB_QUERIES = Counter("db_queries_total", "Database statements executed")
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=POOL_WAIT_BUCKETS,
+)
+SMS_LATENCY = Histogram(
+    "sms_send_duration_seconds", "Outbound SMS provider call latency", ("outcome",), buckets=SMS_BUCKETS,
+)
+SMS_SENT = Counter("sms_messages_total", "Outbound SMS attempts by outcome", ("outcome",))
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations_total", "Cache invalidation events applied, by kind and source", ("kind", "source"),
+)
+
+_ENGINES: List[Tuple[str, Engine]] = []
+
+
+def _pool_samples():
+    for name, eng in _ENGINES:
+        pool = eng.pool
+        if hasattr(pool, "checkedout"):
+            yield (name, "checked_out"), pool.checkedout()
+            yield (name, "size"), pool.size()
+            yield (name, "overflow"), max(pool.overflow(), 0)
+
+
+GaugeCallback("db_pool_connections", "Connection pool usage", ("engine", "state"), _pool_samples)
+
+
+def track_engine_pool(name: str, engine: Engine):
+    """Expose this engine's pool usage as a gauge on /metrics."""
+    _ENGINES.append((name, engine))
+
+
+def untrack_engine_pool(engine: Engine):
+    """Stop reporting a disposed engine."""
+    _ENGINES[:] = [(name, eng) for name, eng in _ENGINES if eng is not engine]
+
+
+# ======================================================
+# ⏱️ CONNECTION POOL CHECKOUT TIMING
+# ======================================================
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start)
+
+
+# ======================================================
+# 🗄️ PER-REQUEST DATABASE ACCOUNTING
+# ======================================================
+# {"method", "path", "queries", "db_time"} for the request being served
+_request_db: ContextVar[Optional[dict]] = ContextVar("request_db_stats", default=None)
+
+
+def current_request() -> Optional[dict]:
+    """Method/path and DB usage so far for the request being served, if any."""
+    return _request_db.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+    DB_QUERIES.inc()
+    stats = _request_db.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_time"] += elapsed
+
+
+# ======================================================
+# 📨 SMS TIMING
+# ======================================================
+def observe_sms(outcome: str, seconds: float):
+    SMS_SENT.inc(outcome=outcome)
+    SMS_LATENCY.observe(seconds, outcome=outcome)
+
+
+# ======================================================
+# 🧭 REQUEST MIDDLEWARE
+# ======================================================
+class MetricsMiddleware:
+    """Records latency, status and DB usage per route template (not per raw path)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = {"method": scope["method"], "path": scope["path"], "queries": 0, "db_time": 0.0}
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = _request_db.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.observe(elapsed, method=method, route=template, status=status["code"])
+            REQUEST_DB_QUERIES.observe(stats["queries"], method=method, route=template)
+            REQUEST_DB_TIME.observe(stats["db_time"], method=method, route=template)
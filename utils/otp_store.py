@@ -0,0 +1,213 @@
+# utils/otp_store.py
+"""
+One-time code storage, kept off the users table.
+
+OTP_STORE            db | memory (default db; memory only works with a single worker)
+OTP_MAX_ATTEMPTS     wrong guesses allowed before a code is burned (default 5)
+OTP_SWEEP_SECONDS    how often expired codes are purged (default 300)
+
+Codes are stored as SHA-256 hashes bound to their purpose and subject. A code is consumed by the first
+successful verification; expired or exhausted codes are removed.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, update
+
+from database import SessionLocal
+from models import OTPCodeDB
+from utils.tenancy import current_tenant
+
+MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+SWEEP_SECONDS = float(os.getenv("OTP_SWEEP_SECONDS", 300))
+
+OK = "ok"
+MISSING = "missing"
+EXPIRED = "expired"
+MISMATCH = "mismatch"
+LOCKED = "locked"
+
+
+@dataclass
+class OTPResult:
+    status: str
+    payload: Optional[dict] = None
+    attempts_left: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+def generate_code(digits: int = 6) -> str:
+    return str(secrets.randbelow(9 * 10 ** (digits - 1)) + 10 ** (digits - 1))
+
+
+def _hash(purpose: str, subject: str, code: str) -> str:
+    return hashlib.sha256(f"{purpose}:{subject}:{code}".encode()).hexdigest()
+
+
+# ======================================================
+# 🧠 IN-MEMORY BACKEND
+# ======================================================
+@dataclass
+class _MemoryEntry:
+    code_hash: str
+    expires_at: float
+    payload: Optional[dict] = None
+    attempts: int = 0
+
+
+class MemoryOTPStore:
+    def __init__(self, sweep_seconds: float = SWEEP_SECONDS):
+        # (tenant slug, purpose, subject) -> entry; the db backend is per tenant by construction
+        self._codes: Dict[Tuple[str, str, str], _MemoryEntry] = {}
+        self._lock = threading.Lock()
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def issue(self, purpose: str, subject: str, code: str, ttl_seconds: int, payload: Optional[dict] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            self._codes[(current_tenant().slug, purpose, subject)] = _MemoryEntry(_hash(purpose, subject, code), now + ttl_seconds, payload)
+
+    def verify(self, purpose: str, subject: str, code: str) -> OTPResult:
+        now = time.monotonic()
+        key = (current_tenant().slug, purpose, subject)
+        with self._lock:
+            self._maybe_sweep(now)
+            entry = self._codes.get(key)
+            if entry is None:
+                return OTPResult(MISSING)
+            if entry.expires_at < now:
+                del self._codes[key]
+                return OTPResult(EXPIRED)
+            if hmac.compare_digest(entry.code_hash, _hash(purpose, subject, code)):
+                del self._codes[key]
+                return OTPResult(OK, entry.payload)
+            entry.attempts += 1
+            if entry.attempts >= MAX_ATTEMPTS:
+                del self._codes[key]
+                return OTPResult(LOCKED)
+            return OTPResult(MISMATCH, attempts_left=MAX_ATTEMPTS - entry.attempts)
+
+    def discard(self, purpose: str, subject: str):
+        with self._lock:
+            self._codes.pop((current_tenant().slug, purpose, subject), None)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _maybe_sweep(self, now: float):
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        expired = [k for k, e in self._codes.items() if e.expires_at < now]
+        for key in expired:
+            del self._codes[key]
+        self._next_sweep = now + self._sweep_seconds
+        return len(expired)
+
+
+# ======================================================
+# 🗄️ DATABASE BACKEND (otp_codes table)
+# ======================================================
+class DatabaseOTPStore:
+    """Durable and shared by all workers. Uses its own sessions, never the caller's transaction."""
+
+    def __init__(self, sweep_seconds: float = SWEEP_SECONDS):
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def issue(self, purpose: str, subject: str, code: str, ttl_seconds: int, payload: Optional[dict] = None):
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            self._maybe_sweep(db)
+            db.merge(OTPCodeDB(
+                purpose=purpose,
+                subject=subject,
+                code_hash=_hash(purpose, subject, code),
+                payload=payload,
+                attempts=0,
+                created_at=now,
+                expires_at=now + timedelta(seconds=ttl_seconds),
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def verify(self, purpose: str, subject: str, code: str) -> OTPResult:
+        db = SessionLocal()
+        try:
+            self._maybe_sweep(db)
+            row = db.query(OTPCodeDB).filter(
+                OTPCodeDB.purpose == purpose, OTPCodeDB.subject == subject
+            ).with_for_update().first()
+            if row is None:
+                return OTPResult(MISSING)
+            if row.expires_at < datetime.utcnow():
+                db.delete(row)
+                db.commit()
+                return OTPResult(EXPIRED)
+            if hmac.compare_digest(row.code_hash, _hash(purpose, subject, code)):
+                payload = row.payload
+                db.delete(row)
+                db.commit()
+                return OTPResult(OK, payload)
+
+            attempts = row.attempts + 1
+            if attempts >= MAX_ATTEMPTS:
+                db.delete(row)
+                db.commit()
+                return OTPResult(LOCKED)
+            db.execute(update(OTPCodeDB).where(
+                OTPCodeDB.purpose == purpose, OTPCodeDB.subject == subject
+            ).values(attempts=OTPCodeDB.attempts + 1))
+            db.commit()
+            return OTPResult(MISMATCH, attempts_left=MAX_ATTEMPTS - attempts)
+        finally:
+            db.close()
+
+    def discard(self, purpose: str, subject: str):
+        db = SessionLocal()
+        try:
+            db.execute(delete(OTPCodeDB).where(OTPCodeDB.purpose == purpose, OTPCodeDB.subject == subject))
+            db.commit()
+        finally:
+            db.close()
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            return self._sweep(db)
+        finally:
+            db.close()
+
+    def _maybe_sweep(self, db):
+        if time.monotonic() >= self._next_sweep:
+            self._sweep(db)
+
+    def _sweep(self, db) -> int:
+        self._next_sweep = time.monotonic() + self._sweep_seconds
+        result = db.execute(delete(OTPCodeDB).where(OTPCodeDB.expires_at < datetime.utcnow()))
+        db.commit()
+        return result.rowcount
+
+
+def create_otp_store():
+    backend = os.getenv("OTP_STORE", "db").strip().lower()
+    return MemoryOTPStore() if backend == "memory" else DatabaseOTPStore()
+
+
+otp_store = create_otp_store()
@@ -0,0 +1,141 @@
+# utils/passwords.py
+"""
+Password hashing with scrypt, run on a bounded worker pool.
+
+PASSWORD_SCRYPT_N / _R / _P   scrypt cost (defaults 2**14, 8, 1: ~16 MB per hash)
+PASSWORD_POOL                 thread | process (default thread; hashlib.scrypt releases the GIL)
+PASSWORD_WORKERS              pool size (default: CPU count)
+PASSWORD_MAX_QUEUE            hashes queued or running before new ones are refused (default 8 per worker)
+
+Stored format: scrypt$<n>$<r>$<p>$<salt b64>$<hash b64>. Legacy unsalted SHA-256
+hex digests still verify and are reported as needing a rehash, so they are upgraded
+on the user's next successful login.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", 8))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", 1))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+POOL_KIND = os.getenv("PASSWORD_POOL", "thread").strip().lower()
+WORKERS = int(os.getenv("PASSWORD_WORKERS", 0)) or (os.cpu_count() or 1)
+MAX_QUEUE = int(os.getenv("PASSWORD_MAX_QUEUE", 0)) or WORKERS * 8
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PasswordServiceBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503 with Retry-After."""
+
+
+# ======================================================
+# 🔑 KDF (pure functions, safe to run in any worker)
+# ======================================================
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2), dklen=KEY_BYTES)
+
+
+def hash_password(password: str) -> str:
+    """Hash in the calling thread. Use the *_async / bounded variants on request paths."""
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([
+        "scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(key).decode(),
+    ])
+
+
+def verify_password(password: str, stored: Optional[str]) -> bool:
+    if not stored:
+        return False
+    if _LEGACY_SHA256.match(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    try:
+        scheme, n, r, p, salt, key = stored.split("$")
+        if scheme != "scrypt":
+            return False
+        expected = base64.b64decode(key)
+        return hmac.compare_digest(_scrypt(password, base64.b64decode(salt), int(n), int(r), int(p)), expected)
+    except ValueError:
+        return False
+
+
+def needs_rehash(stored: Optional[str]) -> bool:
+    """True for legacy SHA-256 hashes and scrypt hashes made with weaker parameters."""
+    if not stored or not stored.startswith("scrypt$"):
+        return True
+    try:
+        _, n, r, p, _, _ = stored.split("$")
+    except ValueError:
+        return True
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+# ======================================================
+# 🧵 BOUNDED POOL
+# ======================================================
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if POOL_KIND == "process":
+                _executor = ProcessPoolExecutor(max_workers=WORKERS)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="password-kdf")
+        return _executor
+
+
+def _release(_future):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def _submit(fn, *args) -> Future:
+    global _pending
+    with _pending_lock:
+        if _pending >= MAX_QUEUE:
+            raise PasswordServiceBusy("Password hashing queue is full")
+        _pending += 1
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def queue_depth() -> int:
+    return _pending
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(hash_password, password))
+
+
+async def verify_password_async(password: str, stored: Optional[str]) -> bool:
+    if stored and _LEGACY_SHA256.match(stored):
+        return verify_password(password, stored)  # a single SHA-256 isn't worth a pool hop
+    return await asyncio.wrap_future(_submit(verify_password, password, stored))
+
+
+def hash_password_bounded(password: str) -> str:
+    """For sync routes: runs on the pool (bounded) and waits for the result."""
+    return _submit(hash_password, password).result()
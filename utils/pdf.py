@@ -0,0 +1,181 @@
+# utils/pdf.py
+"""
+A small PDF 1.4 writer for generated certificates (standard library only).
+
+Pages are drawn on a PdfCanvas as content-stream operators and finished into
+Flate-compressed bytes, which are plain data: they can be produced in worker
+processes and handed back to the parent. write_pdf() then streams any number of
+finished pages as one document, so a merged print job is assembled without ever
+parsing a PDF.
+
+Text uses the standard Helvetica fonts (no embedding) with WinAnsi encoding, so
+Filipino names with ñ/Ñ render; characters outside cp1252 print as "?".
+"""
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+REGULAR = "F1"
+BOLD = "F2"
+ITALIC = "F3"
+FONTS = {REGULAR: "Helvetica", BOLD: "Helvetica-Bold", ITALIC: "Helvetica-Oblique"}
+
+# Advance widths (1/1000 em) for ASCII 32..126, from the Adobe core font metrics.
+# Helvetica-Oblique shares Helvetica's widths.
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+_WIDTHS = {REGULAR: _HELVETICA, BOLD: _HELVETICA_BOLD, ITALIC: _HELVETICA}
+_DEFAULT_WIDTH = 556  # non-ASCII (ñ, é, ...): an average letter width
+
+
+def text_width(text: str, font: str = REGULAR, size: float = 11) -> float:
+    widths = _WIDTHS[font]
+    total = 0
+    for ch in text:
+        code = ord(ch)
+        total += widths[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def wrap_text(text: str, width: float, font: str = REGULAR, size: float = 11) -> List[str]:
+    """Greedy word wrap to `width` points."""
+    lines, current = [], ""
+    space = text_width(" ", font, size)
+    current_width = 0.0
+    for word in text.split():
+        word_width = text_width(word, font, size)
+        if current and current_width + space + word_width > width:
+            lines.append(current)
+            current, current_width = word, word_width
+        else:
+            current_width += (space if current else 0) + word_width
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _literal(text: str) -> bytes:
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _num(value: float) -> bytes:
+    return (b"%d" % value) if value == int(value) else (b"%.2f" % value)
+
+
+# ======================================================
+# 🖊️ PAGE CONTENT
+# ======================================================
+class PdfCanvas:
+    """Content-stream builder for one page; y grows upwards from the bottom edge."""
+
+    def __init__(self, width: float = PAGE_WIDTH, height: float = PAGE_HEIGHT):
+        self.width = width
+        self.height = height
+        self._ops: List[bytes] = []
+
+    def raw(self, ops: bytes):
+        """Append pre-built operators (e.g. a template's static part)."""
+        self._ops.append(ops)
+
+    def text(self, x: float, y: float, text: str, font: str = REGULAR, size: float = 11, align: str = "left"):
+        if align != "left":
+            w = text_width(text, font, size)
+            x -= w / 2 if align == "center" else w
+        self._ops.append(b"BT /%s %s Tf %s %s Td %s Tj ET\n" % (
+            font.encode(), _num(size), _num(round(x, 2)), _num(round(y, 2)), _literal(text),
+        ))
+
+    def paragraph(self, x: float, y: float, width: float, text: str, font: str = REGULAR,
+                  size: float = 11, leading: float = 16, indent: float = 0) -> float:
+        """Wrapped, left-aligned text starting at baseline y; returns the baseline below it."""
+        for i, line in enumerate(wrap_text(text, width - indent, font, size)):
+            self.text(x + (indent if i == 0 else 0), y, line, font, size)
+            y -= leading
+        return y
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 1):
+        self._ops.append(b"%s w %s %s m %s %s l S\n" % (_num(width), _num(x1), _num(y1), _num(x2), _num(y2)))
+
+    def rect(self, x: float, y: float, w: float, h: float, width: float = 1):
+        self._ops.append(b"%s w %s %s %s %s re S\n" % (_num(width), _num(x), _num(y), _num(w), _num(h)))
+
+    def ops(self) -> bytes:
+        return b"".join(self._ops)
+
+    def finish(self) -> bytes:
+        """The page as a compressed content stream, ready for write_pdf()."""
+        return zlib.compress(self.ops(), 6)
+
+
+# ======================================================
+# 📄 DOCUMENT
+# ======================================================
+def write_pdf(pages: Iterable[bytes], width: float = PAGE_WIDTH, height: float = PAGE_HEIGHT,
+              title: str = "") -> Iterator[bytes]:
+    """
+    Stream a PDF made of finished pages (PdfCanvas.finish()) as they arrive.
+    Objects 1 (catalog) and 2 (page tree) are written last, once the page count
+    is known; the xref table maps object numbers to offsets in any order.
+    """
+    offsets: List[Tuple[int, int]] = []
+    position = 0
+
+    def emit(data: bytes) -> bytes:
+        nonlocal position
+        position += len(data)
+        return data
+
+    def obj(number: int, body: bytes) -> bytes:
+        offsets.append((number, position))
+        return emit(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    yield emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    font_refs = []
+    next_number = 3
+    for name, base in FONTS.items():
+        yield obj(next_number, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode())
+        font_refs.append(b"/%s %d 0 R" % (name.encode(), next_number))
+        next_number += 1
+    resources = b"<< /Font << " + b" ".join(font_refs) + b" >> >>"
+
+    kids = []
+    for stream in pages:
+        content, page = next_number, next_number + 1
+        next_number += 2
+        yield obj(content, b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        yield obj(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %s %s] /Resources %s /Contents %d 0 R >>" % (
+            _num(width), _num(height), resources, content,
+        ))
+        kids.append(b"%d 0 R" % page)
+
+    yield obj(2, b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(kids))
+    yield obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    info = next_number
+    yield obj(info, b"<< /Producer (BarangayConnect) /Title " + _literal(title) + b" >>")
+
+    xref_at = position
+    by_number = dict(offsets)
+    xref = [b"xref\n0 %d\n" % (info + 1), b"0000000000 65535 f \n"]
+    xref += [b"%010d 00000 n \n" % by_number[n] for n in range(1, info + 1)]
+    yield emit(b"".join(xref))
+    yield emit(b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (info + 1, info, xref_at))
@@ -0,0 +1,181 @@
+# utils/query_budget.py
+"""
+Query budgets: count SQL statements per block / per request and flag N+1 patterns.
+
+QUERY_BUDGET_MODE          off | warn | raise (default off)
+QUERY_BUDGET_MAX_REPEATS   identical statement shapes allowed per request (default 10)
+QUERY_BUDGET_MAX_QUERIES   statements allowed per request, 0 = no limit (default 0)
+
+Use `raise` in tests and staging so an endpoint that goes over its budget fails
+loudly, and `warn` where a log line is enough.
+"""
+import functools
+import inspect
+import logging
+import os
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("query_budget")
+
+MODE = os.getenv("QUERY_BUDGET_MODE", "off").strip().lower()
+DEFAULT_MAX_REPEATS = int(os.getenv("QUERY_BUDGET_MAX_REPEATS", 10))
+DEFAULT_MAX_QUERIES = int(os.getenv("QUERY_BUDGET_MAX_QUERIES", 0)) or None
+
+# Expanded IN lists and VALUES rows differ only in placeholder count
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Trackers active in the current context (a request and any nested budgets)
+_active: ContextVar[Tuple["QueryTracker", ...]] = ContextVar("query_budget_trackers", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in `raise` mode when a block or request goes over its query budget."""
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryTracker:
+    def __init__(self):
+        self.count = 0
+        self.shapes: Counter = Counter()
+        self._last_shape = None
+
+    def record(self, statement: str):
+        shape = statement_shape(statement)
+        # A flush inserting many rows of one table counts once, whether or not
+        # the driver batches them (SQLite emits one INSERT ... RETURNING per row)
+        if shape == self._last_shape and shape.startswith("INSERT"):
+            return
+        self._last_shape = shape
+        self.count += 1
+        self.shapes[shape] += 1
+
+    def violations(self, max_queries: Optional[int], max_repeats: Optional[int]) -> list:
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} statements (budget {max_queries})")
+        if max_repeats is not None:
+            for shape, n in self.shapes.most_common():
+                if n <= max_repeats:
+                    break
+                problems.append(f"{n}x repeated (limit {max_repeats}): {shape[:200]}")
+        return problems
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    for tracker in _active.get():
+        tracker.record(statement)
+
+
+def _report(label: str, problems: list, mode: str):
+    message = f"Query budget exceeded in {label}: " + "; ".join(problems)
+    if mode == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+# ======================================================
+# 📏 BUDGETS FOR A BLOCK OR FUNCTION
+# ======================================================
+class query_budget:
+    """
+    Context manager / decorator asserting a statement budget:
+
+        with query_budget(max_queries=3):
+            ...
+
+        @router.get("/")
+        @query_budget(max_queries=2, label="GET /document-requests")
+        async def get_requests(...): ...
+
+    `mode` defaults to QUERY_BUDGET_MODE; pass mode="raise" to enforce in a test
+    regardless of the environment.
+    """
+
+    def __init__(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = DEFAULT_MAX_REPEATS,
+                 label: Optional[str] = None, mode: Optional[str] = None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.label = label
+        self.mode = mode or MODE
+        self.tracker: Optional[QueryTracker] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[QueryTracker]:
+        if self.mode == "off":
+            return None
+        self.tracker = QueryTracker()
+        self._token = _active.set(_active.get() + (self.tracker,))
+        return self.tracker
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is None:
+            return False
+        _active.reset(self._token)
+        self._token = None
+        if exc_type is None:
+            problems = self.tracker.violations(self.max_queries, self.max_repeats)
+            if problems:
+                _report(self.label or "block", problems, self.mode)
+        return False
+
+    def __call__(self, fn):
+        label = self.label or fn.__qualname__
+        params = dict(max_queries=self.max_queries, max_repeats=self.max_repeats, label=label, mode=self.mode)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with query_budget(**params):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with query_budget(**params):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+# ======================================================
+# 🧭 PER-REQUEST BUDGET MIDDLEWARE
+# ======================================================
+class QueryBudgetMiddleware:
+    """
+    Counts every statement a request runs (dependencies and serialization included)
+    and reports repeated statement shapes, the usual sign of a query in a loop.
+    """
+
+    def __init__(self, app, mode: str = MODE, max_queries: Optional[int] = DEFAULT_MAX_QUERIES,
+                 max_repeats: Optional[int] = DEFAULT_MAX_REPEATS):
+        self.app = app
+        self.mode = mode
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            return await self.app(scope, receive, send)
+
+        tracker = QueryTracker()
+        token = _active.set(_active.get() + (tracker,))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _active.reset(token)
+
+        route = scope.get("route")
+        label = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+        problems = tracker.violations(self.max_queries, self.max_repeats)
+        if problems:
+            _report(label, problems, self.mode)
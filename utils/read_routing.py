@@ -0,0 +1,85 @@
+# utils/read_routing.py
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+STICKY_COOKIE = "db_sticky"
+MAX_TRACKED_CLIENTS = 10000
+
+# Per-request state shared with the threadpool: {"sticky": bool, "wrote": bool}
+_request_state: ContextVar[Optional[dict]] = ContextVar("db_request_state", default=None)
+
+# client key -> monotonic time until which its reads stay on the primary
+_recent_writers: Dict[str, float] = {}
+
+
+def prefer_primary() -> bool:
+    """True when the current client wrote recently and must read its own writes."""
+    state = _request_state.get()
+    return bool(state and state["sticky"])
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session, flush_context):
+    state = _request_state.get()
+    if state is not None:
+        state["wrote"] = True
+
+
+def _client_key(scope) -> str:
+    # The peer address only: ProxyHeadersMiddleware (main.py) has already swapped in
+    # the X-Forwarded-For client when the peer is one of TRUSTED_PROXIES
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _has_sticky_cookie(scope) -> bool:
+    cookie = dict(scope["headers"]).get(b"cookie", b"")
+    return f"{STICKY_COOKIE}=".encode() in cookie
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client's reads on the primary for a few seconds after it writes,
+    so replica lag never hides the request it just submitted.
+    Stickiness is tracked in-process and echoed as a short-lived cookie so
+    other workers honour it too.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        key = _client_key(scope)
+        now = time.monotonic()
+        state = {
+            "sticky": _recent_writers.get(key, 0) > now or _has_sticky_cookie(scope),
+            "wrote": False,
+        }
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state["wrote"]:
+                self._remember(key)
+                cookie = f"{STICKY_COOKIE}=1; Max-Age={int(self.sticky_seconds) or 1}; Path=/; HttpOnly"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        token = _request_state.set(state)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_state.reset(token)
+
+    def _remember(self, key: str):
+        now = time.monotonic()
+        if len(_recent_writers) >= MAX_TRACKED_CLIENTS:
+            for k in [k for k, until in _recent_writers.items() if until <= now]:
+                del _recent_writers[k]
+        _recent_writers[key] = now + self.sticky_seconds
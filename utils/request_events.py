@@ -0,0 +1,172 @@
+# utils/request_events.py
+"""
+Append-only status history for document requests (document_request_events).
+
+Every flush that creates a request or changes its status appends one compact row:
+request id, status code, acting user and timestamp, on the flush connection so it
+commits or rolls back with the change itself. Routes name the acting user with
+set_actor(); changes made without one are recorded with actor_id NULL.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from models import DocumentRequestDB, DocumentRequestEventDB, UserDB
+
+# Codes are stored, never renumber; append new statuses at the end
+STATUS_CODES = {
+    "Pending": 1,
+    "Approved": 2,
+    "For Print": 3,
+    "For Pickup": 4,
+    "Completed": 5,
+    "Returned": 6,
+    "Rejected": 7,
+    "Cancelled": 8,
+}
+OTHER = 0
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+_events = DocumentRequestEventDB.__table__
+
+
+def status_code(status: Optional[str]) -> int:
+    return STATUS_CODES.get(status, OTHER)
+
+
+def status_name(code: int) -> str:
+    return STATUS_NAMES.get(code, "Other")
+
+
+def set_actor(db: Session, user_id: Optional[int]):
+    """Attribute status changes flushed by this session to `user_id`."""
+    db.info["actor_id"] = user_id
+
+
+# ======================================================
+# 🔔 FLUSH HOOK
+# ======================================================
+def _status_changed(obj: DocumentRequestDB) -> bool:
+    return inspect(obj).attrs.status.history.has_changes()
+
+
+@event.listens_for(Session, "after_flush")
+def record_status_events(session: Session, flush_context):
+    now = datetime.utcnow()
+    actor_id = session.info.get("actor_id")
+    rows = [
+        {"request_id": obj.id, "status": status_code(obj.status), "actor_id": actor_id, "created_at": now}
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, DocumentRequestDB) and (obj in session.new or _status_changed(obj))
+    ]
+    if rows:
+        session.connection().execute(insert(_events), rows)
+
+
+# ======================================================
+# 🕒 TIMELINE
+# ======================================================
+def request_history(db: Session, request_id: int) -> List[dict]:
+    """Events for one request, oldest first, with the actor's name (one indexed query)."""
+    rows = db.execute(
+        select(
+            DocumentRequestEventDB.status, DocumentRequestEventDB.actor_id, DocumentRequestEventDB.created_at,
+            UserDB.first_name, UserDB.last_name, UserDB.role,
+        )
+        .outerjoin(UserDB, UserDB.id == DocumentRequestEventDB.actor_id)
+        .where(DocumentRequestEventDB.request_id == request_id)
+        .order_by(DocumentRequestEventDB.id)
+    ).all()
+    return [
+        {
+            "status": status_name(row.status),
+            "performed_by_id": row.actor_id,
+            "performed_by_name": f"{row.first_name or ''} {row.last_name or ''}".strip() or None,
+            "performed_by_role": row.role,
+            "at": row.created_at,
+        }
+        for row in rows
+    ]
+
+
+# ======================================================
+# ⏱️ TURNAROUND PERCENTILES
+# ======================================================
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks (same as PostgreSQL percentile_cont)."""
+    position = (len(sorted_values) - 1) * q
+    lower, upper = math.floor(position), math.ceil(position)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def turnaround_percentiles(
+    db: Session,
+    from_status: str = "Pending",
+    to_status: str = "Completed",
+    days: int = 90,
+    quantiles=(0.5, 0.9, 0.95),
+) -> Dict[str, dict]:
+    """
+    Hours from a request's first `from_status` event to its first `to_status` event,
+    per document type, for requests that reached `to_status` in the last `days` days.
+    Only the window's events are read (status/created_at index).
+    """
+    e = DocumentRequestEventDB
+    since = datetime.utcnow() - timedelta(days=days)
+    done = (
+        select(e.request_id, func.min(e.created_at).label("done_at"))
+        .where(e.status == status_code(to_status), e.created_at >= since)
+        .group_by(e.request_id)
+        .subquery()
+    )
+    started = (
+        select(e.request_id, func.min(e.created_at).label("started_at"))
+        .join(done, done.c.request_id == e.request_id)
+        .where(e.status == status_code(from_status))
+        .group_by(e.request_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(DocumentRequestDB.document_type, started.c.started_at, done.c.done_at)
+        .join(done, done.c.request_id == DocumentRequestDB.id)
+        .join(started, and_(started.c.request_id == DocumentRequestDB.id, started.c.started_at <= done.c.done_at))
+    ).all()
+
+    durations: Dict[str, List[float]] = {}
+    for document_type, started_at, done_at in rows:
+        durations.setdefault(document_type or "Unknown", []).append((done_at - started_at).total_seconds() / 3600)
+
+    result = {}
+    for document_type, hours in sorted(durations.items()):
+        hours.sort()
+        result[document_type] = {
+            "count": len(hours),
+            **{f"p{round(q * 100)}_hours": round(_percentile(hours, q), 2) for q in quantiles},
+        }
+    return result
+
+
+# ======================================================
+# 🧱 BACKFILL (requests created before the events table existed)
+# ======================================================
+def backfill_request_events(db: Session) -> int:
+    """
+    Give every request without history a creation event (Pending, at created_at)
+    and, if it has moved on, one for its current status at updated_at.
+    """
+    has_events = select(DocumentRequestEventDB.id).where(DocumentRequestEventDB.request_id == DocumentRequestDB.id).exists()
+    rows = []
+    for request_id, status, created_at, updated_at in db.execute(
+        select(DocumentRequestDB.id, DocumentRequestDB.status, DocumentRequestDB.created_at, DocumentRequestDB.updated_at)
+        .where(~has_events)
+    ):
+        rows.append({"request_id": request_id, "status": STATUS_CODES["Pending"], "actor_id": None, "created_at": created_at})
+        if status != "Pending":
+            rows.append({"request_id": request_id, "status": status_code(status), "actor_id": None, "created_at": updated_at or created_at})
+    if rows:
+        db.execute(insert(_events), rows)
+    db.commit()
+    return len(rows)
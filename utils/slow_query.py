@@ -0,0 +1,225 @@
+# utils/slow_query.py
+"""
+Slow-query recorder.
+
+SLOW_QUERY_MS                statements slower than this are recorded (default 200, 0 = off)
+SLOW_QUERY_BUFFER            how many recent slow queries are kept (default 200)
+SLOW_QUERY_EXPLAIN_SAMPLE    fraction of slow SELECTs that get a plan captured (default 0.2)
+SLOW_QUERY_EXPLAIN_ANALYZE   use EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL (default true)
+
+Plans are captured after the fact on a separate connection, so the request that
+ran the slow statement never waits for them. Only SELECTs are explained, because
+EXPLAIN ANALYZE executes the statement. Parameter values are used for the EXPLAIN
+and then dropped; only their types are kept in the buffer.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import current_request
+from utils.query_budget import statement_shape
+
+logger = logging.getLogger("slow_query")
+
+THRESHOLD_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER", 200))
+EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", 0.2))
+EXPLAIN_ANALYZE = os.getenv("SLOW_QUERY_EXPLAIN_ANALYZE", "true").strip().lower() in ("1", "true", "yes", "on")
+MAX_PENDING_EXPLAINS = 4
+MAX_STATEMENT_CHARS = 4000
+
+_SKIP_OPTION = "slow_query_skip"
+
+_entries: deque = deque(maxlen=BUFFER_SIZE)
+_ids = itertools.count(1)
+_pending = threading.BoundedSemaphore(MAX_PENDING_EXPLAINS)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# sync facade engine of an AsyncEngine -> the AsyncEngine, for explaining async-driver statements
+_async_engines: Dict[int, object] = {}
+
+
+def register_async_engine(async_engine):
+    """Let plans for statements from an async engine be captured on that engine."""
+    _async_engines[id(async_engine.sync_engine)] = async_engine
+
+
+def unregister_async_engine(async_engine):
+    _async_engines.pop(id(async_engine.sync_engine), None)
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Types of the bound parameters, without their values."""
+    if parameters is None:
+        return None
+    if executemany:
+        rows = list(parameters)
+        return {"rows": len(rows), "first": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def _explain_sql(dialect_name: str, statement: str) -> Optional[str]:
+    if dialect_name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if EXPLAIN_ANALYZE else "EXPLAIN "
+    elif dialect_name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        return None
+    return prefix + statement
+
+
+def _is_select(statement: str) -> bool:
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head in ("SELECT", "WITH")
+
+
+def _plan_text(rows) -> str:
+    return "\n".join(" | ".join(str(col) for col in row) for row in rows)
+
+
+# ======================================================
+# 🧾 PLAN CAPTURE (off the request path)
+# ======================================================
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        return _executor
+
+
+def _explain_sync(engine: Engine, entry: dict, sql: str, parameters):
+    try:
+        with engine.connect() as conn:
+            rows = conn.execution_options(**{_SKIP_OPTION: True}).exec_driver_sql(sql, parameters).fetchall()
+            conn.rollback()
+        entry["plan"], entry["plan_status"] = _plan_text(rows), "captured"
+    except Exception as e:
+        entry["plan"], entry["plan_status"] = str(e), "failed"
+    finally:
+        _pending.release()
+
+
+async def _explain_async(async_engine, entry: dict, sql: str, parameters):
+    try:
+        async with async_engine.connect() as conn:
+            conn = await conn.execution_options(**{_SKIP_OPTION: True})
+            result = await conn.exec_driver_sql(sql, parameters)
+            rows = result.fetchall()
+            await conn.rollback()
+        entry["plan"], entry["plan_status"] = _plan_text(rows), "captured"
+    except Exception as e:
+        entry["plan"], entry["plan_status"] = str(e), "failed"
+    finally:
+        _pending.release()
+
+
+def _schedule_explain(conn, entry: dict, statement: str, parameters):
+    sql = _explain_sql(conn.dialect.name, statement)
+    if sql is None:
+        entry["plan_status"] = "unsupported"
+        return
+    if not _pending.acquire(blocking=False):
+        entry["plan_status"] = "dropped"  # explain backlog full; never queue behind traffic
+        return
+
+    entry["plan_status"] = "pending"
+    if conn.dialect.is_async:
+        async_engine = _async_engines.get(id(conn.engine))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if async_engine is None or loop is None:
+            entry["plan_status"] = "unsupported"
+            _pending.release()
+            return
+        loop.create_task(_explain_async(async_engine, entry, sql, parameters))
+    else:
+        _get_executor().submit(_explain_sync, conn.engine, entry, sql, parameters)
+
+
+# ======================================================
+# ⏱️ STATEMENT TIMING
+# ======================================================
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("slow_query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if THRESHOLD_MS <= 0 or elapsed_ms < THRESHOLD_MS:
+        return
+    if context is not None and context.execution_options.get(_SKIP_OPTION):
+        return
+
+    request = current_request()
+    entry = {
+        "id": next(_ids),
+        "recorded_at": datetime.utcnow(),
+        "duration_ms": round(elapsed_ms, 2),
+        "statement": statement[:MAX_STATEMENT_CHARS],
+        "shape": statement_shape(statement)[:MAX_STATEMENT_CHARS],
+        "parameters": parameter_shape(parameters, executemany),
+        "database": conn.engine.url.database,
+        "request": f"{request['method']} {request['path']}" if request else None,
+        "plan": None,
+        "plan_status": "not_sampled",
+    }
+    _entries.append(entry)
+    logger.warning("Slow query (%.1f ms) %s: %s", elapsed_ms, entry["request"] or "-", entry["shape"][:300])
+
+    if not executemany and _is_select(statement) and random.random() < EXPLAIN_SAMPLE:
+        _schedule_explain(conn, entry, statement, parameters)
+
+
+# ======================================================
+# 📋 READING THE BUFFER
+# ======================================================
+def recent_slow_queries(limit: int = 50) -> List[dict]:
+    """Most recent first."""
+    return list(itertools.islice(reversed(_entries), limit))
+
+
+def slow_query_summary() -> List[dict]:
+    """Buffered slow queries grouped by statement shape, worst total time first."""
+    groups: Dict[str, dict] = {}
+    for entry in list(_entries):
+        group = groups.setdefault(entry["shape"], {
+            "shape": entry["shape"], "count": 0, "total_ms": 0.0, "max_ms": 0.0, "requests": set(),
+        })
+        group["count"] += 1
+        group["total_ms"] += entry["duration_ms"]
+        group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+        if entry["request"]:
+            group["requests"].add(entry["request"])
+    summary = sorted(groups.values(), key=lambda g: g["total_ms"], reverse=True)
+    for group in summary:
+        group["total_ms"] = round(group["total_ms"], 2)
+        group["requests"] = sorted(group["requests"])
+    return summary
+
+
+def clear_slow_queries():
+    _entries.clear()
@@ -0,0 +1,252 @@
+# utils/stats_rollup.py
+"""
+Dashboard rollups: counts kept in the stats_rollup table as writes happen.
+
+Every flush that creates, deletes or changes the status (or a grouping column) of
+a document request or user adds +1/-1 deltas to the affected (dimension, bucket,
+status) rows in the same transaction, so the dashboards read a few hundred rows
+at most instead of scanning the history. Soft-deleted requests are not counted.
+
+Writes made with Core statements bypass the flush hook; run recompute_rollups()
+afterwards (POST /stats/recompute) to repair the table.
+"""
+from collections import Counter as Tally, defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, event, extract, func, insert, inspect, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from models import DocumentRequestDB, StatsRollupDB, UserDB
+
+UNKNOWN = "Unknown"
+
+_table = StatsRollupDB.__table__
+_KEY_COLUMNS = ("entity", "dimension", "bucket", "status")
+
+# (entity, dimension, bucket, status) -> delta
+Deltas = Dict[Tuple[str, str, str, str], int]
+
+
+def _bucket(value) -> str:
+    value = str(value).strip() if value is not None else ""
+    return value[:100] or UNKNOWN
+
+
+def _month(value: Optional[datetime]) -> str:
+    value = value or datetime.utcnow()
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+# ======================================================
+# 🧮 CONTRIBUTIONS (what one row adds to the rollup)
+# ======================================================
+def _request_buckets(document_type, purok, created_at, status) -> Dict[str, Tuple[str, str]]:
+    return {
+        "document_type": (_bucket(document_type), _bucket(status)),
+        "purok": (_bucket(purok), _bucket(status)),
+        "month": (_month(created_at), _bucket(status)),
+    }
+
+
+def _user_buckets(role, purok, gender, status) -> Dict[str, Tuple[str, str]]:
+    return {
+        "role": (_bucket((role or "").lower()), _bucket(status)),
+        "purok": (_bucket(purok), _bucket(status)),
+        "gender": (_bucket(gender), _bucket(status)),
+    }
+
+
+def _add(deltas: Deltas, entity: str, buckets: Dict[str, Tuple[str, str]], sign: int):
+    for dimension, (bucket, status) in buckets.items():
+        deltas[(entity, dimension, bucket, status)] += sign
+
+
+def _before(obj, name: str):
+    """Pre-flush value of an attribute (history is still intact in after_flush)."""
+    history = inspect(obj).attrs[name].history
+    if not history.has_changes():
+        return getattr(obj, name)
+    return history.deleted[0] if history.deleted else None
+
+
+def _changed(obj, names) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+# Load the old value on assignment even if the attribute was expired, so
+# _before() can always tell which bucket a row is leaving.
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+for _attr in (
+    DocumentRequestDB.status, DocumentRequestDB.is_deleted, DocumentRequestDB.document_type, DocumentRequestDB.user_id,
+    UserDB.status, UserDB.role, UserDB.purok, UserDB.gender,
+):
+    event.listen(_attr, "set", _keep_old_value, active_history=True)
+
+
+# ======================================================
+# 🔔 FLUSH HOOK
+# ======================================================
+def _purok_lookup(session: Session, user_ids) -> Dict[int, Optional[str]]:
+    """Pre-flush purok per user: from the identity map when loaded, else one query."""
+    puroks, missing = {}, []
+    for user_id in user_ids:
+        user = session.identity_map.get(identity_key(UserDB, user_id))
+        if user is not None:
+            puroks[user_id] = _before(user, "purok")
+        else:
+            missing.append(user_id)
+    if missing:
+        rows = session.connection().execute(select(UserDB.id, UserDB.purok).where(UserDB.id.in_(missing)))
+        puroks.update({row.id: row.purok for row in rows})
+    return puroks
+
+
+@event.listens_for(Session, "after_flush")
+def record_rollup_changes(session: Session, flush_context):
+    requests = []  # (obj, was_counted_before, counted_after)
+    users = []
+    for obj in session.new:
+        if isinstance(obj, DocumentRequestDB):
+            requests.append((obj, False, not obj.is_deleted))
+        elif isinstance(obj, UserDB):
+            users.append((obj, False, True))
+    for obj in session.dirty:
+        if isinstance(obj, DocumentRequestDB) and _changed(obj, ("status", "is_deleted", "document_type", "user_id")):
+            requests.append((obj, not _before(obj, "is_deleted"), not obj.is_deleted))
+        elif isinstance(obj, UserDB) and _changed(obj, ("status", "role", "purok", "gender")):
+            users.append((obj, True, True))
+    for obj in session.deleted:
+        if isinstance(obj, DocumentRequestDB):
+            requests.append((obj, not _before(obj, "is_deleted"), False))
+        elif isinstance(obj, UserDB):
+            users.append((obj, True, False))
+    if not requests and not users:
+        return
+
+    deltas: Deltas = Tally()
+    if requests:
+        user_ids = {uid for obj, _, _ in requests for uid in (_before(obj, "user_id"), obj.user_id) if uid is not None}
+        puroks = _purok_lookup(session, user_ids)
+        for obj, before, after in requests:
+            if before:
+                _add(deltas, "requests", _request_buckets(
+                    _before(obj, "document_type"), puroks.get(_before(obj, "user_id")), obj.created_at, _before(obj, "status"),
+                ), -1)
+            if after:
+                _add(deltas, "requests", _request_buckets(
+                    obj.document_type, puroks.get(obj.user_id), obj.created_at, obj.status,
+                ), +1)
+
+    for obj, before, after in users:
+        if before:
+            _add(deltas, "users", _user_buckets(
+                _before(obj, "role"), _before(obj, "purok"), _before(obj, "gender"), _before(obj, "status"),
+            ), -1)
+        if after:
+            _add(deltas, "users", _user_buckets(obj.role, obj.purok, obj.gender, obj.status), +1)
+            # Requests are bucketed by their owner's purok, so a move takes them along
+            if before and _changed(obj, ("purok",)):
+                _move_request_puroks(session, obj.id, _before(obj, "purok"), obj.purok, deltas)
+
+    apply_deltas(session.connection(), deltas)
+
+
+def _move_request_puroks(session: Session, user_id: int, old_purok, new_purok, deltas: Deltas):
+    rows = session.connection().execute(
+        select(DocumentRequestDB.status, func.count())
+        .where(DocumentRequestDB.user_id == user_id, DocumentRequestDB.is_deleted == False)
+        .group_by(DocumentRequestDB.status)
+    )
+    for status, count in rows:
+        deltas[("requests", "purok", _bucket(old_purok), _bucket(status))] -= count
+        deltas[("requests", "purok", _bucket(new_purok), _bucket(status))] += count
+
+
+def apply_deltas(connection, deltas: Deltas):
+    """Upsert count += delta for every non-zero key, in key order (avoids lock-order deadlocks)."""
+    rows = [dict(zip(_KEY_COLUMNS, key), count=delta) for key, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(connection.dialect.name)
+    if dialect is not None:
+        stmt = dialect.insert(_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(_KEY_COLUMNS),
+            set_={"count": _table.c.count + stmt.excluded.count},
+        )
+        connection.execute(stmt, rows)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(_table)
+            .where(*[_table.c[name] == row[name] for name in _KEY_COLUMNS])
+            .values(count=_table.c.count + row["count"])
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(_table), [row])
+
+
+# ======================================================
+# 📊 READS
+# ======================================================
+def read_rollup(db: Session, entity: str) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """{dimension: {bucket: {status: count}}} for one entity, in a single query."""
+    result: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(dict))
+    rows = db.execute(
+        select(StatsRollupDB.dimension, StatsRollupDB.bucket, StatsRollupDB.status, StatsRollupDB.count)
+        .where(StatsRollupDB.entity == entity, StatsRollupDB.count > 0)
+    )
+    for dimension, bucket, status, count in rows:
+        result[dimension][bucket][status] = count
+    return result
+
+
+# ======================================================
+# 🛠️ FULL RECOMPUTE (repair)
+# ======================================================
+def recompute_rollups(db: Session) -> int:
+    """Rebuild stats_rollup from the source tables in one transaction. Returns the number of rows written."""
+    if db.get_bind().dialect.name == "postgresql":
+        # Blocks concurrent flushes from applying deltas mid-rebuild; they apply on top once we commit
+        db.execute(text("LOCK TABLE stats_rollup IN SHARE ROW EXCLUSIVE MODE"))
+
+    deltas: Deltas = Tally()
+    active = DocumentRequestDB.is_deleted == False
+    req = DocumentRequestDB
+
+    for document_type, status, count in db.execute(
+        select(req.document_type, req.status, func.count()).where(active).group_by(req.document_type, req.status)
+    ):
+        deltas[("requests", "document_type", _bucket(document_type), _bucket(status))] += count
+    for purok, status, count in db.execute(
+        select(UserDB.purok, req.status, func.count()).join(UserDB, UserDB.id == req.user_id)
+        .where(active).group_by(UserDB.purok, req.status)
+    ):
+        deltas[("requests", "purok", _bucket(purok), _bucket(status))] += count
+    year, month = extract("year", req.created_at), extract("month", req.created_at)
+    for y, m, status, count in db.execute(
+        select(year, month, req.status, func.count()).where(active).group_by(year, month, req.status)
+    ):
+        deltas[("requests", "month", f"{int(y):04d}-{int(m):02d}", _bucket(status))] += count
+
+    for column in (UserDB.role, UserDB.purok, UserDB.gender):
+        dimension = column.key
+        for value, status, count in db.execute(
+            select(column, UserDB.status, func.count()).group_by(column, UserDB.status)
+        ):
+            value = (value or "").lower() if dimension == "role" else value
+            deltas[("users", dimension, _bucket(value), _bucket(status))] += count
+
+    db.execute(delete(_table))
+    rows = [dict(zip(_KEY_COLUMNS, key), count=count) for key, count in sorted(deltas.items()) if count]
+    if rows:
+        db.execute(insert(_table), rows)
+    db.commit()
+    return len(rows)
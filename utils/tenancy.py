@@ -0,0 +1,226 @@
+# utils/tenancy.py
+"""
+Multi-barangay tenancy: which barangay a request belongs to, and its message templates.
+
+TENANTS_FILE        JSON file describing the hosted barangays (optional, see below)
+DEFAULT_TENANT      tenant used when a request names none (default: first entry of TENANTS_FILE)
+TENANT_HOST_SUFFIX  also resolve tenants from the Host subdomain, e.g. ".brgyconnect.ph"
+BARANGAY_NAME       barangay of the single built-in tenant when TENANTS_FILE is unset (default Tilhaong)
+APP_NAME            product name used in messages (default BarangayConnect)
+
+TENANTS_FILE maps a slug to the barangay and where its data lives:
+
+    {
+      "tilhaong":  {"barangay": "Tilhaong", "database_url": "postgresql://.../brgy_tilhaong"},
+      "poblacion": {"barangay": "Poblacion", "schema": "brgy_poblacion",
+                    "templates": {"request_pickup": "Hi {full_name}, ..."}}
+    }
+
+A tenant with `database_url` has its own database; one with `schema` lives in its
+own PostgreSQL schema on DATABASE_URL (via search_path); one with neither uses
+DATABASE_URL as is. Tenant rows are never in shared tables, so no query or index
+touches another barangay's data. Engines per tenant live in database.py.
+
+A request's tenant comes from the X-Barangay header, then the Host subdomain,
+then the `tnt` claim of its bearer token, else DEFAULT_TENANT.
+"""
+import json
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from starlette.responses import JSONResponse
+
+APP_NAME = os.getenv("APP_NAME", "BarangayConnect")
+HOST_SUFFIX = os.getenv("TENANT_HOST_SUFFIX", "").strip().lower().lstrip(".")
+TENANT_HEADER = b"x-barangay"
+
+_SLUG = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+_SCHEMA = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+
+class UnknownTenant(LookupError):
+    pass
+
+
+# ======================================================
+# ✉️ MESSAGE TEMPLATES
+# ======================================================
+# str.format templates; every template also gets {barangay}, {barangay_name} and {app_name}
+DEFAULT_TEMPLATES = {
+    "request_approved": (
+        "Hi {full_name}, your {document_type} request has been approved by {barangay_name} Office. "
+        "You can now log in to {app_name}."
+    ),
+    "request_pickup": "Hi {full_name}, your {document_type} is now ready for pickup at {barangay_name} Office. Please bring a valid ID.",
+    "request_completed": "Hi {full_name}, your {document_type} request has been completed. Thank you for using BrgyConnect!",
+    "request_returned": "Hi {full_name}, your {document_type} request has been returned for correction. Please review and resubmit.",
+    "request_rejected": "Hi {full_name}, unfortunately, your {document_type} request has been rejected. Please contact the Barangay Office for details.",
+    "request_resubmitted": "Hi {full_name}, your {document_type} request has been resubmitted and is now under review.",
+    "request_status_changed": "Hi {full_name}, the status of your {document_type} request is now '{status}'. Thank you!",
+    "registration_approved": "Hi {full_name}, your registration has been approved. You can now log in to the {app_name} system.",
+    "registration_approved_sms": "Hi {full_name}, your registration is approved by {barangay_name}. You may now log in to {app_name}.",
+    "registration_rejected": (
+        "Hi {full_name}, your registration has been rejected. "
+        "Please contact the {barangay_name} Office for more information."
+    ),
+    "registration_rejected_sms": (
+        "Hi {full_name}, your registration was not approved. "
+        "Please visit the {barangay_name} office for assistance."
+    ),
+    "profile_update_approved_sms": "Hi, your profile update has been approved. - {app_name}",
+    "profile_update_rejected_sms": "Hi, your profile update was not approved. Please visit the barangay office for details. - {app_name}",
+    "contact_change_otp": "{app_name}: Your verification code is {otp}. It expires in 5 minutes.",
+    "password_reset_otp": "{app_name}: Your password reset code is {otp}. It expires in 5 minutes.",
+    "password_reset_done": "Your password has been successfully reset. - {app_name}",
+}
+
+
+# ======================================================
+# 🏘️ TENANTS
+# ======================================================
+@dataclass(frozen=True)
+class Tenant:
+    slug: str
+    barangay: str
+    database_url: Optional[str] = None
+    replica_url: Optional[str] = None
+    schema: Optional[str] = None
+    app_name: str = APP_NAME
+    templates: Dict[str, str] = field(default_factory=dict, hash=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        return f"Barangay {self.barangay}"
+
+    @property
+    def uses_default_database(self) -> bool:
+        return not self.database_url and not self.schema
+
+    def render(self, key: str, **params) -> str:
+        template = self.templates.get(key) or DEFAULT_TEMPLATES[key]
+        return template.format(barangay=self.barangay, barangay_name=self.name, app_name=self.app_name, **params)
+
+
+def _tenant_from_config(slug: str, config: dict) -> Tenant:
+    slug = slug.strip().lower()
+    if not _SLUG.match(slug):
+        raise ValueError(f"Invalid tenant slug '{slug}'")
+    schema = config.get("schema")
+    if schema and not _SCHEMA.match(schema):
+        raise ValueError(f"Invalid schema name '{schema}' for tenant '{slug}'")
+    templates = config.get("templates") or {}
+    unknown = set(templates) - set(DEFAULT_TEMPLATES)
+    if unknown:
+        raise ValueError(f"Unknown message templates for tenant '{slug}': {', '.join(sorted(unknown))}")
+    return Tenant(
+        slug=slug,
+        barangay=config["barangay"],
+        database_url=config.get("database_url"),
+        replica_url=config.get("replica_url"),
+        schema=schema,
+        app_name=config.get("app_name", APP_NAME),
+        templates=dict(templates),
+    )
+
+
+def load_tenants() -> Dict[str, Tenant]:
+    path = os.getenv("TENANTS_FILE")
+    if not path:
+        return {"default": Tenant("default", os.getenv("BARANGAY_NAME", "Tilhaong"))}
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not raw:
+        raise ValueError(f"{path} defines no tenants")
+    tenants = [_tenant_from_config(slug, config) for slug, config in raw.items()]
+    shared = [t.slug for t in tenants if t.uses_default_database]
+    if len(shared) > 1:
+        raise ValueError(f"Tenants {', '.join(shared)} would share DATABASE_URL; give all but one a database_url or schema")
+    return {t.slug: t for t in tenants}
+
+
+TENANTS = load_tenants()
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "").strip().lower() or next(iter(TENANTS))
+if DEFAULT_TENANT not in TENANTS:
+    raise ValueError(f"DEFAULT_TENANT '{DEFAULT_TENANT}' is not defined")
+
+
+def all_tenants() -> List[Tenant]:
+    return list(TENANTS.values())
+
+
+def get_tenant(slug: str) -> Tenant:
+    tenant = TENANTS.get((slug or "").strip().lower())
+    if tenant is None:
+        raise UnknownTenant(f"Unknown barangay '{slug}'")
+    return tenant
+
+
+# ======================================================
+# 🧭 CURRENT TENANT
+# ======================================================
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+
+def current_tenant() -> Tenant:
+    return _current_tenant.get() or TENANTS[DEFAULT_TENANT]
+
+
+@contextmanager
+def use_tenant(tenant: Union[Tenant, str]):
+    """Run a block (seeder, background job) as a given tenant."""
+    token = _current_tenant.set(get_tenant(tenant) if isinstance(tenant, str) else tenant)
+    try:
+        yield current_tenant()
+    finally:
+        _current_tenant.reset(token)
+
+
+def render_message(key: str, **params) -> str:
+    return current_tenant().render(key, **params)
+
+
+def _tenant_slug_from_request(scope) -> Optional[str]:
+    headers = dict(scope["headers"])
+    explicit = headers.get(TENANT_HEADER)
+    if explicit:
+        return explicit.decode("latin-1")
+
+    if HOST_SUFFIX:
+        host = headers.get(b"host", b"").decode("latin-1").split(":")[0].lower()
+        if host.endswith("." + HOST_SUFFIX):
+            return host[: -len(HOST_SUFFIX) - 1].rsplit(".", 1)[-1]
+
+    authorization = headers.get(b"authorization", b"")
+    if authorization[:7].lower() == b"bearer ":
+        from utils.auth import InvalidToken, decode_token  # auth depends on this module
+        try:
+            return decode_token(authorization[7:].decode("latin-1").strip()).get("tnt")
+        except (InvalidToken, UnicodeDecodeError):
+            return None  # the route rejects the token itself
+    return None
+
+
+class TenantMiddleware:
+    """Resolve the request's tenant once and expose it through current_tenant()."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        slug = _tenant_slug_from_request(scope)
+        try:
+            tenant = get_tenant(slug) if slug else TENANTS[DEFAULT_TENANT]
+        except UnknownTenant as e:
+            return await JSONResponse({"detail": str(e)}, status_code=404)(scope, receive, send)
+
+        token = _current_tenant.set(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tenant.reset(token)
@@ -0,0 +1,349 @@
+# utils/tracing.py
+"""
+Lightweight request tracing.
+
+TRACE_SAMPLE_RATE   fraction of requests traced (default 0 = none, apart from trusted parents below)
+TRACE_TRUSTED_PARENTS
+                    comma-separated client addresses/CIDRs whose sampled traceparent
+                    flag forces a trace (default none, e.g. "10.0.0.0/8")
+TRACE_EXPORTER      memory | file | none (default memory)
+TRACE_FILE          where the file exporter appends traces (default traces.jsonl)
+TRACE_MEMORY_SIZE   traces kept by the in-memory exporter (default 200)
+
+The sampling decision is made once per request; unsampled requests carry no span
+state, so every span() call below is a contextvar read and nothing else.
+Anyone can send "traceparent: ...-01", so from other clients the flag is
+ignored: the request is sampled at TRACE_SAMPLE_RATE and, when it is, joins
+the caller's trace id.
+Finished traces are exported as OTLP/JSON (`resourceSpans`), one trace per export.
+"""
+import functools
+import inspect
+import ipaddress
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "placeofbirth-backend")
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0))
+TRUSTED_PARENTS = [
+    ipaddress.ip_network(p.strip(), strict=False)
+    for p in os.getenv("TRACE_TRUSTED_PARENTS", "").split(",") if p.strip()
+]
+EXPORTER = os.getenv("TRACE_EXPORTER", "memory").strip().lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+MEMORY_SIZE = int(os.getenv("TRACE_MEMORY_SIZE", 200))
+MAX_STATEMENT_CHARS = 500
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str], kind: int = KIND_INTERNAL, attributes: Optional[dict] = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Optional[Span]:
+    """Start a child of the current span without making it current (for leaf spans such as DB statements)."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes):
+    """Child span of the current span; a no-op when the request isn't sampled."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(), for sync and async functions."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ======================================================
+# 📦 OTLP/JSON ENCODING
+# ======================================================
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(s: Span) -> dict:
+    encoded = {
+        "traceId": s.trace.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": s.status, "message": s.status_message} if s.status == STATUS_ERROR else {"code": s.status},
+    }
+    if s.parent_id:
+        encoded["parentSpanId"] = s.parent_id
+    return encoded
+
+
+def to_otlp(spans: List[Span]) -> dict:
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "utils.tracing"}, "spans": [_otlp_span(s) for s in spans]}],
+    }]}
+
+
+# ======================================================
+# 📤 EXPORTERS
+# ======================================================
+class InMemoryExporter:
+    def __init__(self, size: int = MEMORY_SIZE):
+        self.traces: deque = deque(maxlen=size)
+
+    def export(self, spans: List[Span]):
+        self.traces.append(to_otlp(spans))
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        return list(reversed(self.traces))[:limit]
+
+
+class FileExporter:
+    """Appends one OTLP/JSON document per line; encoding and I/O happen on a background thread."""
+
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize=1000)
+        threading.Thread(target=self._run, name="trace-file-exporter", daemon=True).start()
+
+    def export(self, spans: List[Span]):
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            pass  # tracing must never slow requests down
+
+    def _run(self):
+        while True:
+            spans = self.queue.get()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(to_otlp(spans)) + "\n")
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        return []
+
+
+def _create_exporter():
+    if EXPORTER == "file":
+        return FileExporter()
+    if EXPORTER == "memory":
+        return InMemoryExporter()
+    return None
+
+
+exporter = _create_exporter()
+
+
+# ======================================================
+# 🗄️ DATABASE STATEMENT SPANS
+# ======================================================
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return
+    db_span = start_span(
+        "db.query", KIND_CLIENT,
+        **{"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_CHARS]},
+    )
+    conn.info.setdefault("trace_spans", []).append(db_span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        db_span = spans.pop()
+        db_span.set_error(exception_context.original_exception)
+        db_span.end()
+
+
+# ======================================================
+# 🧾 RESPONSE SERIALIZATION SPANS
+# ======================================================
+def instrument_fastapi_serialization():
+    """Wrap FastAPI's response_model serialization in a span."""
+    import fastapi.routing as fastapi_routing
+
+    original = getattr(fastapi_routing, "serialize_response", None)
+    if original is None or getattr(original, "__traced__", False):
+        return
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        with span("serialize_response"):
+            return await original(*args, **kwargs)
+
+    serialize_response.__traced__ = True
+    fastapi_routing.serialize_response = serialize_response
+
+
+# ======================================================
+# 🧭 ROOT SPANS (head sampling)
+# ======================================================
+def _parse_traceparent(value: bytes):
+    """W3C traceparent: version-traceid-parentid-flags."""
+    try:
+        _, trace_id, parent_id, flags = value.decode("latin-1").split("-")
+        if len(trace_id) == 32 and len(parent_id) == 16:
+            return trace_id, parent_id, int(flags, 16) & 1 == 1
+    except ValueError:
+        pass
+    return None
+
+
+def _is_trusted(scope, networks) -> bool:
+    client = scope.get("client")
+    if not networks or not client:
+        return False
+    try:
+        address = ipaddress.ip_address(client[0])
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+class TracingMiddleware:
+    def __init__(self, app, sample_rate: float = SAMPLE_RATE, trusted_parents=TRUSTED_PARENTS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.trusted_parents = trusted_parents
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or exporter is None:
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope["headers"]).get(b"traceparent")
+        parsed = _parse_traceparent(incoming) if incoming else None
+        trace_id, parent_id, sampled = parsed or (None, None, False)
+        if not (sampled and _is_trusted(scope, self.trusted_parents)):
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled:
+            return await self.app(scope, receive, send)
+
+        trace = _Trace(trace_id or os.urandom(16).hex())
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status = STATUS_ERROR
+                traceparent = f"00-{trace.trace_id}-{root.span_id}-01"
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", traceparent.encode())]
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            root.end()
+            exporter.export(trace.spans)